@@ -24,6 +24,7 @@ HISTORY_CONFIG = {
     'max_entries': 50,                        # Máximo de entradas no histórico
     'auto_save': True,                        # Salvar automaticamente
     'save_file': 'nfc_history.json',          # Arquivo de histórico
+    'db_file': 'nfc_history.db',              # Banco SQLite do histórico persistente
     'show_raw_data': False,                   # Mostrar dados brutos por padrão
 }
 
@@ -41,6 +42,9 @@ NFC_CONFIG = {
     'timeout_seconds': 5,                     # Timeout para leitura
     'retry_attempts': 3,                      # Tentativas de releitura
     'auto_decode': True,                      # Decodificar automaticamente
+    'debounce_seconds': 2.0,                  # Ignora toques repetidos da mesma tag
+    'decode_cache_seconds': 30.0,             # Reaproveita a decodificação da mesma mensagem
+    'allow_lossy_fit': False,                 # Descartar campos opcionais do vCard para caber na tag
     'supported_types': [                      # Tipos NDEF suportados
         'RTD_TEXT',
         'RTD_URI', 
@@ -54,6 +58,9 @@ NFC_CONFIG = {
 DEBUG_CONFIG = {
     'enable_test_mode': True,                 # Habilitar modo de teste
     'simulate_nfc': False,                    # Simular NFC no desktop
+    'simulate_nfc_dump': '',                  # Dump JSON de tags para replay ('' = tags sintéticas)
+    'simulate_nfc_rate': 2.0,                 # Tags por segundo no replay
+    'simulate_system': False,                 # Backend simulado de Wi-Fi/Bluetooth/volume
     'verbose_logging': False,                 # Logs verbosos
     'show_raw_bytes': True,                   # Mostrar bytes brutos
     'performance_monitoring': False,          # Monitorar performance
@@ -70,7 +77,10 @@ NOTIFICATION_CONFIG = {
 
 # Configurações de exportação
 EXPORT_CONFIG = {
-    'formats': ['JSON', 'CSV', 'TXT'],        # Formatos de exportação
+    'formats': ['CSV', 'JSONL', 'JSON', 'TXT'],  # Formatos de exportação
+    'default_format': 'CSV',                  # Formato usado no botão de exportar
+    'compress': False,                        # Gerar arquivo .gz
+    'chunk_size': 500,                        # Leituras gravadas por bloco
     'include_timestamp': True,                # Incluir timestamp
     'include_raw_data': False,                # Incluir dados brutos
     'date_format': '%d/%m/%Y %H:%M:%S',       # Formato de data
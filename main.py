@@ -28,7 +28,15 @@ import json
 import logging
 import json
 import logging
+import os
+import sqlite3
+import time
+from contextlib import nullcontext
 from datetime import datetime
+
+# Instante de início do processo Python (base do tempo até o primeiro quadro)
+STARTUP_TIME = time.perf_counter()
+
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.scrollview import ScrollView
@@ -36,11 +44,9 @@ from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.popup import Popup
 from kivy.uix.gridlayout import GridLayout
-from kivy.uix.textinput import TextInput
-from kivy.uix.spinner import Spinner
-from kivy.uix.switch import Switch
 from kivy.uix.tabbedpanel import TabbedPanel, TabbedPanelItem
 from kivy.clock import Clock
+from kivy.factory import Factory  # TextInput, Spinner e Switch carregados no primeiro uso
 from kivy.utils import platform
 from kivy.metrics import dp
 from kivy.core.window import Window
@@ -49,15 +55,32 @@ from kivy.core.window import Window
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+from nfc_history import HistoryStore, HistoryRingBuffer
+from ndef_codec import (
+    parse_message, iter_records, decode_text_payload, decode_uri_payload, as_bytes,
+    TNF_WELL_KNOWN, TNF_MIME_MEDIA, TNF_ABSOLUTE_URI, TNF_EXTERNAL_TYPE,
+    RTD_TEXT, RTD_URI, RTD_SMART_POSTER
+)
+
 # Importa módulos locais (opcional)
 try:
     from config import get_config, get_text
-    from utils import file_manager, data_validator, security_helper
-    from nfc_writer import nfc_writer, profile_manager, data_builder, NFCRecordType
+    from utils import (
+        file_manager, data_validator, security_helper, performance_monitor,
+        TapDebouncer, HistoryExporter, tracer
+    )
+    from nfc_writer import nfc_writer, profile_manager, data_builder, capacity_planner, NFCRecordType
     from nfc_automation import automation_engine, SystemCommand
+    from nfc_bulk import BulkProvisioningJob
 except ImportError as e:
     logging.warning(f"Alguns módulos não puderam ser importados: {e}")
+    BulkProvisioningJob = None
+    TapDebouncer = None
+    HistoryExporter = None
     # Define valores padrão para evitar erros
+    def get_config(section):
+        return {}
+    
     class DummyModule:
         def __getattr__(self, name):
             return lambda *args, **kwargs: None
@@ -68,9 +91,18 @@ except ImportError as e:
         def list_profiles(self):
             return []
     
+    class DummyTracer(DummyModule):
+        enabled = False
+        
+        def span(self, name, **args):
+            return nullcontext()
+    
     nfc_writer = DummyModule()
     profile_manager = DummyModule()
+    performance_monitor = DummyModule()
+    tracer = DummyTracer()
     data_builder = DummyModule()
+    capacity_planner = DummyModule()
     automation_engine = DummyModule()
     
     class NFCRecordType:
@@ -125,83 +157,210 @@ def initialize_android_classes():
 
 
 class NFCHistoryManager:
-    """Gerenciador de histórico de leituras NFC"""
-    
-    def __init__(self):
-        self.history = []
-        self.max_history = 50  # Máximo de 50 leituras no histórico
+    """Gerenciador de histórico de leituras NFC
+    
+    O banco só é aberto no primeiro uso (ou em load()), fora do caminho do
+    primeiro quadro.
+    """
+    
+    def __init__(self, store=None):
+        self.history_config = get_config('history')
+        self.max_history = self.history_config.get('max_entries', 50)  # Leituras recentes em memória
+        self._store = store
+        self._loaded = False
+        self.history = HistoryRingBuffer(self.max_history)
+        self.total = 0
+    
+    @property
+    def store(self):
+        """Histórico persistente (aberto sob demanda)"""
+        self.load()
+        return self._store
+    
+    def load(self):
+        """Abre o histórico persistente e carrega as leituras recentes"""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        # Histórico persistente em SQLite (as leituras sobrevivem ao reinício)
+        if self._store is None and self.history_config.get('auto_save', True):
+            try:
+                self._store = HistoryStore(filename=self.history_config.get('db_file', 'nfc_history.db'))
+            except (sqlite3.Error, OSError) as e:
+                logger.error(f"Erro ao abrir histórico persistente: {e}")
+        
+        # Leituras recentes em buffer circular (mais antiga -> mais recente)
+        recent = self._store.query(page_size=self.max_history) if self._store else []
+        self.history = HistoryRingBuffer(self.max_history, reversed(recent))
+        self.total = self._store.count() if self._store else 0
     
-    def add_reading(self, data_type, content, raw_data=None):
+    def add_reading(self, data_type, content, raw_data=None, tag_uid=None):
         """Adiciona uma nova leitura ao histórico"""
-        reading = {
-            'timestamp': datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-            'type': data_type,
-            'content': content,
-            'raw_data': raw_data
-        }
+        with tracer.span('history.add', type=data_type):
+            self.load()
+            reading = {
+                'timestamp': datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+                'type': data_type,
+                'content': content,
+                'raw_data': raw_data,
+                'tag_uid': tag_uid
+            }
+            
+            if self.store:
+                try:
+                    reading = self.store.append(
+                        data_type, content, raw_data, tag_uid, timestamp=reading['timestamp']
+                    )
+                except sqlite3.Error as e:
+                    logger.error(f"Erro ao gravar leitura no histórico: {e}")
+            
+            self.history.append(reading)  # Descarta a mais antiga quando cheio
+            self.total += 1
+            
+            logger.info(f"Nova leitura adicionada: {data_type}")
+    
+    def get_history(self):
+        """Retorna as leituras mais recentes (visão sem cópia, mais recente primeiro)"""
+        self.load()
+        return self.history.view()
+    
+    def query(self, page=0, page_size=50, before_id=None, **filters):
+        """Consulta paginada no histórico completo (tipo, UID da tag, período)
+        
+        before_id pagina por chave: id da última leitura da página anterior.
+        """
+        if self.store:
+            return self.store.query(page=page, page_size=page_size, before_id=before_id, **filters)
+        if before_id is not None:
+            return []  # sem banco, o histórico é só o buffer (uma página)
+        
+        history = [
+            reading for reading in self.history
+            if all(reading.get(key) == value for key, value in (
+                ('type', filters.get('data_type')), ('tag_uid', filters.get('tag_uid'))
+            ) if value is not None)
+        ]
+        return history[page * page_size:(page + 1) * page_size]
+    
+    def count(self):
+        """Total de leituras registradas"""
+        self.load()
+        return self.total
+    
+    def export(self, fmt=None, compress=None, progress=None, on_complete=None):
+        """Exporta o histórico completo em segundo plano (ExportJob, ou None)
         
-        self.history.insert(0, reading)  # Adiciona no início
+        As leituras são lidas do banco em lotes e gravadas em blocos, sem
+        carregar o histórico inteiro na memória.
+        """
+        if HistoryExporter is None:
+            return None
+        self.load()
         
-        # Limita o tamanho do histórico
-        if len(self.history) > self.max_history:
-            self.history = self.history[:self.max_history]
+        export_config = get_config('export')
+        fmt = (fmt or export_config.get('default_format', 'CSV')).upper()
+        if compress is None:
+            compress = export_config.get('compress', False)
         
-        logger.info(f"Nova leitura adicionada: {data_type}")
-    
-    def get_history(self):
-        """Retorna o histórico de leituras"""
-        return self.history
+        basename = f"nfc_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        filepath = os.path.join(
+            file_manager.ensure_app_directory(),
+            HistoryExporter.filename_for(basename, fmt, compress)
+        )
+        # Sem banco: exporta o buffer em memória, em ordem cronológica
+        readings = self._store.iter_all() if self._store else self.history.snapshot()[::-1]
+        
+        return HistoryExporter().export_async(
+            readings, filepath, fmt, compress, total=self.total,
+            progress=progress, on_complete=on_complete
+        )
     
     def clear_history(self):
         """Limpa o histórico"""
-        self.history = []
+        self.load()
+        if self._store:
+            self.store.clear()
+        self.history.clear()
+        self.total = 0
         logger.info("Histórico limpo")
 
 
 class NFCDataDecoder:
     """Decodificador avançado de dados NFC"""
     
+    @staticmethod
+    def decode_ndef_message(raw_message):
+        """Decodifica uma mensagem NDEF completa a partir dos bytes brutos
+        
+        Os bytes vêm de uma única chamada NdefMessage.toByteArray(); todos
+        os registros são decodificados em Python, sem chamadas JNI extras.
+        """
+        try:
+            records = parse_message(raw_message)
+        except ValueError as e:
+            logger.error(f"Mensagem NDEF malformada: {e}")
+            return [{
+                'type': 'Erro',
+                'content': f'Mensagem NDEF malformada: {str(e)}',
+                'raw': bytes(raw_message[:50]).hex() if raw_message else None
+            }]
+        
+        decoded = []
+        for record in records:
+            with tracer.span('nfc.decode_record', tnf=record.tnf):
+                decoded.append(NFCDataDecoder.decode_ndef_record(record))
+        return decoded
+    
     @staticmethod
     def decode_ndef_record(record):
         """Decodifica um registro NDEF com suporte a múltiplos tipos"""
         try:
-            if not record or not NdefRecord:
+            if record is None:
                 return {
                     'type': 'Erro',
-                    'content': 'Registro inválido ou classes NFC não disponíveis',
+                    'content': 'Registro inválido',
                     'raw': None
                 }
                 
-            tnf = record.getTnf()
-            record_type = list(record.getType())
-            payload = record.getPayload()
+            tnf = record.tnf
+            record_type = record.type
+            payload = record.payload
             
             # Registro de texto (RTD_TEXT)
-            if tnf == NdefRecord.TNF_WELL_KNOWN and record_type == list(NdefRecord.RTD_TEXT):
+            if tnf == TNF_WELL_KNOWN and record_type == RTD_TEXT:
                 return NFCDataDecoder._decode_text_record(payload)
             
             # Registro de URI (RTD_URI)
-            elif tnf == NdefRecord.TNF_WELL_KNOWN and record_type == list(NdefRecord.RTD_URI):
-                return NFCDataDecoder._decode_uri_record(record)
+            elif tnf == TNF_WELL_KNOWN and record_type == RTD_URI:
+                return NFCDataDecoder._decode_uri_record(payload)
             
             # Registro de Smart Poster
-            elif tnf == NdefRecord.TNF_WELL_KNOWN and record_type == list(NdefRecord.RTD_SMART_POSTER):
+            elif tnf == TNF_WELL_KNOWN and record_type == RTD_SMART_POSTER:
                 return NFCDataDecoder._decode_smart_poster(payload)
             
             # MIME type
-            elif tnf == NdefRecord.TNF_MIME_MEDIA:
+            elif tnf == TNF_MIME_MEDIA:
                 return NFCDataDecoder._decode_mime_record(record_type, payload)
             
+            # URI absoluta
+            elif tnf == TNF_ABSOLUTE_URI:
+                return {
+                    'type': 'URI/URL',
+                    'content': record_type.decode('utf-8', 'replace'),
+                    'details': 'URI absoluta'
+                }
+            
             # Registro externo
-            elif tnf == NdefRecord.TNF_EXTERNAL_TYPE:
+            elif tnf == TNF_EXTERNAL_TYPE:
                 return NFCDataDecoder._decode_external_record(record_type, payload)
             
             # Tipo desconhecido
             else:
                 return {
                     'type': 'Desconhecido',
-                    'content': f'TNF: {tnf}, Tipo: {bytes(record_type).hex()}',
-                    'raw': payload.hex() if len(payload) < 100 else f'{payload[:50].hex()}... ({len(payload)} bytes)'
+                    'content': f'TNF: {tnf}, Tipo: {record_type.hex()}',
+                    'raw': bytes(payload).hex() if len(payload) < 100 else f'{bytes(payload[:50]).hex()}... ({len(payload)} bytes)'
                 }
                 
         except Exception as e:
@@ -216,13 +375,7 @@ class NFCDataDecoder:
     def _decode_text_record(payload):
         """Decodifica registro de texto"""
         try:
-            # Primeiro byte: encoding e tamanho do código de idioma
-            encoding = 'utf-8' if (payload[0] & 0x80) == 0 else 'utf-16'
-            lang_code_length = payload[0] & 0x3F
-            
-            # Extrai código de idioma e texto
-            lang_code = payload[1:1 + lang_code_length].decode('ascii')
-            text = payload[1 + lang_code_length:].decode(encoding)
+            lang_code, text, encoding = decode_text_payload(payload)
             
             return {
                 'type': 'Texto',
@@ -233,14 +386,14 @@ class NFCDataDecoder:
             return {
                 'type': 'Texto (Erro)',
                 'content': f'Erro ao decodificar texto: {e}',
-                'raw': payload.hex() if payload else ''
+                'raw': bytes(payload).hex() if payload else ''
             }
     
     @staticmethod
-    def _decode_uri_record(record):
+    def _decode_uri_record(payload):
         """Decodifica registro de URI"""
         try:
-            uri = record.toUri().toString()
+            uri = decode_uri_payload(payload)
             return {
                 'type': 'URI/URL',
                 'content': uri,
@@ -256,16 +409,34 @@ class NFCDataDecoder:
     @staticmethod
     def _decode_smart_poster(payload):
         """Decodifica Smart Poster (contém múltiplos registros)"""
+        uri = None
+        title = None
+        try:
+            for record in iter_records(payload):
+                if record.is_well_known(RTD_URI) and uri is None:
+                    uri = decode_uri_payload(record.payload)
+                elif record.is_well_known(RTD_TEXT) and title is None:
+                    title = decode_text_payload(record.payload)[1]
+        except ValueError as e:
+            logger.warning(f"Smart Poster malformado: {e}")
+        
+        if uri is None:
+            return {
+                'type': 'Smart Poster',
+                'content': 'Poster inteligente detectado',
+                'details': f'Tamanho: {len(payload)} bytes'
+            }
+        
         return {
             'type': 'Smart Poster',
-            'content': 'Poster inteligente detectado',
-            'details': f'Tamanho: {len(payload)} bytes'
+            'content': uri,
+            'details': f'Título: {title}' if title else f'Tamanho: {len(payload)} bytes'
         }
     
     @staticmethod
     def _decode_mime_record(record_type, payload):
         """Decodifica registro MIME"""
-        mime_type = bytes(record_type).decode('ascii')
+        mime_type = record_type.decode('ascii', 'replace')
         return {
             'type': f'MIME: {mime_type}',
             'content': f'Dados MIME ({len(payload)} bytes)',
@@ -275,7 +446,7 @@ class NFCDataDecoder:
     @staticmethod
     def _decode_external_record(record_type, payload):
         """Decodifica registro externo"""
-        ext_type = bytes(record_type).decode('ascii')
+        ext_type = record_type.decode('ascii', 'replace')
         return {
             'type': f'Externo: {ext_type}',
             'content': f'Dados externos ({len(payload)} bytes)',
@@ -419,10 +590,11 @@ class ModernNFCInterface(BoxLayout):
     
     def update_reading_content(self, content):
         """Atualiza o conteúdo da leitura"""
-        self.reading_content.text = content
-        # Atualiza contador no botão de histórico
-        history_count = len(self.app.history_manager.get_history())
-        self.history_btn.text = f'📚 Histórico\n({history_count} leituras)'
+        with tracer.span('ui.update_reading_content', chars=len(content)):
+            self.reading_content.text = content
+            # Atualiza contador no botão de histórico
+            history_count = self.app.history_manager.count()
+            self.history_btn.text = f'📚 Histórico\n({history_count} leituras)'
     
     def _show_history(self, instance):
         """Mostra o histórico de leituras"""
@@ -492,7 +664,7 @@ class NFCWriterInterface(BoxLayout):
         type_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(45))
         type_layout.add_widget(Label(text='📋 Tipo:', size_hint_x=0.25, font_size='14sp'))
         
-        self.data_type_spinner = Spinner(
+        self.data_type_spinner = Factory.Spinner(
             text='Texto Simples',
             values=[
                 'Texto Simples',
@@ -514,6 +686,21 @@ class NFCWriterInterface(BoxLayout):
         type_layout.add_widget(self.data_type_spinner)
         self.add_widget(type_layout)
         
+        # Quantidade de tags a gravar com os mesmos dados
+        copies_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(40))
+        copies_layout.add_widget(Label(text='🔁 Tags:', size_hint_x=0.25, font_size='14sp'))
+        
+        self.copies_input = Factory.TextInput(
+            text='1',
+            multiline=False,
+            input_filter='int',
+            font_size='14sp',
+            size_hint_x=0.75
+        )
+        
+        copies_layout.add_widget(self.copies_input)
+        self.add_widget(copies_layout)
+        
         # Área do formulário dinâmico
         self.form_scroll = ScrollView(size_hint_y=0.6)
         self.form_container = BoxLayout(orientation='vertical', spacing=dp(10), size_hint_y=None)
@@ -523,7 +710,7 @@ class NFCWriterInterface(BoxLayout):
         self.add_widget(self.form_scroll)
         
         # Botões de ação
-        button_layout = GridLayout(cols=3, size_hint_y=None, height=dp(60), spacing=dp(8))
+        button_layout = GridLayout(cols=4, size_hint_y=None, height=dp(60), spacing=dp(8))
         
         preview_btn = Button(
             text='👁️\nPreview',
@@ -546,9 +733,17 @@ class NFCWriterInterface(BoxLayout):
         )
         write_btn.bind(on_press=self._write_tag)
         
+        bulk_btn = Button(
+            text='📦\nLote',
+            font_size='12sp',
+            background_color=(0.6, 0.4, 0.8, 1)
+        )
+        bulk_btn.bind(on_press=self._show_bulk_popup)
+        
         button_layout.add_widget(preview_btn)
         button_layout.add_widget(validate_btn)
         button_layout.add_widget(write_btn)
+        button_layout.add_widget(bulk_btn)
         self.add_widget(button_layout)
         
         # Carrega formulário inicial
@@ -603,7 +798,7 @@ class NFCWriterInterface(BoxLayout):
         
         # Campo de entrada
         if input_type == 'password':
-            text_input = TextInput(
+            text_input = Factory.TextInput(
                 hint_text=placeholder,
                 multiline=False,
                 password=True,
@@ -612,7 +807,7 @@ class NFCWriterInterface(BoxLayout):
                 height=dp(35)
             )
         elif input_type == 'spinner':
-            text_input = Spinner(
+            text_input = Factory.Spinner(
                 text=placeholder.split(',')[0] if placeholder else 'Selecione',
                 values=placeholder.split(',') if placeholder else ['Opção 1'],
                 font_size='14sp',
@@ -620,7 +815,7 @@ class NFCWriterInterface(BoxLayout):
                 height=dp(35)
             )
         else:
-            text_input = TextInput(
+            text_input = Factory.TextInput(
                 hint_text=placeholder,
                 multiline=multiline,
                 font_size='14sp',
@@ -1022,6 +1217,13 @@ class NFCWriterInterface(BoxLayout):
         else:
             preview = f"Preview para {data_type} não implementado"
         
+        # Tamanho exato da mensagem e menor tag compatível
+        size = capacity_planner.message_size([self._build_record_data(data_type, data)])
+        if size:
+            smallest = capacity_planner.smallest_tag(size)
+            preview += f"\n\n**Capacidade:**\n• Mensagem NDEF: {size} bytes"
+            preview += f"\n• Menor tag compatível: {smallest or 'nenhuma (reduza o conteúdo)'}"
+        
         # Mostra popup com preview
         content = ScrollView()
         label = Label(
@@ -1175,46 +1377,240 @@ class NFCWriterInterface(BoxLayout):
 • Instalação automática se necessário"""
     
     def _write_tag(self, instance):
-        """Escreve dados na tag"""
+        """Enfileira os dados e aguarda a aproximação das tags"""
         is_valid, data = self._validate_data(instance)
         
         if not is_valid:
             return
         
         data_type = self.data_type_spinner.text
+        records = [self._build_record_data(data_type, data)]
+        message = nfc_writer.encoder.encode_message(records)
+        
+        if not message:
+            self.status_label.text = '❌ Erro'
+            self.status_label.color = (0.8, 0.2, 0.2, 1)
+            self.app.show_popup('Erro', '❌ Não foi possível codificar os dados para NDEF')
+            return
         
-        # Simula escrita (funcionalidade real seria implementada aqui)
-        self.status_label.text = '✍️ Escrevendo...'
+        try:
+            copies = max(1, int(self.copies_input.text or 1))
+        except ValueError:
+            copies = 1
+        
+        content_summary = self._generate_content_summary(data_type, data)
+        # Identifica esta mensagem e este fluxo na sessão compartilhada (ex.: com um lote)
+        write_key = object()
+        # Com os registros de origem o planejador pode recodificar para tags menores
+        nfc_writer.queue_message(message, content_summary, 1, copies=copies, key=write_key,
+                                 records=records, on_result=self._on_tag_written,
+                                 allow_lossy=get_config('nfc').get('allow_lossy_fit', False))
+        
+        if not nfc_writer.start_write_session(owner=write_key):
+            nfc_writer.session.discard(write_key)
+            self.status_label.text = '❌ NFC indisponível'
+            self.status_label.color = (0.8, 0.2, 0.2, 1)
+            self.app.show_popup(
+                'Escrita NFC',
+                '❌ Escrita disponível apenas em dispositivo Android\n'
+                'com NFC ativado.'
+            )
+            return
+        
+        self.current_write = {'data_type': data_type, 'data': data, 'summary': content_summary,
+                              'key': write_key, 'written': 0, 'failed': 0}
+        self.status_label.text = f'📲 Aproxime {nfc_writer.session.pending_count()} tag(s)'
         self.status_label.color = (0.9, 0.7, 0.2, 1)
+    
+    def _on_tag_written(self, result):
+        """Callback da sessão de escrita (executado fora da thread principal)"""
+        Clock.schedule_once(lambda dt: self._show_write_result(result))
+    
+    def _show_write_result(self, result):
+        """Atualiza a interface com o resultado de uma tag gravada"""
+        remaining = result['remaining']
+        write_info = getattr(self, 'current_write', None) or {}
+        if write_info.get('key') is result['key']:
+            write_info['written' if result['success'] else 'failed'] += 1
         
-        # Simula delay de escrita
-        def finish_write(dt):
-            self.status_label.text = '✅ Gravado!'
+        if result['success']:
+            self.status_label.text = f"✅ Gravado! ({result['latency_ms']:.0f} ms)"
             self.status_label.color = (0.2, 0.7, 0.2, 1)
             
             # Adiciona ao histórico como "escrita"
-            content_summary = self._generate_content_summary(data_type, data)
             self.app.history_manager.add_reading(
-                f"Escrita: {data_type}",
-                content_summary,
-                str(data)
+                f"Escrita: {write_info.get('data_type', 'NDEF')}",
+                result['label'],
+                str(write_info.get('data', ''))
             )
+        else:
+            self.status_label.text = f"❌ {result['error'][:30]}"
+            self.status_label.color = (0.8, 0.2, 0.2, 1)
+        
+        if remaining:
+            self.status_label.text += f' • faltam {remaining}'
+        else:
+            # Sai da sessão; ela continua ativa se um lote ainda tiver tags na fila
+            nfc_writer.stop_write_session(owner=result['key'])
+            self.app.show_popup(
+                'Escrita Concluída',
+                f"✅ **TAGS GRAVADAS COM SUCESSO!**\n\n"
+                f"**Conteúdo:** {result['label']}\n"
+                f"**Gravadas:** {write_info.get('written', 0)} • **Falhas:** {write_info.get('failed', 0)}\n"
+                f"**Última latência:** {result['latency_ms']:.0f} ms\n\n"
+                f"💡 Use a aba 🔍 Ler para testar a tag"
+            )
+    
+    def _show_bulk_popup(self, instance):
+        """Mostra o painel de gravação em lote (CSV/JSON/JSONL)"""
+        content = BoxLayout(orientation='vertical', spacing=dp(10), padding=dp(10))
+        
+        content.add_widget(Label(text='📁 Arquivo CSV, JSON ou JSONL:', size_hint_y=None, height=dp(25)))
+        path_input = Factory.TextInput(
+            text=getattr(self, 'bulk_source_path', ''),
+            hint_text='/sdcard/Download/tags.csv',
+            multiline=False,
+            size_hint_y=None,
+            height=dp(35)
+        )
+        content.add_widget(path_input)
+        
+        progress_label = Label(
+            text='📊 Aguardando início',
+            halign='left',
+            valign='top',
+            font_size='13sp'
+        )
+        progress_label.bind(size=progress_label.setter('text_size'))
+        content.add_widget(progress_label)
+        
+        button_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(50), spacing=dp(10))
+        start_btn = Button(text='▶️ Iniciar/Retomar', background_color=(0.2, 0.8, 0.2, 1))
+        stop_btn = Button(text='⏹️ Parar', background_color=(0.9, 0.3, 0.3, 1))
+        close_btn = Button(text='❌ Fechar', background_color=(0.5, 0.5, 0.5, 1))
+        button_layout.add_widget(start_btn)
+        button_layout.add_widget(stop_btn)
+        button_layout.add_widget(close_btn)
+        content.add_widget(button_layout)
+        
+        popup = Popup(title='📦 Gravação em Lote', content=content, size_hint=(0.9, 0.7))
+        
+        def show_progress(dt=None):
+            job = getattr(self, 'bulk_job', None)
+            if not job:
+                return
+            progress = job.get_progress()
+            state = '✅ Concluído' if progress['finished'] else ('📲 Aproxime as tags' if progress['running'] else '⏸️ Parado')
+            progress_label.text = (
+                f"{state}\n\n"
+                f"✍️ Gravadas: {progress['written']}\n"
+                f"⏭️ Ignoradas: {progress['skipped']}\n"
+                f"📄 Linhas lidas: {progress['rows_read']}\n"
+                f"⚡ Vazão: {progress['tags_per_minute']:.1f} tags/min\n"
+                f"⏱️ Tempo: {progress['elapsed']:.0f} s"
+            )
+            self.status_label.text = f"📦 {progress['written']} gravadas"
+        
+        def start_job(btn):
+            path = path_input.text.strip()
+            if not path or BulkProvisioningJob is None:
+                self.app.show_popup('Erro', 'Informe o caminho do arquivo CSV/JSON/JSONL!')
+                return
             
-            success_msg = f"""✅ **TAG GRAVADA COM SUCESSO!**
-
-**Tipo:** {data_type}
-**Conteúdo:** {content_summary}
-
-A tag NFC está pronta para uso!
-
-💡 **Teste a tag:**
-• Aproxime outro celular NFC
-• Verifique se a ação acontece automaticamente
-• Use a aba 🔍 Ler para testar"""
+            job = getattr(self, 'bulk_job', None)
+            if job and job.running:
+                return
             
-            self.app.show_popup('Escrita Concluída', success_msg)
+            self.bulk_source_path = path
+            self.bulk_job = BulkProvisioningJob(path)
+            on_progress = lambda progress: Clock.schedule_once(show_progress)
+            if not self.bulk_job.start(on_progress=on_progress):
+                self.app.show_popup('Erro', '❌ Não foi possível iniciar o lote.\n'
+                                            'Verifique o arquivo e se o NFC está ativo.')
+                return
+            show_progress()
         
-        Clock.schedule_once(finish_write, 2.0)
+        def stop_job(btn):
+            job = getattr(self, 'bulk_job', None)
+            if job:
+                job.stop()
+                show_progress()
+        
+        refresh_event = Clock.schedule_interval(show_progress, 1.0)
+        
+        def on_dismiss(popup_instance):
+            if refresh_event:
+                refresh_event.cancel()
+        
+        start_btn.bind(on_press=start_job)
+        stop_btn.bind(on_press=stop_job)
+        close_btn.bind(on_press=popup.dismiss)
+        popup.bind(on_dismiss=on_dismiss)
+        
+        show_progress()
+        popup.open()
+    
+    def _build_record_data(self, data_type, data):
+        """Converte os dados do formulário em registro do NFCDataBuilder"""
+        if data_type == 'Texto Simples':
+            return data_builder.build_text_record(data.get('text', ''))
+        elif data_type == 'URL/Link':
+            return data_builder.build_uri_record(data.get('url', ''))
+        elif data_type == 'Wi-Fi Network':
+            return data_builder.build_wifi_record(
+                data.get('ssid', ''),
+                data.get('password', ''),
+                data.get('security', 'WPA/WPA2'),
+                data.get('hidden') == 'Sim'
+            )
+        elif data_type == 'E-mail':
+            return data_builder.build_email_record(
+                data.get('email', ''), data.get('subject', ''), data.get('body', '')
+            )
+        elif data_type == 'Telefone':
+            return data_builder.build_phone_record(data.get('phone', ''))
+        elif data_type == 'SMS':
+            return data_builder.build_sms_record(data.get('phone', ''), data.get('message', ''))
+        elif data_type == 'Contato vCard':
+            return data_builder.build_contact_record(
+                data.get('name', ''), data.get('phone', ''),
+                data.get('email', ''), data.get('company', '')
+            )
+        elif data_type == 'Localização GPS':
+            return data_builder.build_location_record(
+                data.get('latitude', ''), data.get('longitude', ''), data.get('name', '')
+            )
+        elif data_type == 'Evento Calendário':
+            return data_builder.build_custom_record('text/calendar', self._build_vcalendar(data))
+        elif data_type == 'Aplicativo':
+            return data_builder.build_app_launcher_record(data.get('package', ''))
+        else:
+            return data_builder.build_text_record(str(data))
+    
+    @staticmethod
+    def _build_vcalendar(data):
+        """Gera evento no formato vCalendar"""
+        def ical_datetime(date, time):
+            value = date.replace('-', '')
+            if time:
+                value += 'T' + time.replace(':', '').ljust(6, '0')
+            return value
+        
+        lines = [
+            'BEGIN:VCALENDAR',
+            'VERSION:2.0',
+            'BEGIN:VEVENT',
+            f"SUMMARY:{data.get('title', '')}",
+            f"DTSTART:{ical_datetime(data.get('start_date', ''), data.get('start_time', ''))}"
+        ]
+        if data.get('end_date'):
+            lines.append(f"DTEND:{ical_datetime(data['end_date'], data.get('end_time', ''))}")
+        if data.get('location'):
+            lines.append(f"LOCATION:{data['location']}")
+        if data.get('description'):
+            lines.append(f"DESCRIPTION:{data['description']}")
+        lines += ['END:VEVENT', 'END:VCALENDAR']
+        return '\n'.join(lines)
     
     def _generate_content_summary(self, data_type, data):
         """Gera resumo do conteúdo para o histórico"""
@@ -1282,13 +1678,21 @@ class NFCProfileInterface(BoxLayout):
         header_layout.add_widget(self.profile_count_label)
         self.add_widget(header_layout)
         
-        # Lista de perfis
-        self.profiles_scroll = ScrollView(size_hint_y=0.6)
-        self.profiles_container = BoxLayout(orientation='vertical', spacing=dp(8), size_hint_y=None)
-        self.profiles_container.bind(minimum_height=self.profiles_container.setter('height'))
-        
-        self.profiles_scroll.add_widget(self.profiles_container)
-        self.add_widget(self.profiles_scroll)
+        # Lista de perfis (virtualizada)
+        from ui_lists import build_recycle_list, ProfileRow
+        self.profiles_holder = BoxLayout(size_hint_y=0.6)
+        self.profiles_list = build_recycle_list(ProfileRow, dp(120), dp(8))
+        self.profiles_empty_label = Label(
+            text='📋 Nenhum perfil criado ainda.\n\n'
+                 '💡 Toque em "Novo" para criar seu primeiro perfil!\n\n'
+                 '✨ Perfis permitem salvar configurações\n'
+                 'para reutilizar rapidamente.',
+            halign='center',
+            valign='middle',
+            font_size='14sp',
+            color=(0.6, 0.6, 0.6, 1)
+        )
+        self.add_widget(self.profiles_holder)
         
         # Botões de ação
         button_layout = GridLayout(cols=3, size_hint_y=None, height=dp(60), spacing=dp(8))
@@ -1356,154 +1760,41 @@ class NFCProfileInterface(BoxLayout):
         ]
     
     def _refresh_profiles_list(self):
-        """Atualiza a lista de perfis na interface"""
-        self.profiles_container.clear_widgets()
-        
-        if not self.profiles:
-            empty_label = Label(
-                text='📋 Nenhum perfil criado ainda.\n\n'
-                     '💡 Toque em "Novo" para criar seu primeiro perfil!\n\n'
-                     '✨ Perfis permitem salvar configurações\n'
-                     'para reutilizar rapidamente.',
-                halign='center',
-                valign='middle',
-                font_size='14sp',
-                color=(0.6, 0.6, 0.6, 1)
-            )
-            self.profiles_container.add_widget(empty_label)
-        else:
-            for profile in self.profiles:
-                profile_widget = self._create_profile_widget(profile)
-                self.profiles_container.add_widget(profile_widget)
-        
-        # Atualiza contador
-        self.profile_count_label.text = f'📊 {len(self.profiles)} perfis'
+        """Sincroniza toda a lista de perfis com a interface"""
+        self.profiles_list.data = [self._profile_row_data(profile) for profile in self.profiles]
+        self._update_profiles_state()
     
-    def _create_profile_widget(self, profile):
-        """Cria widget para um perfil"""
-        # Container principal
-        profile_layout = BoxLayout(
-            orientation='vertical',
-            size_hint_y=None,
-            height=dp(120),
-            spacing=dp(5)
-        )
-        
-        # Card do perfil
-        card = BoxLayout(
-            orientation='horizontal',
-            padding=dp(10),
-            spacing=dp(10)
-        )
-        
-        # Ícone baseado no tipo
-        type_icons = {
-            'wifi': '📶',
-            'vcard': '👤',
-            'url': '🌐',
-            'email': '📧',
-            'phone': '📞',
-            'sms': '💬',
-            'location': '📍',
-            'calendar': '📅',
-            'app': '📱',
-            'text': '📝'
+    def _profile_row_data(self, profile):
+        """Dados de exibição de uma linha de perfil"""
+        from ui_lists import PROFILE_TYPE_ICONS
+        return {
+            'owner': self,
+            'profile': profile,
+            'icon': PROFILE_TYPE_ICONS.get(profile['type'], '📄'),
+            'name': profile['name'],
+            'description': profile['description'],
+            'stats': f"📊 {profile['uses']} usos • 📅 {profile['created']}"
         }
+    
+    def _profile_row_index(self, profile):
+        for index, item in enumerate(self.profiles):
+            if item is profile:
+                return index
+        return -1
+    
+    def _update_profile_row(self, profile):
+        """Atualiza somente a linha do perfil alterado"""
+        index = self._profile_row_index(profile)
+        if index >= 0:
+            self.profiles_list.data[index] = self._profile_row_data(profile)
+    
+    def _update_profiles_state(self):
+        from ui_lists import show_list_or_empty
+        show_list_or_empty(self.profiles_holder, self.profiles_list,
+                           self.profiles_empty_label, not self.profiles)
         
-        icon = Label(
-            text=type_icons.get(profile['type'], '📄'),
-            font_size='24sp',
-            size_hint_x=None,
-            width=dp(40)
-        )
-        
-        # Informações do perfil
-        info_layout = BoxLayout(orientation='vertical', spacing=dp(2))
-        
-        name_label = Label(
-            text=profile['name'],
-            font_size='16sp',
-            bold=True,
-            halign='left',
-            size_hint_y=None,
-            height=dp(25)
-        )
-        name_label.bind(size=name_label.setter('text_size'))
-        
-        desc_label = Label(
-            text=profile['description'],
-            font_size='12sp',
-            color=(0.6, 0.6, 0.6, 1),
-            halign='left',
-            size_hint_y=None,
-            height=dp(20)
-        )
-        desc_label.bind(size=desc_label.setter('text_size'))
-        
-        stats_label = Label(
-            text=f"📊 {profile['uses']} usos • 📅 {profile['created']}",
-            font_size='10sp',
-            color=(0.5, 0.5, 0.5, 1),
-            halign='left',
-            size_hint_y=None,
-            height=dp(15)
-        )
-        stats_label.bind(size=stats_label.setter('text_size'))
-        
-        info_layout.add_widget(name_label)
-        info_layout.add_widget(desc_label)
-        info_layout.add_widget(stats_label)
-        
-        # Botões de ação
-        actions_layout = BoxLayout(orientation='vertical', size_hint_x=None, width=dp(80), spacing=dp(3))
-        
-        use_btn = Button(
-            text='▶️',
-            font_size='14sp',
-            size_hint_y=None,
-            height=dp(30),
-            background_color=(0.2, 0.8, 0.2, 1)
-        )
-        use_btn.bind(on_press=lambda x: self._use_profile(profile))
-        
-        edit_btn = Button(
-            text='✏️',
-            font_size='14sp',
-            size_hint_y=None,
-            height=dp(30),
-            background_color=(0.2, 0.6, 1, 1)
-        )
-        edit_btn.bind(on_press=lambda x: self._edit_profile(profile))
-        
-        delete_btn = Button(
-            text='🗑️',
-            font_size='14sp',
-            size_hint_y=None,
-            height=dp(30),
-            background_color=(0.9, 0.3, 0.3, 1)
-        )
-        delete_btn.bind(on_press=lambda x: self._delete_profile(profile))
-        
-        actions_layout.add_widget(use_btn)
-        actions_layout.add_widget(edit_btn)
-        actions_layout.add_widget(delete_btn)
-        
-        card.add_widget(icon)
-        card.add_widget(info_layout)
-        card.add_widget(actions_layout)
-        
-        profile_layout.add_widget(card)
-        
-        # Linha separadora
-        separator = Label(
-            text='─' * 50,
-            size_hint_y=None,
-            height=dp(10),
-            color=(0.8, 0.8, 0.8, 1)
-        )
-        profile_layout.add_widget(separator)
-        
-        return profile_layout
+        # Atualiza contador
+        self.profile_count_label.text = f'📊 {len(self.profiles)} perfis'
     
     def _show_create_profile_form(self, instance):
         """Mostra formulário para criar novo perfil"""
@@ -1520,7 +1811,7 @@ class NFCProfileInterface(BoxLayout):
         
         # Nome do perfil
         content.add_widget(Label(text='📝 Nome do Perfil:', size_hint_y=None, height=dp(25)))
-        name_input = TextInput(
+        name_input = Factory.TextInput(
             text=profile['name'] if profile else '',
             hint_text='Ex: Wi-Fi Casa, Meu Cartão...',
             size_hint_y=None,
@@ -1531,7 +1822,7 @@ class NFCProfileInterface(BoxLayout):
         
         # Descrição
         content.add_widget(Label(text='📋 Descrição:', size_hint_y=None, height=dp(25)))
-        desc_input = TextInput(
+        desc_input = Factory.TextInput(
             text=profile['description'] if profile else '',
             hint_text='Breve descrição do perfil...',
             multiline=True,
@@ -1543,7 +1834,7 @@ class NFCProfileInterface(BoxLayout):
         
         # Tipo de dados
         content.add_widget(Label(text='🏷️ Tipo de Dados:', size_hint_y=None, height=dp(25)))
-        type_spinner = Spinner(
+        type_spinner = Factory.Spinner(
             text=profile['type'] if profile else 'text',
             values=['text', 'url', 'wifi', 'email', 'phone', 'sms', 'vcard', 'location', 'calendar', 'app'],
             size_hint_y=None,
@@ -1554,7 +1845,7 @@ class NFCProfileInterface(BoxLayout):
         
         # Dados (JSON)
         content.add_widget(Label(text='📦 Dados (JSON):', size_hint_y=None, height=dp(25)))
-        data_input = TextInput(
+        data_input = Factory.TextInput(
             text=json.dumps(profile['data'], indent=2) if profile else '{}',
             hint_text='{"key": "value"}',
             multiline=True,
@@ -1622,6 +1913,7 @@ class NFCProfileInterface(BoxLayout):
                     'type': profile_type,
                     'data': data
                 })
+                self._update_profile_row(existing_profile)
                 success_msg = f'✅ Perfil "{name}" atualizado com sucesso!'
             else:
                 # Criar novo perfil
@@ -1635,10 +1927,11 @@ class NFCProfileInterface(BoxLayout):
                     'uses': 0
                 }
                 self.profiles.append(new_profile)
+                self.profiles_list.data.append(self._profile_row_data(new_profile))
                 success_msg = f'✅ Perfil "{name}" criado com sucesso!'
             
             # Atualiza interface
-            self._refresh_profiles_list()
+            self._update_profiles_state()
             popup.dismiss()
             self.app.show_popup('Sucesso', success_msg)
             
@@ -1681,8 +1974,11 @@ class NFCProfileInterface(BoxLayout):
         )
         
         def confirm_delete(instance):
-            self.profiles.remove(profile)
-            self._refresh_profiles_list()
+            index = self._profile_row_index(profile)
+            if index >= 0:
+                del self.profiles[index]
+                del self.profiles_list.data[index]
+            self._update_profiles_state()
             popup.dismiss()
             self.app.show_popup('Sucesso', f'✅ Perfil "{profile["name"]}" excluído!')
         
@@ -1712,7 +2008,7 @@ O perfil foi aplicado e está pronto para ser gravado em uma tag NFC.
         self.app.show_popup('Perfil Aplicado', success_msg)
         
         # Atualiza contador de usos
-        self._refresh_profiles_list()
+        self._update_profile_row(profile)
         
         # Adiciona ao histórico
         self.app.history_manager.add_reading(
@@ -1753,7 +2049,8 @@ O perfil foi aplicado e está pronto para ser gravado em uma tag NFC.
         ]
         
         self.profiles.extend(sample_profiles)
-        self._refresh_profiles_list()
+        self.profiles_list.data.extend(self._profile_row_data(profile) for profile in sample_profiles)
+        self._update_profiles_state()
         
         self.app.show_popup(
             'Importação',
@@ -1813,7 +2110,7 @@ class NFCAutomationInterface(BoxLayout):
             size_hint_x=0.7
         )
         
-        automation_toggle = Switch(
+        automation_toggle = Factory.Switch(
             active=self.automation_enabled,
             size_hint_x=0.3
         )
@@ -1874,13 +2171,18 @@ class NFCAutomationInterface(BoxLayout):
             halign='left'
         ))
         
-        # Lista de regras
-        self.rules_scroll = ScrollView(size_hint_y=0.4)
-        self.rules_container = BoxLayout(orientation='vertical', spacing=dp(5), size_hint_y=None)
-        self.rules_container.bind(minimum_height=self.rules_container.setter('height'))
-        
-        self.rules_scroll.add_widget(self.rules_container)
-        self.add_widget(self.rules_scroll)
+        # Lista de regras (virtualizada)
+        from ui_lists import build_recycle_list, RuleRow
+        self.rules_holder = BoxLayout(size_hint_y=0.4)
+        self.rules_list = build_recycle_list(RuleRow, dp(80), dp(5))
+        self.rules_empty_label = Label(
+            text='📋 Nenhuma regra configurada.\n\nCrie regras para automatizar ações quando\ncertas tags NFC forem detectadas.',
+            halign='center',
+            valign='middle',
+            font_size='12sp',
+            color=(0.6, 0.6, 0.6, 1)
+        )
+        self.add_widget(self.rules_holder)
         
         # Botões de gerenciamento
         management_layout = GridLayout(cols=3, size_hint_y=None, height=dp(50), spacing=dp(8))
@@ -2024,139 +2326,49 @@ class NFCAutomationInterface(BoxLayout):
         ]
     
     def _refresh_rules_list(self):
-        """Atualiza lista de regras"""
-        self.rules_container.clear_widgets()
-        
-        if not self.automation_rules:
-            empty_label = Label(
-                text='📋 Nenhuma regra configurada.\n\nCrie regras para automatizar ações quando\ncertas tags NFC forem detectadas.',
-                halign='center',
-                valign='middle',
-                font_size='12sp',
-                color=(0.6, 0.6, 0.6, 1)
-            )
-            self.rules_container.add_widget(empty_label)
-        else:
-            for rule in self.automation_rules:
-                rule_widget = self._create_rule_widget(rule)
-                self.rules_container.add_widget(rule_widget)
-    
-    def _create_rule_widget(self, rule):
-        """Cria widget para uma regra"""
-        rule_layout = BoxLayout(
-            orientation='horizontal',
-            size_hint_y=None,
-            height=dp(80),
-            padding=dp(5),
-            spacing=dp(10)
-        )
-        
-        # Status da regra
-        status_icon = Label(
-            text='✅' if rule['active'] else '⏸️',
-            font_size='16sp',
-            size_hint_x=None,
-            width=dp(30)
-        )
-        
-        # Informações da regra
-        info_layout = BoxLayout(orientation='vertical', spacing=dp(2))
-        
-        name_label = Label(
-            text=rule['name'],
-            font_size='14sp',
-            bold=True,
-            halign='left',
-            size_hint_y=None,
-            height=dp(20)
-        )
-        name_label.bind(size=name_label.setter('text_size'))
-        
-        trigger_label = Label(
-            text=f"🎯 {rule['trigger']}",
-            font_size='11sp',
-            color=(0.6, 0.6, 0.6, 1),
-            halign='left',
-            size_hint_y=None,
-            height=dp(18)
-        )
-        trigger_label.bind(size=trigger_label.setter('text_size'))
-        
+        """Sincroniza toda a lista de regras com a interface"""
+        self.rules_list.data = [self._rule_row_data(rule) for rule in self.automation_rules]
+        self._update_rules_state()
+    
+    def _rule_row_data(self, rule):
+        """Dados de exibição de uma linha de regra"""
         actions_text = ' • '.join(rule['actions'][:2])
         if len(rule['actions']) > 2:
             actions_text += f' • +{len(rule["actions"]) - 2} mais'
         
-        actions_label = Label(
-            text=f"⚡ {actions_text}",
-            font_size='10sp',
-            color=(0.5, 0.5, 0.5, 1),
-            halign='left',
-            size_hint_y=None,
-            height=dp(16)
-        )
-        actions_label.bind(size=actions_label.setter('text_size'))
-        
-        uses_label = Label(
-            text=f"📊 {rule['uses']} execuções",
-            font_size='9sp',
-            color=(0.4, 0.4, 0.4, 1),
-            halign='left',
-            size_hint_y=None,
-            height=dp(14)
-        )
-        uses_label.bind(size=uses_label.setter('text_size'))
-        
-        info_layout.add_widget(name_label)
-        info_layout.add_widget(trigger_label)
-        info_layout.add_widget(actions_label)
-        info_layout.add_widget(uses_label)
-        
-        # Botões de ação
-        actions_layout = BoxLayout(orientation='horizontal', size_hint_x=None, width=dp(120), spacing=dp(3))
-        
-        toggle_btn = Button(
-            text='▶️' if not rule['active'] else '⏸️',
-            font_size='12sp',
-            size_hint_x=None,
-            width=dp(35),
-            background_color=(0.2, 0.8, 0.2, 1) if not rule['active'] else (0.9, 0.7, 0.2, 1)
-        )
-        toggle_btn.bind(on_press=lambda x: self._toggle_rule(rule))
-        
-        edit_btn = Button(
-            text='✏️',
-            font_size='12sp',
-            size_hint_x=None,
-            width=dp(35),
-            background_color=(0.2, 0.6, 1, 1)
-        )
-        edit_btn.bind(on_press=lambda x: self._edit_rule(rule))
-        
-        delete_btn = Button(
-            text='🗑️',
-            font_size='12sp',
-            size_hint_x=None,
-            width=dp(35),
-            background_color=(0.9, 0.3, 0.3, 1)
-        )
-        delete_btn.bind(on_press=lambda x: self._delete_rule(rule))
-        
-        actions_layout.add_widget(toggle_btn)
-        actions_layout.add_widget(edit_btn)
-        actions_layout.add_widget(delete_btn)
-        
-        rule_layout.add_widget(status_icon)
-        rule_layout.add_widget(info_layout)
-        rule_layout.add_widget(actions_layout)
-        
-        return rule_layout
+        return {
+            'owner': self,
+            'rule': rule,
+            'active': rule['active'],
+            'name': rule['name'],
+            'trigger': f"🎯 {rule['trigger']}",
+            'actions': f"⚡ {actions_text}",
+            'uses': f"📊 {rule['uses']} execuções"
+        }
+    
+    def _rule_row_index(self, rule):
+        for index, item in enumerate(self.automation_rules):
+            if item is rule:
+                return index
+        return -1
+    
+    def _update_rule_row(self, rule):
+        """Atualiza somente a linha da regra alterada"""
+        index = self._rule_row_index(rule)
+        if index >= 0:
+            self.rules_list.data[index] = self._rule_row_data(rule)
+    
+    def _update_rules_state(self):
+        from ui_lists import show_list_or_empty
+        show_list_or_empty(self.rules_holder, self.rules_list,
+                           self.rules_empty_label, not self.automation_rules)
     
     def _toggle_rule(self, rule):
         """Ativa/desativa uma regra"""
         rule['active'] = not rule['active']
         status = 'ativada' if rule['active'] else 'desativada'
         self.app.show_popup('Regra Atualizada', f'✅ Regra "{rule["name"]}" {status}!')
-        self._refresh_rules_list()
+        self._update_rule_row(rule)
     
     def _edit_rule(self, rule):
         """Edita uma regra"""
@@ -2164,8 +2376,11 @@ class NFCAutomationInterface(BoxLayout):
     
     def _delete_rule(self, rule):
         """Deleta uma regra"""
-        self.automation_rules.remove(rule)
-        self._refresh_rules_list()
+        index = self._rule_row_index(rule)
+        if index >= 0:
+            del self.automation_rules[index]
+            del self.rules_list.data[index]
+        self._update_rules_state()
         self.app.show_popup('Regra Removida', f'🗑️ Regra "{rule["name"]}" removida!')
     
     def _create_automation_rule(self, instance):
@@ -2178,7 +2393,7 @@ class NFCAutomationInterface(BoxLayout):
         
         # Nome da regra
         content.add_widget(Label(text='📝 Nome da Regra:', size_hint_y=None, height=dp(25)))
-        name_input = TextInput(
+        name_input = Factory.TextInput(
             text=rule['name'] if rule else '',
             hint_text='Ex: Wi-Fi Casa, Modo Carro...',
             size_hint_y=None,
@@ -2187,7 +2402,7 @@ class NFCAutomationInterface(BoxLayout):
         
         # Trigger
         content.add_widget(Label(text='🎯 Gatilho (quando executar):', size_hint_y=None, height=dp(25)))
-        trigger_input = TextInput(
+        trigger_input = Factory.TextInput(
             text=rule['trigger'] if rule else '',
             hint_text='Ex: Tag "Casa" detectada',
             size_hint_y=None,
@@ -2196,7 +2411,7 @@ class NFCAutomationInterface(BoxLayout):
         
         # Ações
         content.add_widget(Label(text='⚡ Ações (uma por linha):', size_hint_y=None, height=dp(25)))
-        actions_input = TextInput(
+        actions_input = Factory.TextInput(
             text='\n'.join(rule['actions']) if rule else '',
             hint_text='Ativar Wi-Fi\nConectar à rede\nAbrir aplicativo',
             multiline=True,
@@ -2241,6 +2456,7 @@ class NFCAutomationInterface(BoxLayout):
                     'trigger': trigger,
                     'actions': actions
                 })
+                self._update_rule_row(rule)
                 msg = f'✅ Regra "{name}" atualizada!'
             else:
                 new_rule = {
@@ -2252,9 +2468,10 @@ class NFCAutomationInterface(BoxLayout):
                     'uses': 0
                 }
                 self.automation_rules.append(new_rule)
+                self.rules_list.data.append(self._rule_row_data(new_rule))
                 msg = f'✅ Regra "{name}" criada!'
             
-            self._refresh_rules_list()
+            self._update_rules_state()
             popup.dismiss()
             self.app.show_popup('Sucesso', msg)
         
@@ -2356,12 +2573,18 @@ class NFCAutomationInterface(BoxLayout):
 
 
 class ModernNFCProInterface(TabbedPanel):
-    """Interface principal com abas para todas as funcionalidades PRO"""
+    """Interface principal com abas para todas as funcionalidades PRO
+
+    Só a aba de leitura é construída na abertura; as demais são criadas
+    na primeira vez em que são selecionadas (ou acessadas pelo código).
+    """
     
     def __init__(self, app_instance, **kwargs):
         super().__init__(**kwargs)
         self.app = app_instance
         self.do_default_tab = False
+        self._tab_builders = {}
+        self._tab_interfaces = {}
         
         self._setup_tabs()
     
@@ -2373,26 +2596,51 @@ class ModernNFCProInterface(TabbedPanel):
         read_tab.content = self.reader_interface
         self.add_widget(read_tab)
         
-        # Aba de Escrita
-        write_tab = TabbedPanelItem(text='✍️ Escrever')
-        self.writer_interface = NFCWriterInterface(self.app)
-        write_tab.content = self.writer_interface
-        self.add_widget(write_tab)
-        
-        # Aba de Perfis
-        profiles_tab = TabbedPanelItem(text='👤 Perfis')
-        self.profiles_interface = NFCProfileInterface(self.app)
-        profiles_tab.content = self.profiles_interface
-        self.add_widget(profiles_tab)
-        
-        # Aba de Automação
-        automation_tab = TabbedPanelItem(text='🤖 Auto')
-        self.automation_interface = NFCAutomationInterface(self.app)
-        automation_tab.content = self.automation_interface
-        self.add_widget(automation_tab)
+        # Abas construídas sob demanda
+        self._add_lazy_tab('writer', '✍️ Escrever', NFCWriterInterface)
+        self._add_lazy_tab('profiles', '👤 Perfis', NFCProfileInterface)
+        self._add_lazy_tab('automation', '🤖 Auto', NFCAutomationInterface)
         
         # Define aba padrão
         self.default_tab = read_tab
+    
+    def _add_lazy_tab(self, key, title, interface_class):
+        """Adiciona aba cujo conteúdo é criado na primeira seleção"""
+        tab = TabbedPanelItem(text=title)
+        self._tab_builders[key] = (tab, interface_class)
+        self.add_widget(tab)
+    
+    def _get_tab_interface(self, key):
+        """Retorna a interface da aba, construindo-a se necessário"""
+        interface = self._tab_interfaces.get(key)
+        if interface is None:
+            tab, interface_class = self._tab_builders[key]
+            start = time.perf_counter()
+            interface = interface_class(self.app)
+            tab.content = interface
+            self._tab_interfaces[key] = interface
+            logger.info(f"Aba '{key}' construída em {(time.perf_counter() - start) * 1000:.1f} ms")
+        return interface
+    
+    def switch_to(self, header, do_scroll=False):
+        """Constrói o conteúdo da aba antes de exibi-la"""
+        for key, (tab, _) in self._tab_builders.items():
+            if tab is header:
+                self._get_tab_interface(key)
+                break
+        super().switch_to(header, do_scroll=do_scroll)
+    
+    @property
+    def writer_interface(self):
+        return self._get_tab_interface('writer')
+    
+    @property
+    def profiles_interface(self):
+        return self._get_tab_interface('profiles')
+    
+    @property
+    def automation_interface(self):
+        return self._get_tab_interface('automation')
 
 
 class NfcReaderWriterProApp(App):
@@ -2404,12 +2652,32 @@ class NfcReaderWriterProApp(App):
         self.decoder = NFCDataDecoder()
         self.nfc_available = False
         self.android_classes_loaded = False
+        self.nfc_emulator = None
+        self.startup_metrics = {}
+        
+        # Descarta reentregas da mesma tag e reaproveita decodificações recentes
+        nfc_config = get_config('nfc')
+        self.tap_debouncer = TapDebouncer(
+            nfc_config.get('debounce_seconds', 2.0),
+            nfc_config.get('decode_cache_seconds', 30.0)
+        ) if TapDebouncer else None
+        
+        # Spans do toque (intent -> decodificação -> histórico -> tela)
+        debug_config = get_config('debug')
+        if debug_config.get('performance_monitoring', False):
+            tracer.enable()
+        
+        # Bytes NDEF da última tag, para o hexdump da tela de debug
+        self.show_raw_bytes = debug_config.get('show_raw_bytes', True)
+        self.last_ndef_messages = []  # mensagens NDEF brutas da última tag (sem cópia)
         
     def build(self):
         """Constrói a interface do usuário"""
         Window.clearcolor = (0.95, 0.95, 0.97, 1)  # Fundo claro
         
+        build_start = time.perf_counter()
         self.interface = ModernNFCProInterface(self)
+        self.startup_metrics['build_ms'] = (time.perf_counter() - build_start) * 1000
         
         # Agenda inicialização após a interface estar pronta
         Clock.schedule_once(self._post_build_init, 0.1)
@@ -2420,6 +2688,9 @@ class NfcReaderWriterProApp(App):
         """Inicialização após a construção da interface"""
         logger.info("Iniciando NFC Reader & Writer PRO...")
         
+        # Abre o histórico persistente já com a interface na tela
+        self.history_manager.load()
+        
         # Inicializa classes Android se disponível
         self.android_classes_loaded = initialize_android_classes()
         
@@ -2430,13 +2701,65 @@ class NfcReaderWriterProApp(App):
                 automation_engine.initialize()
             except Exception as e:
                 logger.warning(f"Erro ao inicializar módulos PRO: {e}")
+            
+            # Recebe novas intents (tags aproximadas com o app aberto)
+            try:
+                from android import activity
+                activity.bind(on_new_intent=self.on_new_intent)
+            except ImportError:
+                logger.warning("Módulo android indisponível - novas intents não serão recebidas")
+            
             self._check_nfc_availability()
+        elif get_config('debug').get('simulate_nfc', False):
+            self._start_nfc_simulation()
         else:
             self.interface.reader_interface.update_status(
                 '⚠️ Ambiente de desenvolvimento detectado',
                 '🔧 Funcionalidades PRO disponíveis apenas no Android'
             )
     
+    def _enable_nfc_simulation(self):
+        """Ativa o emulador de tags (caminho real de leitura, sem hardware)"""
+        global NfcAdapter, NdefMessage
+        
+        if self.nfc_emulator is None:
+            from nfc_emulator import TagEmulator, EmulatedNfcAdapter, EmulatedNdefMessage
+            
+            # No desktop as classes Android não existem: usa as emuladas
+            if NfcAdapter is None:
+                NfcAdapter = EmulatedNfcAdapter
+                NdefMessage = EmulatedNdefMessage
+            
+            rate = get_config('debug').get('simulate_nfc_rate', 2.0)
+            self.nfc_emulator = TagEmulator(self.handle_intent, rate)
+        return self.nfc_emulator
+    
+    def _start_nfc_simulation(self):
+        """Modo simulação: reproduz o dump configurado (ou tags sintéticas)"""
+        from nfc_emulator import load_dump, synthetic_tags
+        
+        emulator = self._enable_nfc_simulation()
+        dump_path = get_config('debug').get('simulate_nfc_dump')
+        try:
+            tags = load_dump(dump_path) if dump_path else synthetic_tags()
+        except (OSError, ValueError) as e:
+            logger.error(f"Erro ao carregar dump de tags {dump_path}: {e}")
+            tags = synthetic_tags()
+        
+        self.interface.reader_interface.update_status(
+            f'🧪 Simulação NFC ativa ({len(tags)} tags)',
+            f'⏱️ Reproduzindo a {emulator.rate_hz:g} tags/s'
+        )
+        emulator.replay(tags, on_done=self._on_simulation_done)
+    
+    def _on_simulation_done(self, stats):
+        """Resumo de vazão ao fim de um replay do emulador"""
+        suppressed = f" ({stats['suppressed']} repetidas ignoradas)" if stats.get('suppressed') else ''
+        self.interface.reader_interface.update_status(
+            f"🧪 Simulação concluída: {stats['taps']} tags{suppressed}",
+            f"⏱️ média {stats['mean_ms']:.1f} ms/tag, p95 {stats['p95_ms']:.1f} ms"
+        )
+    
     def _check_nfc_availability(self):
         """Verifica se o NFC está disponível e ativo"""
         try:
@@ -2483,13 +2806,54 @@ class NfcReaderWriterProApp(App):
     def on_start(self):
         """Chamado quando o aplicativo inicia"""
         logger.info("NFC Reader & Writer PRO iniciado")
+        # Executa no próximo quadro, logo após o primeiro desenho da janela
+        Clock.schedule_once(self._on_first_frame, 0)
+    
+    def _on_first_frame(self, dt):
+        """Mede o tempo até o primeiro quadro (abertura do app)"""
+        first_frame = time.perf_counter() - STARTUP_TIME
+        self.startup_metrics['first_frame_ms'] = first_frame * 1000
+        logger.info(
+            f"Tempo até o primeiro quadro: {self.startup_metrics['first_frame_ms']:.0f} ms "
+            f"(build: {self.startup_metrics.get('build_ms', 0):.0f} ms)"
+        )
+        performance_monitor.record('startup.first_frame', first_frame)
+
+    def on_pause(self):
+        """Chamado quando o app vai para o background"""
+        # O foreground dispatch só pode ficar ativo com a atividade em primeiro plano
+        if self._write_session_active():
+            nfc_writer.disable_foreground_dispatch()
+        # O Android pode encerrar o app em background sem chamar on_stop
+        self._flush_profile_index()
+        return True
+
+    def on_stop(self):
+        """Chamado ao encerrar o app"""
+        self._flush_profile_index()
+
+    def _flush_profile_index(self):
+        """Grava o índice de perfis pendente, sem construir o gerenciador"""
+        try:
+            from services import services
+            if services.is_initialized('profile_manager'):
+                services.get('profile_manager').flush_index()
+        except Exception as e:
+            logger.error(f"Erro ao salvar índice de perfis: {e}")
 
     def on_resume(self):
         """Chamado quando o app retorna do background"""
         logger.info("App retomado")
         if self.android_classes_loaded:
+            if self._write_session_active():
+                nfc_writer.enable_foreground_dispatch()
             Clock.schedule_once(lambda dt: self._check_launch_intent(), 0.1)
 
+    def _write_session_active(self):
+        """Indica se há uma sessão de escrita aguardando tags"""
+        session = getattr(nfc_writer, 'session', None)
+        return bool(getattr(session, 'active', False))
+
     def _check_launch_intent(self):
         """Verifica se o app foi iniciado por uma intent NFC"""
         if not self.android_classes_loaded:
@@ -2506,52 +2870,127 @@ class NfcReaderWriterProApp(App):
     def on_new_intent(self, intent):
         """Chamado quando uma nova intent é recebida (tag aproximada)"""
         logger.info("Nova intent recebida")
-        self.handle_intent(intent)
+        received = tracer.now()
+        # Chamado na thread de UI do Android; o processamento roda no loop do Kivy
+        Clock.schedule_once(lambda dt: self.handle_intent(intent, received))
 
-    def handle_intent(self, intent):
-        """Processa a intent para extrair dados da tag NFC"""
-        if not self.android_classes_loaded or not intent:
+    def handle_intent(self, intent, received_ns=None):
+        """Processa a intent para extrair dados da tag NFC
+        
+        received_ns: instante de chegada da intent (tracer.now()), para medir
+        a latência do toque até o resultado na tela.
+        """
+        if not (self.android_classes_loaded or self.nfc_emulator) or not intent:
             return
 
-        try:
-            action = intent.getAction()
-            logger.info(f"Intent action: {action}")
+        handle_start = tracer.now()
+        if received_ns is not None:
+            tracer.complete('nfc.intent_queue', received_ns, handle_start)
+        
+        with tracer.span('nfc.handle_intent'):
+            try:
+                action = intent.getAction()
+                logger.info(f"Intent action: {action}")
             
-            if action in [NfcAdapter.ACTION_NDEF_DISCOVERED, 
-                         NfcAdapter.ACTION_TECH_DISCOVERED, 
-                         NfcAdapter.ACTION_TAG_DISCOVERED]:
+                if action in [NfcAdapter.ACTION_NDEF_DISCOVERED, 
+                             NfcAdapter.ACTION_TECH_DISCOVERED, 
+                             NfcAdapter.ACTION_TAG_DISCOVERED]:
                 
-                self.interface.reader_interface.update_status(
-                    '🔍 Tag NFC detectada! Processando...',
-                    '⏳ Decodificando dados da tag'
-                )
+                    # Sessão de escrita ativa: a tag recebe a próxima mensagem da fila
+                    if self._write_session_active():
+                        tag = intent.getParcelableExtra(NfcAdapter.EXTRA_TAG)
+                        if tag is not None and nfc_writer.handle_tag(tag):
+                            self.interface.writer_interface.status_label.text = '✍️ Escrevendo...'
+                            return
                 
-                # Processa dados NDEF se disponíveis
-                if action == NfcAdapter.ACTION_NDEF_DISCOVERED:
-                    self._process_ndef_data(intent)
-                else:
-                    self._process_general_tag(intent)
+                    tag_uid = self._get_tag_uid(intent)
+                    is_ndef = action == NfcAdapter.ACTION_NDEF_DISCOVERED
+                    raw_messages = self._read_ndef_messages(intent) if is_ndef else []
+                
+                    # Mesma tag, mesmo conteúdo, ainda na janela: nada a fazer.
+                    # Replays do emulador podem dispensar o filtro (intent.debounce)
+                    if (self.tap_debouncer and getattr(intent, 'debounce', True)
+                            and not self.tap_debouncer.should_process(
+                                TapDebouncer.make_key(tag_uid, raw_messages))):
+                        logger.debug(f"Toque repetido ignorado: {tag_uid}")
+                        if hasattr(intent, 'suppressed'):
+                            intent.suppressed = True
+                        return
                     
-            else:
+                    # Só a referência: o hexdump formata as páginas ao abrir o debug
+                    if raw_messages and self.show_raw_bytes:
+                        self.last_ndef_messages = raw_messages
+                
+                    self.interface.reader_interface.update_status(
+                        '🔍 Tag NFC detectada! Processando...',
+                        '⏳ Decodificando dados da tag'
+                    )
+                
+                    # Processa dados NDEF se disponíveis
+                    if is_ndef:
+                        self._process_ndef_data(intent, tag_uid, raw_messages)
+                    else:
+                        self._process_general_tag(intent, tag_uid)
+                    
+                    # Latência ponta a ponta: chegada da intent até o próximo quadro desenhado
+                    if tracer.enabled:
+                        tap_start = handle_start if received_ns is None else received_ns
+                        Clock.schedule_once(lambda dt: tracer.complete(
+                            'nfc.tap_to_frame', tap_start, uid=tag_uid
+                        ))
+                    
+                else:
+                    self.interface.reader_interface.update_status(
+                        f'ℹ️ Intent recebida: {action}',
+                        '👋 Aguardando tag NFC...'
+                    )
+                
+            except Exception as e:
+                error_msg = f"Erro ao processar intent: {str(e)}"
+                logger.error(error_msg)
                 self.interface.reader_interface.update_status(
-                    f'ℹ️ Intent recebida: {action}',
-                    '👋 Aguardando tag NFC...'
+                    f'❌ {error_msg}',
+                    '🔧 Tente aproximar a tag novamente'
                 )
-                
+
+    def _get_tag_uid(self, intent):
+        """Retorna o UID da tag em hexadecimal (ou None)"""
+        try:
+            tag_id = intent.getByteArrayExtra(NfcAdapter.EXTRA_ID)
+            return as_bytes(tag_id).hex().upper() if tag_id else None
         except Exception as e:
-            error_msg = f"Erro ao processar intent: {str(e)}"
-            logger.error(error_msg)
-            self.interface.reader_interface.update_status(
-                f'❌ {error_msg}',
-                '🔧 Tente aproximar a tag novamente'
-            )
+            logger.debug(f"UID da tag indisponível: {e}")
+            return None
 
-    def _process_ndef_data(self, intent):
+    def _read_ndef_messages(self, intent):
+        """Lê as mensagens NDEF da intent como bytes (uma chamada JNI por mensagem)"""
+        with tracer.span('nfc.read_ndef'):
+            try:
+                raw_msgs = intent.getParcelableArrayExtra(NfcAdapter.EXTRA_NDEF_MESSAGES)
+            except Exception as e:
+                logger.error(f"Erro ao ler mensagens NDEF: {e}")
+                return []
+            return [as_bytes(msg.cast(NdefMessage).toByteArray()) for msg in raw_msgs or ()]
+
+    def _decode_message(self, raw_message):
+        """Decodifica a mensagem, reaproveitando o resultado de toques recentes"""
+        if not self.tap_debouncer:
+            return self.decoder.decode_ndef_message(raw_message)
+        
+        key = TapDebouncer.make_key(None, [raw_message])
+        records = self.tap_debouncer.get_cached(key)
+        if records is None:
+            records = self.decoder.decode_ndef_message(raw_message)
+            self.tap_debouncer.put_cached(key, records)
+        return records
+
+    def _process_ndef_data(self, intent, tag_uid=None, raw_messages=None):
         """Processa dados NDEF da tag"""
         try:
-            raw_msgs = intent.getParcelableArrayExtra(NfcAdapter.EXTRA_NDEF_MESSAGES)
+            if raw_messages is None:
+                raw_messages = self._read_ndef_messages(intent)
             
-            if not raw_msgs:
+            if not raw_messages:
                 self.interface.reader_interface.update_reading_content(
                     '📋 Tag NDEF detectada\n\n'
                     '⚠️ Nenhuma mensagem NDEF encontrada na tag'
@@ -2563,15 +3002,14 @@ class NfcReaderWriterProApp(App):
             
             record_count = 0
             
-            for msg_index, msg in enumerate(raw_msgs):
-                message = msg.cast(NdefMessage)
-                records = message.getRecords()
+            for msg_index, raw_message in enumerate(raw_messages):
+                with tracer.span('nfc.decode_message', index=msg_index, size=len(raw_message)):
+                    records = self._decode_message(raw_message)
                 
                 all_content += f"📄 **Mensagem {msg_index + 1}** ({len(records)} registros)\n\n"
                 
-                for record_index, record in enumerate(records):
+                for record_index, decoded in enumerate(records):
                     record_count += 1
-                    decoded = self.decoder.decode_ndef_record(record)
                     
                     all_content += f"📌 **Registro {record_index + 1}:**\n"
                     all_content += f"   🏷️ Tipo: {decoded['type']}\n"
@@ -2586,7 +3024,8 @@ class NfcReaderWriterProApp(App):
                     self.history_manager.add_reading(
                         decoded['type'],
                         decoded['content'],
-                        decoded.get('raw')
+                        decoded.get('raw'),
+                        tag_uid
                     )
             
             all_content += f"✅ **Processamento concluído!**\n"
@@ -2598,6 +3037,8 @@ class NfcReaderWriterProApp(App):
                 '🔍 Leia outra tag ou ✍️ escreva novos dados'
             )
             
+            self._dispatch_automations(tag_uid, raw_messages)
+            
         except Exception as e:
             error_msg = f"Erro ao processar dados NDEF: {str(e)}"
             logger.error(error_msg)
@@ -2606,7 +3047,7 @@ class NfcReaderWriterProApp(App):
                 '🔧 Tente aproximar a tag novamente ou verifique se a tag está funcionando.'
             )
 
-    def _process_general_tag(self, intent):
+    def _process_general_tag(self, intent, tag_uid=None):
         """Processa tag geral (sem dados NDEF)"""
         try:
             # Tenta obter informações básicas da tag
@@ -2632,12 +3073,40 @@ class NfcReaderWriterProApp(App):
             self.history_manager.add_reading(
                 "Tag Vazia",
                 "Tag detectada sem dados NDEF - Pronta para programação",
-                None
+                None,
+                tag_uid
             )
             
+            self._dispatch_automations(tag_uid, [])
+            
         except Exception as e:
             logger.error(f"Erro ao processar tag geral: {e}")
 
+    def _dispatch_automations(self, tag_uid, raw_messages):
+        """Dispara as automações cujos gatilhos correspondem à tag (índice de gatilhos)"""
+        try:
+            with tracer.span('automation.dispatch'):
+                handles = automation_engine.dispatch_tag(
+                    tag_uid, raw_messages,
+                    on_complete=lambda result: Clock.schedule_once(
+                        lambda dt: self._on_automation_done(result)
+                    )
+                )
+        except Exception as e:
+            logger.error(f"Erro ao disparar automações: {e}")
+            return
+        
+        if handles:
+            logger.info(f"{len(handles)} automações disparadas pela tag {tag_uid or ''}")
+    
+    def _on_automation_done(self, result):
+        """Registra no histórico o resultado de uma automação disparada por tag"""
+        self.history_manager.add_reading(
+            f"Automação: {result['task_name']}",
+            f"{result['succeeded']}/{len(result['actions'])} ações executadas "
+            f"em {result['duration_ms']:.0f} ms"
+        )
+    
     def show_popup(self, title, message):
         """Mostra popup simples"""
         content = Label(text=message, halign='center', valign='middle')
@@ -2646,9 +3115,9 @@ class NfcReaderWriterProApp(App):
     
     def show_history_popup(self):
         """Mostra popup com histórico de leituras"""
-        history = self.history_manager.get_history()
+        total = self.history_manager.count()
         
-        if not history:
+        if not total:
             content = Label(
                 text='📋 Nenhuma leitura no histórico ainda.\n\n'
                      '👋 Aproxime uma tag NFC para começar!',
@@ -2656,25 +3125,43 @@ class NfcReaderWriterProApp(App):
                 valign='middle'
             )
         else:
-            history_text = "📚 **HISTÓRICO DE LEITURAS**\n\n"
+            content = BoxLayout(orientation='vertical', spacing=dp(5))
+            header = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(40))
+            header.add_widget(Label(
+                text=f'📚 {total} leituras registradas',
+                font_size='14sp',
+                bold=True
+            ))
+            export_btn = Button(
+                text='📤 Exportar',
+                font_size='14sp',
+                size_hint_x=0.35,
+                background_color=(0.2, 0.6, 0.9, 1)
+            )
+            export_btn.bind(on_press=lambda instance: self.export_history())
+            header.add_widget(export_btn)
+            content.add_widget(header)
             
-            for i, reading in enumerate(history[:10]):  # Mostra últimas 10
-                history_text += f"📌 **#{i+1}** - {reading['timestamp']}\n"
-                history_text += f"   🏷️ {reading['type']}\n"
-                history_text += f"   📝 {reading['content'][:50]}{'...' if len(reading['content']) > 50 else ''}\n\n"
+            # Lista virtualizada; páginas extras carregadas ao rolar até o fim
+            from ui_lists import build_recycle_list, HistoryRow, HISTORY_PAGE_SIZE
+            history_list = build_recycle_list(HistoryRow, dp(70))
+            history_list.data = self.history_manager.query(page_size=HISTORY_PAGE_SIZE)
+            paging = {'exhausted': len(history_list.data) < HISTORY_PAGE_SIZE}
             
-            if len(history) > 10:
-                history_text += f"... e mais {len(history) - 10} leituras"
+            def load_more(instance, scroll_y):
+                # Cursor por id da última linha: leituras novas não deslocam as páginas
+                if scroll_y > 0.1 or paging['exhausted'] or not history_list.data:
+                    return
+                last_id = history_list.data[-1].get('id')
+                if last_id is None:
+                    paging['exhausted'] = True
+                    return
+                page = self.history_manager.query(page_size=HISTORY_PAGE_SIZE, before_id=last_id)
+                paging['exhausted'] = len(page) < HISTORY_PAGE_SIZE
+                history_list.data.extend(page)
             
-            content = ScrollView()
-            label = Label(
-                text=history_text,
-                text_size=(dp(300), None),
-                halign='left',
-                valign='top',
-                markup=True
-            )
-            content.add_widget(label)
+            history_list.bind(scroll_y=load_more)
+            content.add_widget(history_list)
         
         popup = Popup(
             title='📚 Histórico de Leituras NFC',
@@ -2683,6 +3170,31 @@ class NfcReaderWriterProApp(App):
         )
         popup.open()
 
+    def export_history(self, fmt=None):
+        """Exporta o histórico em segundo plano, mostrando o progresso no status"""
+        reader = self.interface.reader_interface
+        
+        def on_progress(written, total):
+            Clock.schedule_once(lambda dt: reader.update_status(
+                f'📤 Exportando histórico... {written}/{total or "?"}'
+            ))
+        
+        def on_complete(job):
+            def show(dt):
+                if job.success:
+                    reader.update_status(
+                        f'✅ Histórico exportado ({job.rows} leituras)',
+                        f'📁 {job.filepath}'
+                    )
+                elif not job.cancelled:
+                    reader.update_status(f'❌ Erro ao exportar histórico: {job.error}')
+            Clock.schedule_once(show)
+        
+        job = self.history_manager.export(fmt, progress=on_progress, on_complete=on_complete)
+        if job is None:
+            self.show_popup('Aviso', '⚠️ Exportação indisponível')
+        return job
+    
     def clear_history(self):
         """Limpa o histórico de leituras"""
         self.history_manager.clear_history()
@@ -2690,6 +3202,25 @@ class NfcReaderWriterProApp(App):
     
     def show_debug_popup(self):
         """Mostra informações de debug"""
+        trace_info = "   • Desativado (DEBUG_CONFIG['performance_monitoring'])"
+        if tracer.enabled:
+            trace_path = os.path.join(file_manager.ensure_app_directory(), 'nfc_trace.json')
+            try:
+                events = tracer.export_chrome_trace(trace_path)
+                trace_info = f"   • {events} eventos em {trace_path}"
+            except OSError as e:
+                trace_info = f"   • Erro ao exportar trace: {e}"
+            
+            for operation, label in (('nfc.tap_to_frame', 'Toque → tela'),
+                                     ('nfc.handle_intent', 'handle_intent'),
+                                     ('nfc.decode_message', 'Decodificação'),
+                                     ('history.add', 'Histórico'),
+                                     ('ui.update_reading_content', 'Interface')):
+                p50 = performance_monitor.get_percentile(operation, 50)
+                p95 = performance_monitor.get_percentile(operation, 95)
+                if p50 is not None:
+                    trace_info += f"\n   • {label}: p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms"
+        
         debug_info = f"""🔧 **INFORMAÇÕES DE DEBUG**
 
 🖥️ **Sistema:**
@@ -2698,8 +3229,12 @@ class NfcReaderWriterProApp(App):
    • NFC Disponível: {'✅' if self.nfc_available else '❌'}
 
 📊 **Estatísticas:**
-   • Leituras no histórico: {len(self.history_manager.get_history())}
+   • Leituras no histórico: {self.history_manager.count()}
    • Máximo do histórico: {self.history_manager.max_history}
+   • Primeiro quadro: {self.startup_metrics.get('first_frame_ms', 0):.0f} ms
+
+⏱️ **Tracing:**
+{trace_info}
 
 ⚙️ **Módulos:**
    • NFC Writer: Carregado
@@ -2710,9 +3245,11 @@ class NfcReaderWriterProApp(App):
    • App inicializado: ✅
    • Interface criada: ✅
    • Decoder ativo: ✅
+   • Bytes da última tag: {sum(len(message) for message in self.last_ndef_messages)} ({len(self.last_ndef_messages)} mensagens)
 """
         
-        content = ScrollView()
+        content = BoxLayout(orientation='vertical', spacing=dp(5))
+        scroll = ScrollView()
         label = Label(
             text=debug_info,
             text_size=(dp(350), None),
@@ -2720,7 +3257,18 @@ class NfcReaderWriterProApp(App):
             valign='top',
             markup=True
         )
-        content.add_widget(label)
+        scroll.add_widget(label)
+        content.add_widget(scroll)
+        
+        hexdump_btn = Button(
+            text='🔢 Hexdump da última tag',
+            font_size='14sp',
+            size_hint_y=None,
+            height=dp(45),
+            disabled=not self.last_ndef_messages
+        )
+        hexdump_btn.bind(on_press=lambda instance: self.show_hexdump_popup())
+        content.add_widget(hexdump_btn)
         
         popup = Popup(
             title='🔧 Debug - NFC Reader PRO',
@@ -2729,31 +3277,79 @@ class NfcReaderWriterProApp(App):
         )
         popup.open()
     
-    def run_test_simulation(self):
-        """Executa uma simulação de teste"""
-        # Simula uma leitura NFC
-        test_content = "🧪 **SIMULAÇÃO DE TESTE**\n"
-        test_content += f"⏰ {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n"
-        test_content += "📄 **Tag de Teste Simulada**\n\n"
-        test_content += "📌 **Registro 1:**\n"
-        test_content += "   🏷️ Tipo: Texto\n"
-        test_content += "   📝 Conteúdo: Hello World - NFC Test!\n"
-        test_content += "   ℹ️ Detalhes: Idioma: pt, Encoding: utf-8\n\n"
-        test_content += "✅ **Teste concluído!**\n"
-        test_content += "📊 Total de registros: 1"
-        
-        self.interface.reader_interface.update_reading_content(test_content)
-        self.interface.reader_interface.update_status(
-            '🧪 Teste executado com sucesso!',
-            '✅ Simulação de leitura NFC concluída'
+    def show_hexdump_popup(self, messages=None, lines_per_page=32):
+        """Hexdump paginado (offset | hex | ASCII) por mensagem NDEF
+        
+        Cada mensagem tem suas próprias páginas e offsets a partir de zero;
+        apenas a página visível é formatada.
+        """
+        from utils import HexFormatter
+        
+        if messages is None:
+            messages = self.last_ndef_messages
+        elif isinstance(messages, (bytes, bytearray, memoryview)):
+            messages = [messages]
+        messages = messages or [b'']
+        # (mensagem, página dentro da mensagem) para cada página exibida
+        page_map = [
+            (message_index, page)
+            for message_index, message in enumerate(messages)
+            for page in range(HexFormatter.page_count(len(message), lines_per_page))
+        ]
+        pages = len(page_map)
+        current = {'page': 0}
+        
+        content = BoxLayout(orientation='vertical', spacing=dp(5))
+        dump_label = Label(
+            font_name='RobotoMono-Regular',
+            font_size='11sp',
+            halign='left',
+            valign='top'
+        )
+        dump_label.bind(size=lambda instance, size: setattr(instance, 'text_size', size))
+        content.add_widget(dump_label)
+        
+        nav_layout = BoxLayout(orientation='horizontal', size_hint_y=None, height=dp(45), spacing=dp(5))
+        prev_btn = Button(text='◀ Anterior', font_size='14sp')
+        page_label = Label(font_size='13sp')
+        next_btn = Button(text='Próxima ▶', font_size='14sp')
+        
+        def show_page(page):
+            current['page'] = max(0, min(page, pages - 1))
+            message_index, message_page = page_map[current['page']]
+            message = messages[message_index]
+            dump_label.text = HexFormatter.hexdump_page(message, message_page, lines_per_page)
+            page_label.text = (f"Msg {message_index + 1}/{len(messages)} · "
+                               f"{current['page'] + 1}/{pages} · {len(message)} bytes")
+            prev_btn.disabled = current['page'] == 0
+            next_btn.disabled = current['page'] >= pages - 1
+        
+        prev_btn.bind(on_press=lambda instance: show_page(current['page'] - 1))
+        next_btn.bind(on_press=lambda instance: show_page(current['page'] + 1))
+        nav_layout.add_widget(prev_btn)
+        nav_layout.add_widget(page_label)
+        nav_layout.add_widget(next_btn)
+        content.add_widget(nav_layout)
+        
+        show_page(0)
+        popup = Popup(
+            title='🔢 Hexdump - Última Tag NFC',
+            content=content,
+            size_hint=(0.95, 0.9)
         )
+        popup.open()
+        return show_page
+    
+    def run_test_simulation(self):
+        """Executa uma simulação de teste: tags emuladas pelo caminho real de leitura"""
+        from nfc_emulator import synthetic_tags
         
-        # Adiciona ao histórico
-        self.history_manager.add_reading(
-            "Teste",
-            "Hello World - NFC Test!",
-            "simulacao_teste"
+        tags = synthetic_tags(6)
+        self.interface.reader_interface.update_status(
+            '🧪 Simulando leitura NFC...',
+            f'⏳ {len(tags)} tags emuladas'
         )
+        self._enable_nfc_simulation().replay(tags, on_done=self._on_simulation_done)
     
     def show_info_popup(self):
         """Mostra informações do aplicativo"""
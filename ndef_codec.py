@@ -0,0 +1,406 @@
+"""
+📦 NDEF Codec - Parser e Serializador de Mensagens NDEF
+=======================================================
+
+Implementação pura em Python do formato NDEF (NFC Data Exchange Format).
+Opera sobre um único bloco de bytes da mensagem (obtido com uma chamada
+NdefMessage.toByteArray()), permitindo decodificar todos os registros sem
+atravessar o JNI a cada campo e testar a decodificação fora do Android.
+"""
+
+import logging
+from typing import Any, Iterator, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+# TNF (Type Name Format) - 3 bits menos significativos do cabeçalho
+TNF_EMPTY = 0x00
+TNF_WELL_KNOWN = 0x01
+TNF_MIME_MEDIA = 0x02
+TNF_ABSOLUTE_URI = 0x03
+TNF_EXTERNAL_TYPE = 0x04
+TNF_UNKNOWN = 0x05
+TNF_UNCHANGED = 0x06
+TNF_RESERVED = 0x07
+
+# Tipos RTD (Record Type Definition) do NFC Forum
+RTD_TEXT = b'T'
+RTD_URI = b'U'
+RTD_SMART_POSTER = b'Sp'
+RTD_ALTERNATIVE_CARRIER = b'ac'
+RTD_HANDOVER_CARRIER = b'Hc'
+RTD_HANDOVER_REQUEST = b'Hr'
+RTD_HANDOVER_SELECT = b'Hs'
+
+# Flags do cabeçalho do registro
+FLAG_MB = 0x80  # Message Begin
+FLAG_ME = 0x40  # Message End
+FLAG_CF = 0x20  # Chunk Flag
+FLAG_SR = 0x10  # Short Record
+FLAG_IL = 0x08  # ID Length presente
+TNF_MASK = 0x07
+
+# Tamanho máximo do payload em um registro curto (SR)
+SHORT_RECORD_MAX = 0xFF
+
+# Códigos de identificação de prefixo URI (NFC Forum URI RTD, tabela 3)
+URI_PREFIXES = (
+    '',
+    'http://www.',
+    'https://www.',
+    'http://',
+    'https://',
+    'tel:',
+    'mailto:',
+    'ftp://anonymous:anonymous@',
+    'ftp://ftp.',
+    'ftps://',
+    'sftp://',
+    'smb://',
+    'nfs://',
+    'ftp://',
+    'dav://',
+    'news:',
+    'telnet://',
+    'imap:',
+    'rtsp://',
+    'urn:',
+    'pop:',
+    'sip:',
+    'sips:',
+    'tftp:',
+    'btspp://',
+    'btl2cap://',
+    'btgoep://',
+    'tcpobex://',
+    'irdaobex://',
+    'file://',
+    'urn:epc:id:',
+    'urn:epc:tag:',
+    'urn:epc:pat:',
+    'urn:epc:raw:',
+    'urn:epc:',
+    'urn:nfc:',
+)
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class NdefRecordData:
+    """Registro NDEF decodificado (payload como fatia sem cópia)"""
+
+    __slots__ = ('tnf', 'type', 'id', 'payload')
+
+    def __init__(self, tnf: int, record_type: BytesLike = b'',
+                 record_id: BytesLike = b'', payload: BytesLike = b''):
+        self.tnf = tnf
+        self.type = bytes(record_type)
+        self.id = bytes(record_id)
+        self.payload = payload
+
+    def is_well_known(self, rtd: bytes) -> bool:
+        """Verifica se é um registro NFC Forum do tipo informado"""
+        return self.tnf == TNF_WELL_KNOWN and self.type == rtd
+
+    def payload_bytes(self) -> bytes:
+        """Retorna o payload como bytes (copia apenas se necessário)"""
+        if isinstance(self.payload, bytes):
+            return self.payload
+        return bytes(self.payload)
+
+    def __len__(self) -> int:
+        return len(self.payload)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, NdefRecordData):
+            return NotImplemented
+        return (self.tnf == other.tnf and self.type == other.type and
+                self.id == other.id and bytes(self.payload) == bytes(other.payload))
+
+    def __repr__(self) -> str:
+        return (f"NdefRecordData(tnf={self.tnf}, type={self.type!r}, "
+                f"id={self.id!r}, payload={len(self.payload)} bytes)")
+
+
+def iter_records(data: BytesLike) -> Iterator[NdefRecordData]:
+    """Itera sobre os registros de uma mensagem NDEF
+
+    Registros fragmentados (chunked) são remontados em um único registro;
+    nos demais casos o payload é uma fatia do memoryview original.
+    Levanta ValueError se a mensagem estiver malformada.
+    """
+    view = memoryview(data)
+    if view.ndim != 1 or view.itemsize != 1:
+        view = view.cast('B')
+
+    size = len(view)
+    offset = 0
+    index = 0
+    chunks = None
+    chunk_tnf = TNF_EMPTY
+    chunk_type = b''
+    chunk_id = b''
+
+    if size == 0:
+        return
+
+    while offset < size:
+        header = view[offset]
+        offset += 1
+
+        if index == 0 and not header & FLAG_MB:
+            raise ValueError("Primeiro registro sem flag MB")
+        if index > 0 and header & FLAG_MB:
+            raise ValueError(f"Flag MB inesperada no registro {index}")
+
+        if offset >= size:
+            raise ValueError("Mensagem NDEF truncada no cabeçalho")
+        type_length = view[offset]
+        offset += 1
+
+        if header & FLAG_SR:
+            if offset + 1 > size:
+                raise ValueError("Mensagem NDEF truncada no tamanho do payload")
+            payload_length = view[offset]
+            offset += 1
+        else:
+            if offset + 4 > size:
+                raise ValueError("Mensagem NDEF truncada no tamanho do payload")
+            payload_length = int.from_bytes(view[offset:offset + 4], 'big')
+            offset += 4
+
+        id_length = 0
+        if header & FLAG_IL:
+            if offset >= size:
+                raise ValueError("Mensagem NDEF truncada no tamanho do ID")
+            id_length = view[offset]
+            offset += 1
+
+        end = offset + type_length + id_length + payload_length
+        if end > size:
+            raise ValueError(
+                f"Registro {index} excede o tamanho da mensagem ({end} > {size})"
+            )
+
+        record_type = view[offset:offset + type_length]
+        offset += type_length
+        record_id = view[offset:offset + id_length]
+        offset += id_length
+        payload = view[offset:end]
+        offset = end
+
+        tnf = header & TNF_MASK
+
+        if chunks is not None:
+            # Fragmento intermediário ou final de um registro em partes
+            if tnf != TNF_UNCHANGED or type_length:
+                raise ValueError(f"Fragmento {index} com TNF/tipo inválidos")
+            chunks.append(payload)
+            if not header & FLAG_CF:
+                yield NdefRecordData(chunk_tnf, chunk_type, chunk_id, b''.join(chunks))
+                chunks = None
+        elif header & FLAG_CF:
+            if tnf == TNF_UNCHANGED:
+                raise ValueError(f"Primeiro fragmento {index} com TNF_UNCHANGED")
+            chunks = [payload]
+            chunk_tnf = tnf
+            chunk_type = bytes(record_type)
+            chunk_id = bytes(record_id)
+        else:
+            if tnf == TNF_UNCHANGED:
+                raise ValueError(f"TNF_UNCHANGED fora de registro fragmentado ({index})")
+            yield NdefRecordData(tnf, record_type, record_id, payload)
+
+        index += 1
+
+        if header & FLAG_ME:
+            if offset != size:
+                logger.debug(f"Ignorando {size - offset} bytes após flag ME")
+            break
+    else:
+        raise ValueError("Mensagem NDEF sem flag ME")
+
+    if chunks is not None:
+        raise ValueError("Registro fragmentado não finalizado")
+
+
+def parse_message(data: BytesLike) -> List[NdefRecordData]:
+    """Decodifica uma mensagem NDEF completa em lista de registros"""
+    return list(iter_records(data))
+
+
+def record_size(record: NdefRecordData, chunk_size: int = 0) -> int:
+    """Calcula o tamanho exato do registro serializado"""
+    payload_length = len(record.payload)
+    id_overhead = 1 + len(record.id) if record.id else 0
+
+    if chunk_size and payload_length > chunk_size:
+        full_chunks, last = divmod(payload_length, chunk_size)
+        lengths = [chunk_size] * full_chunks
+        if last:
+            lengths.append(last)
+        total = len(record.type) + id_overhead
+        for length in lengths:
+            total += 2 + (1 if length <= SHORT_RECORD_MAX else 4) + length
+        return total
+
+    length_field = 1 if payload_length <= SHORT_RECORD_MAX else 4
+    return 2 + length_field + id_overhead + len(record.type) + payload_length
+
+
+def message_size(records: List[NdefRecordData], chunk_size: int = 0) -> int:
+    """Calcula o tamanho exato da mensagem serializada"""
+    return sum(record_size(record, chunk_size) for record in records)
+
+
+def _write_record(out: bytearray, header: int, record_type: bytes,
+                  record_id: bytes, payload: BytesLike):
+    """Escreve um registro (ou fragmento) no buffer de saída"""
+    payload_length = len(payload)
+    if payload_length <= SHORT_RECORD_MAX:
+        header |= FLAG_SR
+    if record_id:
+        header |= FLAG_IL
+
+    out.append(header)
+    out.append(len(record_type))
+    if header & FLAG_SR:
+        out.append(payload_length)
+    else:
+        out += payload_length.to_bytes(4, 'big')
+    if record_id:
+        out.append(len(record_id))
+    out += record_type
+    out += record_id
+    out += payload
+
+
+def serialize_message(records: List[NdefRecordData], chunk_size: int = 0) -> bytes:
+    """Serializa registros em uma mensagem NDEF
+
+    As flags MB/ME são definidas automaticamente e registros com payload de
+    até 255 bytes usam o formato curto (SR). Com chunk_size > 0, payloads
+    maiores são divididos em registros fragmentados (CF).
+    """
+    if not records:
+        raise ValueError("Mensagem NDEF precisa de ao menos um registro")
+
+    out = bytearray()
+    last_index = len(records) - 1
+
+    for index, record in enumerate(records):
+        if len(record.type) > 0xFF or len(record.id) > 0xFF:
+            raise ValueError("Tipo ou ID do registro excede 255 bytes")
+
+        begin = FLAG_MB if index == 0 else 0
+        end = FLAG_ME if index == last_index else 0
+        payload = memoryview(record.payload)
+
+        if chunk_size and len(payload) > chunk_size:
+            parts = [payload[i:i + chunk_size] for i in range(0, len(payload), chunk_size)]
+            last_part = len(parts) - 1
+            for part_index, part in enumerate(parts):
+                if part_index == 0:
+                    _write_record(out, begin | FLAG_CF | record.tnf,
+                                  record.type, record.id, part)
+                elif part_index < last_part:
+                    _write_record(out, FLAG_CF | TNF_UNCHANGED, b'', b'', part)
+                else:
+                    _write_record(out, end | TNF_UNCHANGED, b'', b'', part)
+        else:
+            _write_record(out, begin | end | record.tnf, record.type, record.id, payload)
+
+    return bytes(out)
+
+
+def decode_text_payload(payload: BytesLike) -> Tuple[str, str, str]:
+    """Decodifica payload RTD_TEXT em (idioma, texto, encoding)"""
+    if not len(payload):
+        raise ValueError("Payload de texto vazio")
+
+    status = payload[0]
+    encoding = 'utf-16' if status & 0x80 else 'utf-8'
+    lang_length = status & 0x3F
+    if 1 + lang_length > len(payload):
+        raise ValueError("Código de idioma excede o payload")
+
+    language = bytes(payload[1:1 + lang_length]).decode('ascii')
+    text_bytes = bytes(payload[1 + lang_length:])
+    if encoding == 'utf-16' and text_bytes[:2] not in (b'\xfe\xff', b'\xff\xfe'):
+        # RTD Text: UTF-16 sem BOM é big-endian
+        text = text_bytes.decode('utf-16-be')
+    else:
+        text = text_bytes.decode(encoding)
+    return language, text, encoding
+
+
+def decode_uri_payload(payload: BytesLike) -> str:
+    """Decodifica payload RTD_URI expandindo o código de prefixo"""
+    if not len(payload):
+        return ''
+
+    code = payload[0]
+    prefix = URI_PREFIXES[code] if code < len(URI_PREFIXES) else ''
+    return prefix + bytes(payload[1:]).decode('utf-8')
+
+
+def as_bytes(java_bytes: Any) -> Optional[bytes]:
+    """Converte um byte[] retornado pelo pyjnius em bytes Python"""
+    if java_bytes is None:
+        return None
+    if isinstance(java_bytes, (bytes, bytearray, memoryview)):
+        return bytes(java_bytes)
+    if hasattr(java_bytes, 'tostring'):
+        return java_bytes.tostring()
+    # Listas de inteiros Java vêm com sinal (-128..127)
+    return bytes(b & 0xFF for b in java_bytes)
+
+
+# Prefixos URI ordenados do mais longo para o mais curto (código 0 excluído)
+_URI_PREFIXES_BY_LENGTH = sorted(
+    ((prefix, code) for code, prefix in enumerate(URI_PREFIXES) if prefix),
+    key=lambda item: len(item[0]),
+    reverse=True
+)
+
+
+def compress_uri(uri: str) -> Tuple[int, str]:
+    """Retorna (código de prefixo, restante) usando o prefixo mais longo"""
+    for prefix, code in _URI_PREFIXES_BY_LENGTH:
+        if uri.startswith(prefix):
+            return code, uri[len(prefix):]
+    return 0, uri
+
+
+def is_utf16(encoding: str) -> bool:
+    """True se o nome de encoding indica UTF-16 (bit de status do RTD_TEXT)"""
+    return encoding.lower().replace('-', '').replace('_', '') == 'utf16'
+
+
+def encode_text(text: str, encoding: str = 'utf-8') -> bytes:
+    """Codifica o texto de um RTD_TEXT (UTF-16 big-endian, sem BOM)"""
+    return text.encode('utf-16-be' if is_utf16(encoding) else encoding)
+
+
+def text_record(text: str, language: str = 'pt', encoding: str = 'utf-8') -> NdefRecordData:
+    """Constrói registro RTD_TEXT"""
+    lang_bytes = language.encode('ascii')
+    if len(lang_bytes) > 0x3F:
+        raise ValueError("Código de idioma excede 63 bytes")
+
+    encoding_flag = 0x80 if is_utf16(encoding) else 0
+    payload = bytes([encoding_flag | len(lang_bytes)]) + lang_bytes + encode_text(text, encoding)
+    return NdefRecordData(TNF_WELL_KNOWN, RTD_TEXT, b'', payload)
+
+
+def uri_record(uri: str) -> NdefRecordData:
+    """Constrói registro RTD_URI com compressão do prefixo"""
+    code, remainder = compress_uri(uri)
+    payload = bytes([code]) + remainder.encode('utf-8')
+    return NdefRecordData(TNF_WELL_KNOWN, RTD_URI, b'', payload)
+
+
+def mime_record(mime_type: str, payload: BytesLike) -> NdefRecordData:
+    """Constrói registro MIME"""
+    return NdefRecordData(TNF_MIME_MEDIA, mime_type.encode('ascii'), b'', payload)
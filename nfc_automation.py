@@ -6,12 +6,24 @@ Módulo para automação avançada, integração com Tasker e execução
 de comandos do sistema através de tags NFC.
 """
 
-import json
+import hashlib
+import itertools
 import logging
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple, TYPE_CHECKING
 from enum import Enum
 
+from services import services
+from ndef_codec import (
+    iter_records, decode_uri_payload,
+    TNF_MIME_MEDIA, TNF_ABSOLUTE_URI, RTD_URI, RTD_SMART_POSTER
+)
+
+if TYPE_CHECKING:
+    from system_backend import SystemBackend
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,6 +73,7 @@ class TaskAction:
         self.condition = None
         self.delay_seconds = 0
         self.repeat_count = 1
+        self.timeout_seconds = None
         self.enabled = True
         self.created_at = datetime.now()
         
@@ -76,6 +89,10 @@ class TaskAction:
         """Define número de repetições"""
         self.repeat_count = max(1, count)
         
+    def set_timeout(self, seconds: Optional[float]):
+        """Define tempo máximo de cada execução (None = sem limite)"""
+        self.timeout_seconds = seconds
+        
     def can_execute(self) -> bool:
         """Verifica se a ação pode ser executada"""
         if not self.enabled:
@@ -93,6 +110,7 @@ class TaskAction:
             'parameters': self.parameters,
             'delay_seconds': self.delay_seconds,
             'repeat_count': self.repeat_count,
+            'timeout_seconds': self.timeout_seconds,
             'enabled': self.enabled,
             'created_at': self.created_at.isoformat()
         }
@@ -103,6 +121,7 @@ class TaskAction:
         action = cls(data['action_type'], data['parameters'])
         action.delay_seconds = data.get('delay_seconds', 0)
         action.repeat_count = data.get('repeat_count', 1)
+        action.timeout_seconds = data.get('timeout_seconds')
         action.enabled = data.get('enabled', True)
         action.created_at = datetime.fromisoformat(data['created_at'])
         return action
@@ -120,6 +139,7 @@ class AutomationTask:
         self.execution_count = 0
         self.last_execution = None
         self.created_at = datetime.now()
+        self._lock = threading.Lock()  # contadores alterados pelas threads do agendador
         
     def add_action(self, action: TaskAction):
         """Adiciona ação à tarefa"""
@@ -135,7 +155,11 @@ class AutomationTask:
         self.triggers.append(trigger)
         
     def execute(self) -> bool:
-        """Executa a tarefa"""
+        """Executa a tarefa de forma síncrona, respeitando delay e repetições
+        
+        Bloqueia a thread chamadora durante os delays; na thread de UI use
+        AutomationScheduler.schedule.
+        """
         if not self.enabled:
             return False
             
@@ -144,24 +168,30 @@ class AutomationTask:
             
             for action in self.actions:
                 if action.can_execute():
-                    # Executa ação (implementação específica)
-                    if self._execute_action(action):
-                        success_count += 1
+                    for iteration in range(action.repeat_count):
+                        if action.delay_seconds:
+                            time.sleep(action.delay_seconds)
+                        if self._execute_action(action):
+                            success_count += 1
                     
-            self.execution_count += 1
-            self.last_execution = datetime.now()
+            self.mark_executed()
             
-            logger.info(f"Tarefa '{self.name}' executada: {success_count}/{len(self.actions)} ações")
+            logger.info(f"Tarefa '{self.name}' executada: {success_count} execuções de {len(self.actions)} ações")
             return success_count > 0
             
         except Exception as e:
             logger.error(f"Erro ao executar tarefa '{self.name}': {e}")
             return False
+    
+    def mark_executed(self):
+        """Atualiza contadores após uma execução"""
+        with self._lock:
+            self.execution_count += 1
+            self.last_execution = datetime.now()
             
     def _execute_action(self, action: TaskAction) -> bool:
-        """Executa uma ação específica"""
-        # Implementação será feita no SystemController
-        return True
+        """Executa uma ação específica no SystemController (comandos nativos ou de plugins)"""
+        return services.get('system_controller').execute_command(action.action_type, action.parameters)
         
     def to_dict(self) -> Dict[str, Any]:
         """Converte para dicionário"""
@@ -193,43 +223,29 @@ class AutomationTask:
 
 
 class SystemController:
-    """Controlador para comandos do sistema Android"""
+    """Controlador para comandos do sistema Android
     
-    def __init__(self):
-        self.android_classes_loaded = False
-        self.context = None
-        self.audio_manager = None
-        self.wifi_manager = None
-        self.bluetooth_adapter = None
-        self.notification_manager = None
+    As operações são delegadas a um SystemBackend: o Android real por padrão,
+    ou o simulado (desktop, CI) via DEBUG_CONFIG['simulate_system'] ou
+    passando o backend explicitamente.
+    """
+    
+    def __init__(self, backend: Optional['SystemBackend'] = None):
+        if backend is None:
+            from system_backend import create_system_backend
+            backend = create_system_backend()
+        self.backend = backend
+        self.initialized = False
+        self._handlers = {}  # valor do comando -> handler(parameters) -> bool
+        self._register_default_commands()
         
     def initialize(self) -> bool:
         """Inicializa controlador do sistema"""
         try:
-            from jnius import autoclass
-            
-            # Classes Android para controle do sistema
-            self.PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            self.Context = autoclass('android.content.Context')
-            self.AudioManager = autoclass('android.media.AudioManager')
-            self.WifiManager = autoclass('android.net.wifi.WifiManager')
-            self.BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
-            self.NotificationManager = autoclass('android.app.NotificationManager')
-            self.Intent = autoclass('android.content.Intent')
-            self.Settings = autoclass('android.provider.Settings')
-            
-            # Obtém contexto da atividade
-            self.context = self.PythonActivity.mActivity
-            
-            # Inicializa gerenciadores
-            self.audio_manager = self.context.getSystemService(self.Context.AUDIO_SERVICE)
-            self.wifi_manager = self.context.getSystemService(self.Context.WIFI_SERVICE)
-            self.bluetooth_adapter = self.BluetoothAdapter.getDefaultAdapter()
-            self.notification_manager = self.context.getSystemService(self.Context.NOTIFICATION_SERVICE)
-            
-            self.android_classes_loaded = True
-            logger.info("SystemController inicializado com sucesso")
-            return True
+            self.initialized = bool(self.backend.initialize())
+            if self.initialized:
+                logger.info(f"SystemController inicializado com sucesso (backend {self.backend.name})")
+            return self.initialized
             
         except ImportError:
             logger.error("PyJNIUS não disponível para controle do sistema")
@@ -238,50 +254,57 @@ class SystemController:
             logger.error(f"Erro ao inicializar SystemController: {e}")
             return False
     
-    def execute_command(self, command: SystemCommand, parameters: Dict[str, Any] = None) -> bool:
-        """Executa comando do sistema"""
-        if not self.android_classes_loaded:
+    def _register_default_commands(self):
+        """Tabela de despacho dos comandos nativos"""
+        self._handlers.update({
+            SystemCommand.WIFI_TOGGLE.value: lambda p: self._toggle_wifi(),
+            SystemCommand.WIFI_ON.value: lambda p: self._set_wifi(True),
+            SystemCommand.WIFI_OFF.value: lambda p: self._set_wifi(False),
+            SystemCommand.BLUETOOTH_TOGGLE.value: lambda p: self._toggle_bluetooth(),
+            SystemCommand.BLUETOOTH_ON.value: lambda p: self._set_bluetooth(True),
+            SystemCommand.BLUETOOTH_OFF.value: lambda p: self._set_bluetooth(False),
+            SystemCommand.VOLUME_UP.value: lambda p: self._adjust_volume(1),
+            SystemCommand.VOLUME_DOWN.value: lambda p: self._adjust_volume(-1),
+            SystemCommand.VOLUME_MUTE.value: lambda p: self._mute_volume(),
+            SystemCommand.VOLUME_SET.value: lambda p: self._set_volume(p.get('volume', 50)),
+            SystemCommand.LAUNCH_APP.value: lambda p: self._launch_app(p.get('package_name', '')),
+            SystemCommand.OPEN_URL.value: lambda p: self._open_url(p.get('url', '')),
+            SystemCommand.SEND_NOTIFICATION.value: lambda p: self._send_notification(
+                p.get('title', 'NFC Action'), p.get('message', 'Action executed')
+            ),
+        })
+    
+    def register_command(self, command, handler: Callable[[Dict[str, Any]], bool],
+                         replace: bool = False) -> bool:
+        """Registra handler para um comando (SystemCommand ou nome livre de plugin)"""
+        key = command.value if isinstance(command, SystemCommand) else str(command)
+        if key in self._handlers and not replace:
+            logger.warning(f"Comando já registrado: {key}")
+            return False
+        self._handlers[key] = handler
+        return True
+    
+    def unregister_command(self, command) -> bool:
+        key = command.value if isinstance(command, SystemCommand) else str(command)
+        return self._handlers.pop(key, None) is not None
+    
+    def supported_commands(self) -> List[str]:
+        return list(self._handlers)
+    
+    def execute_command(self, command, parameters: Dict[str, Any] = None) -> bool:
+        """Executa comando do sistema (SystemCommand ou nome registrado)"""
+        if not self.initialized:
             logger.error("SystemController não inicializado")
             return False
-            
-        parameters = parameters or {}
+        
+        key = command.value if isinstance(command, SystemCommand) else command
+        handler = self._handlers.get(key)
+        if handler is None:
+            logger.warning(f"Comando não implementado: {command}")
+            return False
         
         try:
-            if command == SystemCommand.WIFI_TOGGLE:
-                return self._toggle_wifi()
-            elif command == SystemCommand.WIFI_ON:
-                return self._set_wifi(True)
-            elif command == SystemCommand.WIFI_OFF:
-                return self._set_wifi(False)
-            elif command == SystemCommand.BLUETOOTH_TOGGLE:
-                return self._toggle_bluetooth()
-            elif command == SystemCommand.BLUETOOTH_ON:
-                return self._set_bluetooth(True)
-            elif command == SystemCommand.BLUETOOTH_OFF:
-                return self._set_bluetooth(False)
-            elif command == SystemCommand.VOLUME_UP:
-                return self._adjust_volume(1)
-            elif command == SystemCommand.VOLUME_DOWN:
-                return self._adjust_volume(-1)
-            elif command == SystemCommand.VOLUME_MUTE:
-                return self._mute_volume()
-            elif command == SystemCommand.VOLUME_SET:
-                volume = parameters.get('volume', 50)
-                return self._set_volume(volume)
-            elif command == SystemCommand.LAUNCH_APP:
-                package_name = parameters.get('package_name', '')
-                return self._launch_app(package_name)
-            elif command == SystemCommand.OPEN_URL:
-                url = parameters.get('url', '')
-                return self._open_url(url)
-            elif command == SystemCommand.SEND_NOTIFICATION:
-                title = parameters.get('title', 'NFC Action')
-                message = parameters.get('message', 'Action executed')
-                return self._send_notification(title, message)
-            else:
-                logger.warning(f"Comando não implementado: {command}")
-                return False
-                
+            return handler(parameters or {})
         except Exception as e:
             logger.error(f"Erro ao executar comando {command}: {e}")
             return False
@@ -289,8 +312,7 @@ class SystemController:
     def _toggle_wifi(self) -> bool:
         """Toggle Wi-Fi"""
         try:
-            current_state = self.wifi_manager.isWifiEnabled()
-            self.wifi_manager.setWifiEnabled(not current_state)
+            self.backend.set_wifi_enabled(not self.backend.is_wifi_enabled())
             return True
         except Exception as e:
             logger.error(f"Erro ao alternar Wi-Fi: {e}")
@@ -299,7 +321,7 @@ class SystemController:
     def _set_wifi(self, enabled: bool) -> bool:
         """Liga/desliga Wi-Fi"""
         try:
-            self.wifi_manager.setWifiEnabled(enabled)
+            self.backend.set_wifi_enabled(enabled)
             return True
         except Exception as e:
             logger.error(f"Erro ao definir Wi-Fi: {e}")
@@ -308,10 +330,7 @@ class SystemController:
     def _toggle_bluetooth(self) -> bool:
         """Toggle Bluetooth"""
         try:
-            if self.bluetooth_adapter.isEnabled():
-                self.bluetooth_adapter.disable()
-            else:
-                self.bluetooth_adapter.enable()
+            self.backend.set_bluetooth_enabled(not self.backend.is_bluetooth_enabled())
             return True
         except Exception as e:
             logger.error(f"Erro ao alternar Bluetooth: {e}")
@@ -320,10 +339,7 @@ class SystemController:
     def _set_bluetooth(self, enabled: bool) -> bool:
         """Liga/desliga Bluetooth"""
         try:
-            if enabled:
-                self.bluetooth_adapter.enable()
-            else:
-                self.bluetooth_adapter.disable()
+            self.backend.set_bluetooth_enabled(enabled)
             return True
         except Exception as e:
             logger.error(f"Erro ao definir Bluetooth: {e}")
@@ -332,18 +348,7 @@ class SystemController:
     def _adjust_volume(self, direction: int) -> bool:
         """Ajusta volume (1 para cima, -1 para baixo)"""
         try:
-            if direction > 0:
-                self.audio_manager.adjustStreamVolume(
-                    self.AudioManager.STREAM_MUSIC,
-                    self.AudioManager.ADJUST_RAISE,
-                    self.AudioManager.FLAG_SHOW_UI
-                )
-            else:
-                self.audio_manager.adjustStreamVolume(
-                    self.AudioManager.STREAM_MUSIC,
-                    self.AudioManager.ADJUST_LOWER,
-                    self.AudioManager.FLAG_SHOW_UI
-                )
+            self.backend.adjust_volume(direction)
             return True
         except Exception as e:
             logger.error(f"Erro ao ajustar volume: {e}")
@@ -352,11 +357,7 @@ class SystemController:
     def _mute_volume(self) -> bool:
         """Muta/desmuta volume"""
         try:
-            self.audio_manager.adjustStreamVolume(
-                self.AudioManager.STREAM_MUSIC,
-                self.AudioManager.ADJUST_TOGGLE_MUTE,
-                self.AudioManager.FLAG_SHOW_UI
-            )
+            self.backend.toggle_mute()
             return True
         except Exception as e:
             logger.error(f"Erro ao mutar volume: {e}")
@@ -365,14 +366,7 @@ class SystemController:
     def _set_volume(self, volume: int) -> bool:
         """Define volume específico (0-100)"""
         try:
-            max_volume = self.audio_manager.getStreamMaxVolume(self.AudioManager.STREAM_MUSIC)
-            target_volume = int((volume / 100.0) * max_volume)
-            
-            self.audio_manager.setStreamVolume(
-                self.AudioManager.STREAM_MUSIC,
-                target_volume,
-                self.AudioManager.FLAG_SHOW_UI
-            )
+            self.backend.set_volume(volume)
             return True
         except Exception as e:
             logger.error(f"Erro ao definir volume: {e}")
@@ -381,11 +375,7 @@ class SystemController:
     def _launch_app(self, package_name: str) -> bool:
         """Lança aplicativo"""
         try:
-            intent = self.context.getPackageManager().getLaunchIntentForPackage(package_name)
-            if intent:
-                self.context.startActivity(intent)
-                return True
-            return False
+            return self.backend.launch_app(package_name)
         except Exception as e:
             logger.error(f"Erro ao lançar app {package_name}: {e}")
             return False
@@ -393,9 +383,7 @@ class SystemController:
     def _open_url(self, url: str) -> bool:
         """Abre URL no navegador"""
         try:
-            intent = self.Intent(self.Intent.ACTION_VIEW)
-            intent.setData(self.Uri.parse(url))
-            self.context.startActivity(intent)
+            self.backend.open_url(url)
             return True
         except Exception as e:
             logger.error(f"Erro ao abrir URL {url}: {e}")
@@ -404,8 +392,7 @@ class SystemController:
     def _send_notification(self, title: str, message: str) -> bool:
         """Envia notificação"""
         try:
-            # Implementação simplificada - requer API específica do Android
-            logger.info(f"Notificação: {title} - {message}")
+            self.backend.send_notification(title, message)
             return True
         except Exception as e:
             logger.error(f"Erro ao enviar notificação: {e}")
@@ -453,59 +440,656 @@ class TaskerIntegration:
 
 
 class BatchTaskManager:
-    """Gerenciador de tarefas em lote"""
+    """Gerenciador de tarefas em lote
     
-    def __init__(self):
+    As tarefas de um lote podem declarar dependências (grafo acíclico); as
+    independentes rodam em paralelo num pool limitado de threads, cada uma
+    com seu timeout.
+    """
+    
+    def __init__(self, max_workers: int = 4, task_timeout: Optional[float] = 30.0):
         self.batch_tasks = {}
+        self.max_workers = max_workers
+        self.task_timeout = task_timeout
+        
+    def create_batch_task(self, name: str, tasks: List[AutomationTask],
+                          dependencies: Optional[Dict[str, List[str]]] = None,
+                          task_timeout: Optional[float] = None) -> bool:
+        """Cria tarefa em lote
+        
+        dependencies: {tarefa: [tarefas que precisam terminar antes]}
+        """
+        dependencies = {task_name: list(deps) for task_name, deps in (dependencies or {}).items()}
+        try:
+            self._execution_order(tasks, dependencies)
+        except ValueError as e:
+            logger.error(f"Lote '{name}' inválido: {e}")
+            return False
         
-    def create_batch_task(self, name: str, tasks: List[AutomationTask]) -> bool:
-        """Cria tarefa em lote"""
         self.batch_tasks[name] = {
             'tasks': tasks,
+            'dependencies': dependencies,
+            'task_timeout': task_timeout,
             'created_at': datetime.now(),
             'execution_count': 0,
-            'enabled': True
+            'enabled': True,
+            'last_result': None
         }
         return True
     
     def execute_batch_task(self, name: str) -> bool:
-        """Executa tarefa em lote"""
+        """Executa tarefa em lote (True se ao menos uma tarefa teve sucesso)"""
+        result = self.run_batch_task(name)
+        return bool(result) and result['succeeded'] > 0
+    
+    def run_batch_task(self, name: str, max_workers: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Executa o lote respeitando dependências e retorna resultado detalhado"""
+        from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+        
         if name not in self.batch_tasks:
-            return False
+            return None
         
         batch = self.batch_tasks[name]
         if not batch['enabled']:
-            return False
+            return None
+        
+        tasks = {task.name: task for task in batch['tasks']}
+        dependencies = batch['dependencies']
+        timeout = batch['task_timeout'] if batch['task_timeout'] is not None else self.task_timeout
+        
+        pending_deps = {task_name: set(dependencies.get(task_name, ())) for task_name in tasks}
+        dependents = {task_name: [] for task_name in tasks}
+        for task_name, deps in pending_deps.items():
+            for dep in deps:
+                dependents[dep].append(task_name)
+        
+        results = {}
+        running = {}  # future -> nome da tarefa
+        start_times = {}  # preenchido quando a tarefa começa de fato (fora da fila)
+        started = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=max_workers or self.max_workers,
+                                      thread_name_prefix=f"batch-{name}")
+        
+        def run_task(task):
+            start_times[task.name] = time.perf_counter()
+            return task.execute()
+        
+        def submit_ready():
+            for task_name in [t for t, deps in pending_deps.items() if not deps]:
+                del pending_deps[task_name]
+                running[executor.submit(run_task, tasks[task_name])] = task_name
+        
+        def finish(task_name, status, error=None):
+            task_start = start_times.get(task_name)
+            results[task_name] = {
+                'success': status == 'ok',
+                'status': status,
+                'duration_ms': (time.perf_counter() - task_start) * 1000 if task_start else 0.0,
+                'error': error
+            }
+            for dependent in dependents[task_name]:
+                if dependent not in pending_deps:
+                    continue
+                if status == 'ok':
+                    pending_deps[dependent].discard(task_name)
+                else:
+                    skip(dependent, task_name)
+        
+        def skip(task_name, reason):
+            del pending_deps[task_name]
+            results[task_name] = {
+                'success': False,
+                'status': 'skipped',
+                'duration_ms': 0.0,
+                'error': f"Dependência '{reason}' não concluída"
+            }
+            for dependent in dependents[task_name]:
+                if dependent in pending_deps:
+                    skip(dependent, task_name)
         
         try:
-            success_count = 0
-            total_tasks = len(batch['tasks'])
-            
-            for task in batch['tasks']:
-                if task.execute():
-                    success_count += 1
-            
-            batch['execution_count'] += 1
-            
-            logger.info(f"Lote '{name}' executado: {success_count}/{total_tasks} tarefas")
-            return success_count > 0
-            
+            submit_ready()
+            while running:
+                # Espera até a próxima conclusão ou o próximo timeout
+                wait_for = None
+                if timeout is not None:
+                    now = time.perf_counter()
+                    deadlines = [start_times[task_name] + timeout - now
+                                 for task_name in running.values() if task_name in start_times]
+                    # Tarefas ainda na fila: reavalia em breve
+                    wait_for = max(0.0, min(deadlines)) if deadlines else 0.05
+                done, _ = wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    task_name = running.pop(future)
+                    try:
+                        ok = future.result()
+                        finish(task_name, 'ok' if ok else 'failed')
+                    except Exception as e:
+                        finish(task_name, 'failed', str(e))
+                
+                if timeout is not None:
+                    now = time.perf_counter()
+                    for future, task_name in list(running.items()):
+                        task_start = start_times.get(task_name)
+                        if task_start is not None and now - task_start >= timeout:
+                            # A thread não pode ser interrompida; o resultado é descartado
+                            running.pop(future)
+                            finish(task_name, 'timeout', f"Timeout após {timeout}s")
+                
+                submit_ready()
         except Exception as e:
             logger.error(f"Erro ao executar lote '{name}': {e}")
-            return False
+        finally:
+            executor.shutdown(wait=False)
+        
+        succeeded = sum(1 for result in results.values() if result['success'])
+        skipped = sum(1 for result in results.values() if result['status'] == 'skipped')
+        batch_result = {
+            'name': name,
+            'success': succeeded == len(tasks),
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded - skipped,
+            'skipped': skipped,
+            'duration_ms': (time.perf_counter() - started) * 1000,
+            'tasks': results
+        }
+        
+        batch['execution_count'] += 1
+        batch['last_result'] = batch_result
+        
+        logger.info(f"Lote '{name}' executado: {succeeded}/{len(tasks)} tarefas "
+                    f"em {batch_result['duration_ms']:.0f} ms")
+        return batch_result
     
     def list_batch_tasks(self) -> List[str]:
         """Lista tarefas em lote"""
         return list(self.batch_tasks.keys())
+    
+    @staticmethod
+    def _execution_order(tasks: List[AutomationTask], dependencies: Dict[str, List[str]]) -> List[str]:
+        """Ordem topológica das tarefas; ValueError se houver ciclo ou nome inválido"""
+        names = [task.name for task in tasks]
+        if len(set(names)) != len(names):
+            raise ValueError("Nomes de tarefas repetidos no lote")
+        
+        for task_name, deps in dependencies.items():
+            for dep in [task_name] + list(deps):
+                if dep not in names:
+                    raise ValueError(f"Tarefa desconhecida: {dep}")
+        
+        remaining = {task_name: set(dependencies.get(task_name, ())) for task_name in names}
+        order = []
+        while remaining:
+            ready = [task_name for task_name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Dependência circular entre: {', '.join(sorted(remaining))}")
+            for task_name in ready:
+                del remaining[task_name]
+                order.append(task_name)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+
+class TaskHandle:
+    """Referência para uma tarefa agendada (cancelamento e resultado)"""
+    
+    def __init__(self, handle_id: int, task: AutomationTask,
+                 on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_action: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.id = handle_id
+        self.task = task
+        self.result = None
+        self.on_complete = on_complete
+        self.on_action = on_action
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._on_cancel = None
+        
+        # Posição da execução (retomada pelo agendador após cada delay)
+        self._started = time.perf_counter()
+        self._action_index = 0
+        self._iteration = 0
+        self._delay_done = False
+        self._results = []
+        self._step_lock = threading.Lock()  # um trecho por vez
+    
+    def cancel(self):
+        """Cancela a tarefa (ações em andamento terminam; as próximas não rodam)"""
+        self._cancel_event.set()
+        if self._on_cancel:
+            self._on_cancel(self)
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+    
+    @property
+    def done(self) -> bool:
+        return self._done_event.is_set()
+    
+    def wait(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Aguarda o término e retorna o resultado"""
+        self._done_event.wait(timeout)
+        return self.result
+
+
+class AutomationScheduler:
+    """Executa tarefas fora da thread de UI com delays reais, repetições,
+    cancelamento, timeout por ação e métricas de latência
+    
+    Uma única thread de despacho mantém um heap de tarefas prontas ou em
+    delay; os trechos prontos rodam num pool limitado (max_workers), então
+    uma tag que dispara 100 regras não cria 100 threads, e uma tarefa em
+    delay não ocupa nenhuma. Ações com timeout_seconds rodam num segundo
+    pool, para que o trecho possa desistir de esperar por elas.
+    """
+    
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.abandoned_actions = 0  # ações que estouraram o timeout e seguiram rodando
+        self._runner_pool = None
+        self._action_pool = None
+        self._dispatcher = None
+        self._heap = []  # (instante, sequência, handle)
+        self._sequence = itertools.count()
+        self._handles = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._dispatcher_stop = None  # Event da thread de despacho atual
+    
+    def schedule(self, task: AutomationTask,
+                 on_complete: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 on_action: Optional[Callable[[Dict[str, Any]], None]] = None) -> TaskHandle:
+        """Agenda a tarefa e retorna imediatamente
+        
+        Os callbacks rodam nas threads do agendador; na UI, repasse-os via Clock.
+        """
+        handle = TaskHandle(next(self._ids), task, on_complete, on_action)
+        handle._on_cancel = self._wake_cancelled
+        with self._lock:
+            self._handles[handle.id] = handle
+        self._push(handle, 0.0)
+        return handle
+    
+    def cancel(self, handle_id: int) -> bool:
+        with self._lock:
+            handle = self._handles.get(handle_id)
+        if handle:
+            handle.cancel()
+            return True
+        return False
+    
+    def cancel_all(self):
+        with self._lock:
+            handles = list(self._handles.values())
+        for handle in handles:
+            handle.cancel()
+    
+    def active_handles(self) -> List[TaskHandle]:
+        with self._lock:
+            return list(self._handles.values())
+    
+    def get_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Latência por tipo de ação (segundos)"""
+        from utils import performance_monitor
+        return {
+            operation[len('automation.'):]: stats
+            for operation, stats in performance_monitor.get_stats().items()
+            if operation.startswith('automation.')
+        }
+    
+    def shutdown(self):
+        self.cancel_all()
+        with self._lock:
+            # Só a thread atual para; uma nova (após schedule) tem seu próprio Event
+            if self._dispatcher_stop:
+                self._dispatcher_stop.set()
+            self._wakeup.notify_all()
+            waiting = [handle for _, _, handle in self._heap]
+            self._heap.clear()
+            pools = (self._runner_pool, self._action_pool)
+            self._runner_pool = self._action_pool = None
+            self._dispatcher = None
+        for pool in pools:
+            if pool:
+                pool.shutdown(wait=False)
+        # Tarefas que aguardavam delay terminam como canceladas
+        for handle in waiting:
+            if not handle.done and handle._step_lock.acquire(blocking=False):
+                try:
+                    self._finish(handle)
+                finally:
+                    handle._step_lock.release()
+    
+    def _push(self, handle: TaskHandle, delay: float):
+        """Coloca o handle no heap para rodar daqui a `delay` segundos"""
+        import heapq
+        with self._lock:
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), handle))
+            if self._dispatcher is None:
+                self._dispatcher_stop = threading.Event()
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, args=(self._dispatcher_stop,),
+                    name='automation-dispatcher', daemon=True
+                )
+                self._dispatcher.start()
+            # notify_all: uma thread encerrada por shutdown pode ainda estar na espera
+            self._wakeup.notify_all()
+    
+    def _wake_cancelled(self, handle: TaskHandle):
+        """Tarefa cancelada durante um delay termina sem esperar o prazo"""
+        if handle._delay_done and not handle.done:
+            self._push(handle, 0.0)
+    
+    def _dispatch_loop(self, stop: threading.Event):
+        """Thread de despacho: entrega ao pool os handles cujo instante chegou"""
+        import heapq
+        while True:
+            with self._lock:
+                while not stop.is_set():
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._wakeup.wait(wait)
+                    else:
+                        self._wakeup.wait()
+                if stop.is_set():
+                    return
+                _, _, handle = heapq.heappop(self._heap)
+            if not handle.done:
+                self._get_runner_pool().submit(self._step, handle)
+    
+    def _get_runner_pool(self):
+        with self._lock:
+            if self._runner_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._runner_pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='automation-task'
+                )
+            return self._runner_pool
+    
+    def _get_action_pool(self):
+        with self._lock:
+            if self._action_pool is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._action_pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='automation-action'
+                )
+            return self._action_pool
+    
+    def _retire_action_pool(self, pool):
+        """Descarta o pool com um worker preso; novas ações usam um pool novo"""
+        with self._lock:
+            self.abandoned_actions += 1
+            if self._action_pool is pool:
+                self._action_pool = None
+        pool.shutdown(wait=False)
+    
+    def _step(self, handle: TaskHandle):
+        """Executa a tarefa até o próximo delay (reagendado no heap) ou até o fim"""
+        # Cancelamento durante um delay pode deixar duas entradas no heap
+        if not handle._step_lock.acquire(blocking=False):
+            return
+        try:
+            if not handle.done:
+                self._advance(handle)
+        finally:
+            handle._step_lock.release()
+    
+    def _advance(self, handle: TaskHandle):
+        task = handle.task
+        
+        try:
+            if task.enabled:
+                while handle._action_index < len(task.actions) and not handle.cancelled:
+                    action = task.actions[handle._action_index]
+                    if handle._iteration >= action.repeat_count or not action.can_execute():
+                        handle._action_index += 1
+                        handle._iteration = 0
+                        continue
+                    
+                    # O delay não ocupa thread: o trecho volta ao heap e é retomado depois
+                    if action.delay_seconds and not handle._delay_done:
+                        handle._delay_done = True
+                        self._push(handle, action.delay_seconds)
+                        return
+                    handle._delay_done = False
+                    
+                    result = self._run_action(task, action, handle._iteration)
+                    handle._results.append(result)
+                    handle._iteration += 1
+                    if handle.on_action:
+                        self._notify(handle.on_action, result)
+                
+                # Tarefa cancelada não conta como execução
+                if not handle.cancelled:
+                    task.mark_executed()
+        except Exception as e:
+            logger.error(f"Erro no agendador para '{task.name}': {e}")
+        
+        self._finish(handle)
+    
+    def _finish(self, handle: TaskHandle):
+        task = handle.task
+        results = handle._results
+        succeeded = sum(1 for result in results if result['success'])
+        handle.result = {
+            'task_name': task.name,
+            'success': succeeded > 0,
+            'cancelled': handle.cancelled,
+            'actions': results,
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'duration_ms': (time.perf_counter() - handle._started) * 1000
+        }
+        
+        with self._lock:
+            self._handles.pop(handle.id, None)
+        
+        logger.info(f"Tarefa '{task.name}' concluída: {succeeded}/{len(results)} execuções"
+                    f"{' (cancelada)' if handle.cancelled else ''}")
+        if handle.on_complete:
+            self._notify(handle.on_complete, handle.result)
+        handle._done_event.set()
+    
+    def _run_action(self, task: AutomationTask, action: TaskAction, iteration: int) -> Dict[str, Any]:
+        """Executa uma ação, respeitando o timeout
+        
+        Sem timeout a ação roda na própria thread do trecho. Com timeout roda
+        no pool de ações; se estourar, a ação é cancelada quando ainda está na
+        fila, ou o pool é descartado para não prender as próximas.
+        """
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        from utils import performance_monitor
+        
+        start = time.perf_counter()
+        error = None
+        try:
+            if action.timeout_seconds is None:
+                success = bool(task._execute_action(action))
+            else:
+                pool = self._get_action_pool()
+                future = pool.submit(task._execute_action, action)
+                try:
+                    success = bool(future.result(timeout=action.timeout_seconds))
+                except FutureTimeoutError:
+                    success = False
+                    error = f"Timeout após {action.timeout_seconds}s"
+                    if not future.cancel():
+                        self._retire_action_pool(pool)
+        except Exception as e:
+            success = False
+            error = str(e)
+        
+        latency = time.perf_counter() - start
+        performance_monitor.record(f"automation.{action.action_type}", latency)
+        
+        return {
+            'action_type': action.action_type,
+            'iteration': iteration,
+            'success': success,
+            'error': error,
+            'latency_ms': latency * 1000
+        }
+    
+    @staticmethod
+    def _notify(callback, result):
+        try:
+            callback(result)
+        except Exception as e:
+            logger.error(f"Erro no callback do agendador: {e}")
+
+
+class TriggerIndex:
+    """Índice de gatilhos: tag aproximada -> tarefas a disparar
+    
+    Gatilhos suportados (AutomationTask.add_trigger):
+      - 'tag_uid':      {'uid': '04A1B2C3'}
+      - 'payload_hash': {'hash': sha256 hex da mensagem NDEF completa}
+      - 'mime_type':    {'mime_type': 'application/x-car'}
+      - 'uri_prefix':   {'prefix': 'https://exemplo.com/casa'}
+    
+    As três primeiras são consultas diretas em dicionário; prefixos de URI
+    são consultados uma vez por comprimento distinto de prefixo registrado.
+    """
+    
+    KEY_FIELDS = {
+        'tag_uid': 'uid',
+        'payload_hash': 'hash',
+        'mime_type': 'mime_type',
+        'uri_prefix': 'prefix',
+    }
+    
+    def __init__(self):
+        self._by_kind = {kind: {} for kind in self.KEY_FIELDS}
+        self._prefix_lengths = []  # comprimentos distintos, em ordem crescente
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def normalize(kind: str, value: Any) -> Optional[str]:
+        """Normaliza a chave (UID em hex maiúsculo sem separadores, MIME em minúsculas)"""
+        if value is None or value == '':
+            return None
+        value = str(value)
+        if kind == 'tag_uid':
+            return value.replace(':', '').replace(' ', '').upper()
+        if kind in ('payload_hash', 'mime_type'):
+            return value.strip().lower()
+        return value
+    
+    @staticmethod
+    def hash_payload(raw_message: bytes) -> str:
+        return hashlib.sha256(raw_message).hexdigest()
+    
+    @staticmethod
+    def extract_keys(raw_message: bytes) -> Tuple[List[str], List[str]]:
+        """Tipos MIME e URIs presentes numa mensagem NDEF"""
+        mime_types, uris = [], []
+        try:
+            for record in iter_records(raw_message):
+                if record.tnf == TNF_MIME_MEDIA:
+                    mime_types.append(record.type.decode('ascii', 'replace').lower())
+                elif record.tnf == TNF_ABSOLUTE_URI:
+                    uris.append(record.type.decode('utf-8', 'replace'))
+                elif record.is_well_known(RTD_URI):
+                    uris.append(decode_uri_payload(record.payload))
+                elif record.is_well_known(RTD_SMART_POSTER):
+                    for nested in iter_records(record.payload):
+                        if nested.is_well_known(RTD_URI):
+                            uris.append(decode_uri_payload(nested.payload))
+        except ValueError as e:
+            logger.debug(f"Mensagem NDEF inválida para gatilhos: {e}")
+        return mime_types, uris
+    
+    def add_task(self, task: AutomationTask):
+        """Indexa todos os gatilhos da tarefa"""
+        with self._lock:
+            for trigger in task.triggers:
+                kind = trigger.get('type')
+                if kind not in self.KEY_FIELDS:
+                    continue
+                key = self.normalize(kind, trigger.get('data', {}).get(self.KEY_FIELDS[kind]))
+                if key is None:
+                    continue
+                names = self._by_kind[kind].setdefault(key, [])
+                if task.name not in names:
+                    names.append(task.name)
+            self._update_prefix_lengths()
+    
+    def remove_task(self, task_name: str):
+        """Remove a tarefa de todas as entradas"""
+        with self._lock:
+            for entries in self._by_kind.values():
+                for key in [key for key, names in entries.items() if task_name in names]:
+                    entries[key].remove(task_name)
+                    if not entries[key]:
+                        del entries[key]
+            self._update_prefix_lengths()
+    
+    def match(self, tag_uid: Optional[str] = None, payload_hashes: Iterable[str] = (),
+              mime_types: Iterable[str] = (), uris: Iterable[str] = ()) -> List[str]:
+        """Tarefas disparadas pela tag, sem repetição, na ordem de descoberta"""
+        found = {}
+        by_kind = self._by_kind
+        
+        def collect(kind, value):
+            key = self.normalize(kind, value)
+            if key is not None:
+                for name in by_kind[kind].get(key, ()):
+                    found[name] = True
+        
+        # Mesmo lock de add_task/remove_task: as listas de nomes são alteradas no lugar
+        with self._lock:
+            collect('tag_uid', tag_uid)
+            for payload_hash in payload_hashes:
+                collect('payload_hash', payload_hash)
+            for mime_type in mime_types:
+                collect('mime_type', mime_type)
+            
+            prefixes = by_kind['uri_prefix']
+            for uri in uris:
+                for length in self._prefix_lengths:
+                    if length > len(uri):
+                        break
+                    for name in prefixes.get(uri[:length], ()):
+                        found[name] = True
+        
+        return list(found)
+    
+    def match_message(self, tag_uid: Optional[str], raw_messages: Iterable[bytes]) -> List[str]:
+        """Consulta o índice a partir da tag e das mensagens NDEF brutas"""
+        payload_hashes, mime_types, uris = [], [], []
+        for raw_message in raw_messages:
+            payload_hashes.append(self.hash_payload(raw_message))
+            message_mimes, message_uris = self.extract_keys(raw_message)
+            mime_types.extend(message_mimes)
+            uris.extend(message_uris)
+        return self.match(tag_uid, payload_hashes, mime_types, uris)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._by_kind.values())
+    
+    def _update_prefix_lengths(self):
+        self._prefix_lengths = sorted({len(prefix) for prefix in self._by_kind['uri_prefix']})
 
 
 class AutomationEngine:
     """Motor principal de automação"""
     
-    def __init__(self):
-        self.system_controller = SystemController()
-        self.tasker_integration = TaskerIntegration()
-        self.batch_manager = BatchTaskManager()
+    def __init__(self, system_controller: Optional['SystemController'] = None,
+                 tasker_integration: Optional['TaskerIntegration'] = None,
+                 batch_manager: Optional['BatchTaskManager'] = None):
+        # Por padrão compartilha os serviços globais
+        self.system_controller = system_controller or services.get('system_controller')
+        self.tasker_integration = tasker_integration or services.get('tasker_integration')
+        self.batch_manager = batch_manager or services.get('batch_manager')
+        self.scheduler = AutomationScheduler()
+        self.trigger_index = TriggerIndex()
         self.automation_tasks = {}
         self.execution_history = []
         
@@ -518,34 +1102,84 @@ class AutomationEngine:
         return system_init  # Tasker é opcional
     
     def register_task(self, task: AutomationTask):
-        """Registra tarefa de automação"""
+        """Registra tarefa de automação (e indexa seus gatilhos)"""
+        if task.name in self.automation_tasks:
+            self.trigger_index.remove_task(task.name)
         self.automation_tasks[task.name] = task
-        
-    def execute_task(self, task_name: str) -> bool:
-        """Executa tarefa específica"""
-        if task_name not in self.automation_tasks:
+        self.trigger_index.add_task(task)
+    
+    def unregister_task(self, task_name: str) -> bool:
+        """Remove tarefa de automação"""
+        if self.automation_tasks.pop(task_name, None) is None:
+            return False
+        self.trigger_index.remove_task(task_name)
+        return True
+    
+    def add_trigger(self, task_name: str, trigger_type: str, trigger_data: Dict[str, Any]) -> bool:
+        """Adiciona gatilho a uma tarefa registrada, mantendo o índice atualizado"""
+        task = self.automation_tasks.get(task_name)
+        if task is None:
             return False
+        task.add_trigger(trigger_type, trigger_data)
+        self.trigger_index.add_task(task)
+        return True
+    
+    def dispatch_tag(self, tag_uid: Optional[str], raw_messages: Iterable[bytes] = (),
+                     on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[TaskHandle]:
+        """Dispara em segundo plano as tarefas associadas à tag aproximada"""
+        handles = []
+        for task_name in self.trigger_index.match_message(tag_uid, raw_messages):
+            task = self.automation_tasks.get(task_name)
+            if task and task.enabled:
+                handles.append(self.schedule_task(task_name, on_complete=on_complete))
+        return handles
         
-        task = self.automation_tasks[task_name]
-        success = task.execute()
+    def execute_task(self, task_name: str, timeout: Optional[float] = None) -> bool:
+        """Executa tarefa específica e aguarda o resultado
         
-        # Registra no histórico
-        self.execution_history.append({
-            'timestamp': datetime.now().isoformat(),
-            'task_name': task_name,
-            'success': success,
-            'action_count': len(task.actions)
-        })
+        Roda no agendador, mas bloqueia a thread chamadora até o fim (delays
+        incluídos): use apenas fora da thread de UI; nela, use schedule_task.
+        """
+        handle = self.schedule_task(task_name)
+        if handle is None:
+            return False
+        result = handle.wait(timeout)
+        return bool(result and result['success'])
+    
+    def schedule_task(self, task_name: str,
+                      on_complete: Optional[Callable[[Dict[str, Any]], None]] = None) -> Optional[TaskHandle]:
+        """Executa tarefa em segundo plano, sem bloquear a interface"""
+        task = self.automation_tasks.get(task_name)
+        if task is None:
+            return None
         
-        return success
+        def record(result):
+            self.execution_history.append({
+                'timestamp': datetime.now().isoformat(),
+                'task_name': task_name,
+                'success': result['success'],
+                'action_count': len(task.actions),
+                'duration_ms': result['duration_ms'],
+                'cancelled': result['cancelled']
+            })
+            if on_complete:
+                on_complete(result)
+        
+        return self.scheduler.schedule(task, on_complete=record)
     
     def get_execution_history(self) -> List[Dict[str, Any]]:
         """Retorna histórico de execuções"""
         return self.execution_history.copy()
 
 
-# Instâncias globais
-automation_engine = AutomationEngine()
-system_controller = SystemController()
-tasker_integration = TaskerIntegration()
-batch_manager = BatchTaskManager()
+# Serviços construídos sob demanda (nada é instanciado na importação)
+services.register('system_controller', SystemController)
+services.register('tasker_integration', TaskerIntegration)
+services.register('batch_manager', BatchTaskManager)
+services.register('automation_engine', AutomationEngine)
+
+# Instâncias globais (referências preguiçosas aos serviços)
+automation_engine = services.proxy('automation_engine')
+system_controller = services.proxy('system_controller')
+tasker_integration = services.proxy('tasker_integration')
+batch_manager = services.proxy('batch_manager')
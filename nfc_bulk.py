@@ -0,0 +1,380 @@
+"""
+📦 NFC Bulk Module - Provisionamento de Tags em Lote
+====================================================
+
+Grava N payloads distintos (lidos de um arquivo CSV, JSON ou JSON Lines) em
+N tags, avançando automaticamente a cada toque bem-sucedido. As próximas
+mensagens são pré-codificadas, falhas são registradas e o progresso é
+salvo em checkpoint para retomar após reiniciar o app.
+"""
+
+import csv
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, Optional, Callable, Iterator, Tuple
+
+from nfc_writer import NFCWriter, NFCDataBuilder, data_builder
+from services import services
+
+logger = logging.getLogger(__name__)
+
+
+CHECKPOINT_FILE = 'bulk_checkpoint.json'
+MAX_FAILURES_KEPT = 100  # falhas mais recentes mantidas no checkpoint
+
+
+def row_to_record(row: Dict[str, Any], builder: NFCDataBuilder = data_builder,
+                  default_type: str = "") -> Dict[str, Any]:
+    """Converte uma linha do arquivo em registro do NFCDataBuilder"""
+    record_type = str(row.get('type') or default_type or '').strip().lower()
+
+    # Sem coluna de tipo: deduz pelo conteúdo
+    if not record_type:
+        if row.get('uri') or row.get('url'):
+            record_type = 'uri'
+        elif row.get('name'):
+            record_type = 'contact'
+        elif row.get('text'):
+            record_type = 'text'
+        else:
+            raise ValueError("Não foi possível determinar o tipo do registro")
+
+    if record_type in ('uri', 'url'):
+        return builder.build_uri_record(row.get('uri') or row.get('url') or '')
+    elif record_type == 'text':
+        return builder.build_text_record(row.get('text', ''), row.get('language') or 'pt')
+    elif record_type in ('contact', 'vcard'):
+        return builder.build_contact_record(
+            row.get('name', ''), row.get('phone', ''),
+            row.get('email', ''), row.get('organization', '')
+        )
+    elif record_type == 'phone':
+        return builder.build_phone_record(row.get('phone', ''))
+    elif record_type == 'sms':
+        return builder.build_sms_record(row.get('phone', ''), row.get('message', ''))
+    elif record_type == 'email':
+        return builder.build_email_record(
+            row.get('email', ''), row.get('subject', ''), row.get('body', '')
+        )
+    elif record_type == 'location':
+        return builder.build_location_record(
+            row.get('latitude', 0.0), row.get('longitude', 0.0), row.get('name', '')
+        )
+    elif record_type == 'wifi':
+        hidden = str(row.get('hidden', '')).lower() in ('1', 'true', 'sim', 'yes')
+        return builder.build_wifi_record(
+            row.get('ssid', ''), row.get('password', ''),
+            row.get('security') or 'WPA2', hidden
+        )
+    elif record_type == 'app_launcher':
+        return builder.build_app_launcher_record(
+            row.get('package_name', ''), row.get('activity', '')
+        )
+    else:
+        raise ValueError(f"Tipo de registro não suportado: {record_type}")
+
+
+def iter_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """Lê linhas de um arquivo CSV, JSON (lista de objetos) ou JSON Lines
+
+    CSV e JSON Lines são lidos sob demanda; um arquivo .json é um único
+    documento e precisa ser carregado inteiro.
+    """
+    lower_path = path.lower()
+    if lower_path.endswith(('.jsonl', '.ndjson')):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    elif lower_path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('rows', [data])
+        if not isinstance(data, list):
+            raise ValueError("Arquivo JSON deve conter uma lista de objetos")
+        yield from data
+    else:
+        # utf-8-sig: CSVs exportados pelo Excel começam com BOM
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row
+
+
+class BulkProvisioningJob:
+    """Job de gravação em lote guiado por toques"""
+
+    def __init__(self, source_path: str, writer: Optional[NFCWriter] = None,
+                 builder: Optional[NFCDataBuilder] = None, lookahead: int = 8,
+                 max_attempts: int = 3, default_type: str = "",
+                 checkpoint_file: str = CHECKPOINT_FILE, checkpoint_every: int = 10,
+                 checkpoint_interval: float = 5.0):
+        self.source_path = os.path.abspath(source_path)
+        self.writer = writer or services.get('nfc_writer')
+        self.builder = builder or services.get('data_builder')
+        self.lookahead = max(1, lookahead)
+        self.max_attempts = max(1, max_attempts)
+        self.default_type = default_type
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.checkpoint_interval = checkpoint_interval
+        self.on_progress = None
+
+        self.running = False
+        self.finished = False
+        self.rows_read = 0
+        self.written = 0
+        self.skipped = 0
+        self.failure_count = 0
+        self.failures = deque(maxlen=MAX_FAILURES_KEPT)  # falhas mais recentes
+        self.started_at = None
+
+        self._rows = None
+        self._exhausted = False
+        self._in_flight = deque()  # índices de linha enfileirados, em ordem
+        self._attempts = {}
+        self._failed_rows = set()
+        self._recent = deque(maxlen=50)  # instantes das últimas gravações
+        self._unsaved_results = 0
+        self._last_checkpoint = 0.0
+        self._lock = threading.RLock()
+
+    def start(self, resume: bool = True,
+              on_progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> bool:
+        """Inicia (ou retoma) a gravação em lote"""
+        if self.running:
+            return True
+
+        self.on_progress = on_progress
+        start_row = 0
+
+        if resume:
+            checkpoint = self.load_checkpoint()
+            # Checkpoint de lote concluído não é retomado: o arquivo é gravado de novo
+            if (checkpoint and checkpoint.get('source') == self.source_path
+                    and not checkpoint.get('finished')):
+                start_row = checkpoint.get('next_row', 0)
+                self.written = checkpoint.get('written', 0)
+                self.skipped = checkpoint.get('skipped', 0)
+                self.failures.extend(checkpoint.get('failures', []))
+                self.failure_count = checkpoint.get('failure_count', len(self.failures))
+                self._failed_rows = set(checkpoint.get('failed_rows', []))
+                logger.info(f"Retomando lote a partir da linha {start_row}")
+
+        try:
+            self._rows = self._numbered_rows(start_row)
+            self.rows_read = start_row
+            self._exhausted = False
+            self.finished = False
+            self.started_at = time.monotonic()
+            self._last_checkpoint = self.started_at
+            self._recent.clear()
+            self.running = True
+            self._fill()
+        except (OSError, ValueError) as e:
+            logger.error(f"Erro ao abrir arquivo do lote: {e}")
+            self.running = False
+            return False
+
+        if not self._in_flight:
+            self._finish()
+            return True
+
+        if not self.writer.start_write_session(owner=self):
+            with self._lock:
+                self.running = False
+                self._discard_in_flight()
+                self._close_rows()
+            return False
+
+        return True
+
+    def stop(self):
+        """Interrompe o lote mantendo o checkpoint"""
+        with self._lock:
+            if not self.running:
+                return
+            self.running = False
+            self.save_checkpoint()
+            self._discard_in_flight()
+            self._close_rows()
+        # Só sai da sessão: uma escrita única em andamento continua
+        self.writer.stop_write_session(owner=self)
+        self._notify()
+
+    def get_progress(self) -> Dict[str, Any]:
+        """Retorna progresso e vazão (tags/minuto)"""
+        with self._lock:
+            elapsed = time.monotonic() - self.started_at if self.started_at else 0.0
+
+            # Vazão atual calculada sobre as últimas gravações
+            if len(self._recent) >= 2:
+                window = self._recent[-1] - self._recent[0]
+                current_rate = (len(self._recent) - 1) * 60.0 / window if window > 0 else 0.0
+            else:
+                current_rate = 0.0
+
+            return {
+                'running': self.running,
+                'finished': self.finished,
+                'rows_read': self.rows_read,
+                'written': self.written,
+                'skipped': self.skipped,
+                'pending': len(self._in_flight),
+                'failures': self.failure_count,
+                'elapsed': elapsed,
+                'tags_per_minute': current_rate,
+            }
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Carrega o checkpoint salvo"""
+        from utils import file_manager
+        return file_manager.load_json(self.checkpoint_file)
+
+    def save_checkpoint(self):
+        """Salva o progresso atual (JSON compacto, gravação atômica)"""
+        from utils import file_manager
+        with self._lock:
+            next_row = self._in_flight[0] if self._in_flight else self.rows_read
+            # Falhas anteriores a next_row não são relidas na retomada
+            self._failed_rows = {row for row in self._failed_rows if row >= next_row}
+            checkpoint = {
+                'source': self.source_path,
+                'next_row': next_row,
+                'finished': self.finished,
+                'written': self.written,
+                'skipped': self.skipped,
+                'failure_count': self.failure_count,
+                'failed_rows': sorted(self._failed_rows),
+                'failures': list(self.failures),
+                'updated_at': datetime.now().isoformat()
+            }
+            self._unsaved_results = 0
+            self._last_checkpoint = time.monotonic()
+        try:
+            path = os.path.join(file_manager.ensure_app_directory(), self.checkpoint_file)
+            file_manager.write_atomic(path, json.dumps(checkpoint, ensure_ascii=False))
+        except OSError as e:
+            logger.error(f"Erro ao salvar checkpoint do lote: {e}")
+
+    def _maybe_save_checkpoint(self):
+        """Salva o checkpoint a cada checkpoint_every resultados ou checkpoint_interval s"""
+        self._unsaved_results += 1
+        if (self._unsaved_results >= self.checkpoint_every or
+                time.monotonic() - self._last_checkpoint >= self.checkpoint_interval):
+            self.save_checkpoint()
+
+    def _numbered_rows(self, start_row: int) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for row_index, row in enumerate(iter_rows(self.source_path)):
+            if row_index >= start_row:
+                yield row_index, row
+
+    def _discard_in_flight(self):
+        """Remove da sessão apenas as mensagens enfileiradas por este lote"""
+        for row_index in self._in_flight:
+            self.writer.session.discard(row_index)
+        self._in_flight.clear()
+
+    def _close_rows(self):
+        if self._rows is not None:
+            self._rows.close()
+            self._rows = None
+
+    def _fill(self):
+        """Pré-codifica mensagens até completar a janela de lookahead"""
+        with self._lock:
+            while self.running and not self._exhausted and len(self._in_flight) < self.lookahead:
+                try:
+                    row_index, row = next(self._rows)
+                except StopIteration:
+                    self._exhausted = True
+                    self._close_rows()
+                    break
+
+                self.rows_read = row_index + 1
+                if row_index in self._failed_rows:
+                    # Linha já registrada como falha antes do checkpoint
+                    continue
+
+                try:
+                    record = row_to_record(row, self.builder, self.default_type)
+                    message = self.writer.encoder.encode_message([record])
+                    if not message:
+                        raise ValueError("Registro sem conteúdo codificável")
+                except (ValueError, KeyError, TypeError) as e:
+                    self._record_failure(row_index, f"Codificação: {e}")
+                    self.skipped += 1
+                    continue
+
+                label = str(row.get('label') or row.get('name') or row.get('uri') or
+                            row.get('url') or f"Linha {row_index + 1}")
+                self._in_flight.append(row_index)
+                # records: linhas grandes demais para a tag são recodificadas pelo planejador
+                self.writer.queue_message(message, label, 1, key=row_index,
+                                          records=[record], on_result=self._on_result)
+
+    def _on_result(self, result: Dict[str, Any]):
+        """Resultado de cada toque (thread da sessão de escrita)"""
+        row_index = result.get('key')
+
+        with self._lock:
+            if not self.running or row_index not in self._in_flight:
+                return
+
+            if result['success']:
+                self._in_flight.remove(row_index)
+                self._attempts.pop(row_index, None)
+                self.written += 1
+                self._recent.append(time.monotonic())
+            else:
+                attempts = self._attempts.get(row_index, 0) + 1
+                self._attempts[row_index] = attempts
+                if attempts >= self.max_attempts:
+                    # Desiste da linha e segue para a próxima
+                    self.writer.session.discard(row_index)
+                    self._in_flight.remove(row_index)
+                    self._attempts.pop(row_index, None)
+                    self._record_failure(row_index, result.get('error', ''))
+                    self.skipped += 1
+
+            self._fill()
+            done = self._exhausted and not self._in_flight
+            if not done:
+                self._maybe_save_checkpoint()
+
+        if done:
+            self._finish()
+        else:
+            self._notify()
+
+    def _finish(self):
+        with self._lock:
+            self.running = False
+            self.finished = True
+            self.save_checkpoint()
+        self.writer.stop_write_session(owner=self)
+        logger.info(f"Lote concluído: {self.written} gravadas, {self.skipped} ignoradas")
+        self._notify()
+
+    def _record_failure(self, row_index: int, error: str):
+        self._failed_rows.add(row_index)
+        self.failure_count += 1
+        self.failures.append({
+            'row': row_index,
+            'error': error,
+            'timestamp': datetime.now().isoformat()
+        })
+        logger.warning(f"Linha {row_index + 1} ignorada: {error}")
+
+    def _notify(self):
+        if self.on_progress:
+            try:
+                self.on_progress(self.get_progress())
+            except Exception as e:
+                logger.error(f"Erro no callback de progresso do lote: {e}")
@@ -0,0 +1,268 @@
+"""
+🧪 NFC Emulator Module - Emulador de Tags e Replay de Leituras
+==============================================================
+
+Imita as classes Android usadas na leitura (NfcAdapter, Tag, NdefMessage e a
+Intent entregue ao app) para alimentar o caminho real de leitura
+(handle_intent -> decodificação -> histórico -> interface) fora do aparelho.
+
+Permite reproduzir dumps de tags capturados em campo e medir a vazão de
+decodificação e renderização no desktop, a uma taxa configurável.
+"""
+
+import json
+import logging
+import time
+from typing import Dict, List, Any, Optional, Callable, Iterable
+
+from ndef_codec import serialize_message, text_record, uri_record, mime_record
+
+logger = logging.getLogger(__name__)
+
+
+class EmulatedNfcAdapter:
+    """Constantes de android.nfc.NfcAdapter usadas pelo app"""
+
+    ACTION_NDEF_DISCOVERED = 'android.nfc.action.NDEF_DISCOVERED'
+    ACTION_TECH_DISCOVERED = 'android.nfc.action.TECH_DISCOVERED'
+    ACTION_TAG_DISCOVERED = 'android.nfc.action.TAG_DISCOVERED'
+    EXTRA_TAG = 'android.nfc.extra.TAG'
+    EXTRA_ID = 'android.nfc.extra.ID'
+    EXTRA_NDEF_MESSAGES = 'android.nfc.extra.NDEF_MESSAGES'
+
+    @staticmethod
+    def getDefaultAdapter(context=None):
+        return None
+
+
+class EmulatedNdefMessage:
+    """Equivalente a android.nfc.NdefMessage, sobre os bytes da mensagem"""
+
+    def __init__(self, raw: bytes):
+        self.raw = bytes(raw)
+
+    def cast(self, cls):
+        return self
+
+    def toByteArray(self) -> bytes:
+        return self.raw
+
+
+class EmulatedTag:
+    """Tag emulada: UID, tecnologias e mensagens NDEF (bytes)"""
+
+    def __init__(self, uid: bytes, messages: Iterable[bytes] = (),
+                 tech_list: Iterable[str] = ('android.nfc.tech.Ndef',)):
+        self.uid = bytes(uid)
+        self.messages = [bytes(message) for message in messages]
+        self.tech_list = list(tech_list)
+
+    def getId(self) -> bytes:
+        return self.uid
+
+    def getTechList(self) -> List[str]:
+        return self.tech_list
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Converte para dicionário (formato dos dumps)"""
+        return {
+            'uid': self.uid.hex().upper(),
+            'messages': [message.hex() for message in self.messages],
+            'tech_list': self.tech_list
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EmulatedTag':
+        """Cria a partir de dicionário (formato dos dumps)"""
+        uid = bytes.fromhex(data.get('uid', '').replace(':', '').replace(' ', ''))
+        messages = [bytes.fromhex(message) for message in data.get('messages', [])]
+        return cls(uid, messages, data.get('tech_list', ('android.nfc.tech.Ndef',)))
+
+
+class EmulatedIntent:
+    """Intent entregue pelo sistema quando uma tag é aproximada
+
+    Com debounce=False o app não aplica o filtro de toques repetidos (replays
+    repetem tags de propósito); com debounce=True o app marca `suppressed`
+    quando descarta o toque.
+    """
+
+    def __init__(self, tag: EmulatedTag, action: Optional[str] = None, debounce: bool = False):
+        self.tag = tag
+        self.debounce = debounce
+        self.suppressed = False
+        if action is None:
+            action = (EmulatedNfcAdapter.ACTION_NDEF_DISCOVERED if tag.messages
+                      else EmulatedNfcAdapter.ACTION_TAG_DISCOVERED)
+        self.action = action
+        self.ndef_messages = [EmulatedNdefMessage(message) for message in tag.messages]
+
+    def getAction(self) -> str:
+        return self.action
+
+    def getParcelableExtra(self, name: str):
+        return self.tag if name == EmulatedNfcAdapter.EXTRA_TAG else None
+
+    def getParcelableArrayExtra(self, name: str):
+        if name == EmulatedNfcAdapter.EXTRA_NDEF_MESSAGES and self.ndef_messages:
+            return self.ndef_messages
+        return None
+
+    def getByteArrayExtra(self, name: str) -> Optional[bytes]:
+        return self.tag.uid if name == EmulatedNfcAdapter.EXTRA_ID else None
+
+
+def load_dump(path: str) -> List[EmulatedTag]:
+    """Carrega tags de um dump JSON (lista de {'uid', 'messages', 'tech_list'})"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get('tags', [data])
+    return [EmulatedTag.from_dict(item) for item in data]
+
+
+def save_dump(path: str, tags: Iterable[EmulatedTag]):
+    """Salva tags em um dump JSON, reproduzível com load_dump"""
+    from utils import file_manager
+    file_manager.write_atomic(path, json.dumps([tag.to_dict() for tag in tags], indent=2))
+
+
+def synthetic_tags(count: int = 10, first_uid: int = 0x04A10000) -> List[EmulatedTag]:
+    """Tags de exemplo (texto, URI, MIME, várias mensagens e vazia), UIDs distintos"""
+    samples = [
+        [serialize_message([text_record('Hello World - NFC Test!', 'pt')])],
+        [serialize_message([uri_record('https://www.exemplo.com/nfc')])],
+        [serialize_message([mime_record('application/json', b'{"sala": 42, "ativo": true}')])],
+        [serialize_message([text_record('Cartão de visita', 'pt'),
+                            uri_record('tel:+5511999999999'),
+                            uri_record('mailto:contato@exemplo.com')])],
+        [serialize_message([text_record('Mensagem 1', 'pt')]),
+         serialize_message([uri_record('https://www.exemplo.com/2')])],
+        [],
+    ]
+    return [
+        EmulatedTag((first_uid + i).to_bytes(7, 'big'), samples[i % len(samples)])
+        for i in range(count)
+    ]
+
+
+def _summarize(durations: List[float], elapsed: float, suppressed: int = 0) -> Dict[str, Any]:
+    """Estatísticas de uma sessão de replay (durações em segundos)
+
+    Toques descartados pelo debounce não entram nas durações nem na vazão.
+    """
+    ordered = sorted(durations)
+    count = len(ordered)
+    return {
+        'taps': count,
+        'suppressed': suppressed,
+        'elapsed_ms': elapsed * 1000,
+        'taps_per_second': count / elapsed if elapsed > 0 else 0.0,
+        'mean_ms': sum(ordered) / count * 1000 if count else 0.0,
+        'p95_ms': ordered[max(0, int(count * 0.95) - 1)] * 1000 if count else 0.0,
+        'max_ms': ordered[-1] * 1000 if count else 0.0,
+    }
+
+
+class ReplaySession:
+    """Replay em andamento no relógio do Kivy"""
+
+    def __init__(self, tags: List[EmulatedTag], repeat: int):
+        self.tags = tags
+        self.total = len(tags) * max(1, repeat)
+        self.position = 0
+        self.durations = []
+        self.suppressed = 0
+        self.started = time.perf_counter()
+        self.cancelled = False
+        self.stats = None
+        self._event = None
+
+    @property
+    def done(self) -> bool:
+        return self.stats is not None
+
+    def cancel(self):
+        self.cancelled = True
+        if self._event is not None:
+            self._event.cancel()
+
+
+class TagEmulator:
+    """Entrega tags emuladas ao app como se fossem aproximadas do aparelho
+
+    `deliver` recebe a intent (normalmente NfcReaderWriterProApp.handle_intent).
+    Por padrão o debounce do app é ignorado, para que repetições e dumps com
+    a mesma tag sejam processados; debounce=True imita uma tag mantida perto
+    do aparelho, e os toques descartados são contados à parte.
+    """
+
+    def __init__(self, deliver: Callable[[EmulatedIntent], None], rate_hz: float = 2.0,
+                 debounce: bool = False):
+        self.deliver = deliver
+        self.rate_hz = rate_hz
+        self.debounce = debounce
+
+    def tap(self, tag: EmulatedTag, action: Optional[str] = None) -> Optional[float]:
+        """Aproxima uma tag; retorna o tempo de processamento (s), ou None se descartada"""
+        intent = EmulatedIntent(tag, action, self.debounce)
+        start = time.perf_counter()
+        self.deliver(intent)
+        duration = time.perf_counter() - start
+        if intent.suppressed:
+            return None
+
+        from utils import performance_monitor
+        performance_monitor.record('emulator.tap', duration)
+        return duration
+
+    def run(self, tags: Iterable[EmulatedTag], repeat: int = 1) -> Dict[str, Any]:
+        """Replay síncrono, o mais rápido possível (medição de vazão)"""
+        tags = list(tags)
+        durations = []
+        suppressed = 0
+        start = time.perf_counter()
+        for _ in range(max(1, repeat)):
+            for tag in tags:
+                duration = self.tap(tag)
+                if duration is None:
+                    suppressed += 1
+                else:
+                    durations.append(duration)
+        return _summarize(durations, time.perf_counter() - start, suppressed)
+
+    def replay(self, tags: Iterable[EmulatedTag], rate_hz: Optional[float] = None,
+               repeat: int = 1, on_done: Optional[Callable[[Dict[str, Any]], None]] = None) -> ReplaySession:
+        """Replay no relógio do Kivy, uma tag a cada 1/rate_hz segundos"""
+        from kivy.clock import Clock
+
+        session = ReplaySession(list(tags), repeat)
+        rate_hz = rate_hz or self.rate_hz
+
+        def step(dt):
+            if session.cancelled:
+                return False
+            if session.position >= session.total:
+                session.stats = _summarize(session.durations, time.perf_counter() - session.started,
+                                           session.suppressed)
+                logger.info(f"Replay NFC concluído: {session.stats['taps']} tags, "
+                            f"{session.stats['taps_per_second']:.1f} tags/s")
+                if on_done:
+                    on_done(session.stats)
+                return False
+            tag = session.tags[session.position % len(session.tags)]
+            session.position += 1
+            duration = self.tap(tag)
+            if duration is None:
+                session.suppressed += 1
+            else:
+                session.durations.append(duration)
+
+        if not session.tags:
+            session.stats = _summarize([], 0.0)
+            if on_done:
+                on_done(session.stats)
+            return session
+
+        session._event = Clock.schedule_interval(step, 1.0 / rate_hz if rate_hz > 0 else 0)
+        return session
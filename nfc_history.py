@@ -0,0 +1,252 @@
+"""
+📚 NFC History Module - Armazenamento do Histórico de Leituras
+==============================================================
+
+Backend persistente do histórico em SQLite: inserção de custo constante,
+índices por data/hora, tipo e UID da tag e consultas paginadas, para que o
+leitor rode o dia todo sem perder dados nem ficar lento.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Any, Optional, Iterator, Iterable
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryView:
+    """Visão somente leitura do buffer, da leitura mais recente para a mais antiga
+
+    Reflete o conteúdo atual do buffer sem manter cópia. Leituras chegam de
+    outras threads: o acesso usa o lock do buffer, e a iteração percorre um
+    instantâneo (limitado à capacidade) em vez do deque vivo.
+    """
+
+    __slots__ = ('_items', '_lock')
+
+    def __init__(self, items: deque, lock: threading.Lock):
+        self._items = items
+        self._lock = lock
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            items = list(self._items)
+        return reversed(items)
+
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                start, stop, step = index.indices(len(self._items))
+                if step < 1:
+                    return list(reversed(self._items))[index]
+                return list(islice(reversed(self._items), start, stop, step))
+
+            size = len(self._items)
+            if index < 0:
+                index += size
+            if not 0 <= index < size:
+                raise IndexError("índice fora do histórico")
+            return self._items[size - 1 - index]
+
+    def __repr__(self) -> str:
+        return f"HistoryView({len(self._items)} leituras)"
+
+
+class HistoryRingBuffer:
+    """Histórico em memória de capacidade fixa
+
+    Inserção e descarte da leitura mais antiga em O(1); a memória fica
+    limitada a `capacity` leituras.
+    """
+
+    def __init__(self, capacity: int = 50, readings: Iterable[Dict[str, Any]] = ()):
+        self.capacity = max(1, capacity)
+        self._items = deque(readings, maxlen=self.capacity)  # mais antiga -> mais recente
+        self._lock = threading.Lock()  # leituras chegam fora da thread de UI
+        self._view = HistoryView(self._items, self._lock)
+
+    def append(self, reading: Dict[str, Any]):
+        """Adiciona leitura (descarta a mais antiga se cheio)"""
+        with self._lock:
+            self._items.append(reading)
+
+    def view(self) -> HistoryView:
+        """Visão sem cópia, da mais recente para a mais antiga"""
+        return self._view
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Cópia independente, da mais recente para a mais antiga"""
+        with self._lock:
+            return list(reversed(self._items))
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._view)
+
+
+class HistoryStore:
+    """Histórico persistente de leituras NFC em SQLite"""
+
+    SCHEMA = (
+        '''CREATE TABLE IF NOT EXISTS readings (
+            id INTEGER PRIMARY KEY,
+            ts REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            type TEXT NOT NULL,
+            content TEXT,
+            raw_data TEXT,
+            tag_uid TEXT
+        )''',
+        'CREATE INDEX IF NOT EXISTS idx_readings_ts ON readings (ts)',
+        'CREATE INDEX IF NOT EXISTS idx_readings_type ON readings (type, id)',
+        'CREATE INDEX IF NOT EXISTS idx_readings_tag_uid ON readings (tag_uid, id)',
+    )
+
+    COLUMNS = ('id', 'ts', 'timestamp', 'type', 'content', 'raw_data', 'tag_uid')
+
+    def __init__(self, path: Optional[str] = None, filename: str = 'nfc_history.db'):
+        if path is None:
+            from utils import FileManager
+            path = os.path.join(FileManager.ensure_app_directory(), filename)
+
+        self.path = path
+        self._lock = threading.Lock()
+        # Autocommit: cada leitura é persistida imediatamente
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+                self._conn.execute('PRAGMA synchronous=NORMAL')
+            for statement in self.SCHEMA:
+                self._conn.execute(statement)
+
+    def append(self, data_type: str, content: Any, raw_data: Any = None,
+               tag_uid: Optional[str] = None, ts: Optional[float] = None,
+               timestamp: Optional[str] = None) -> Dict[str, Any]:
+        """Adiciona leitura e retorna o registro gravado"""
+        ts = time.time() if ts is None else ts
+        if timestamp is None:
+            timestamp = datetime.fromtimestamp(ts).strftime("%d/%m/%Y %H:%M:%S")
+
+        reading = {
+            'ts': ts,
+            'timestamp': timestamp,
+            'type': data_type,
+            'content': '' if content is None else str(content),
+            'raw_data': None if raw_data is None else str(raw_data),
+            'tag_uid': tag_uid
+        }
+
+        with self._lock:
+            cursor = self._conn.execute(
+                'INSERT INTO readings (ts, timestamp, type, content, raw_data, tag_uid) '
+                'VALUES (:ts, :timestamp, :type, :content, :raw_data, :tag_uid)',
+                reading
+            )
+        reading['id'] = cursor.lastrowid
+        return reading
+
+    def query(self, page: int = 0, page_size: int = 50, data_type: Optional[str] = None,
+              tag_uid: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None, before_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Consulta paginada, das leituras mais recentes para as mais antigas
+
+        before_id permite paginação por chave (sem OFFSET) em páginas profundas.
+        """
+        where, params = self._filters(data_type, tag_uid, since, until)
+        if before_id is not None:
+            where.append('id < ?')
+            params.append(before_id)
+
+        sql = 'SELECT * FROM readings'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        params.append(page_size)
+        if before_id is None and page:
+            sql += ' OFFSET ?'
+            params.append(page * page_size)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, data_type: Optional[str] = None, tag_uid: Optional[str] = None,
+              since: Optional[float] = None, until: Optional[float] = None) -> int:
+        """Conta leituras (opcionalmente filtradas)"""
+        where, params = self._filters(data_type, tag_uid, since, until)
+        sql = 'SELECT COUNT(*) FROM readings'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def iter_all(self, batch_size: int = 500, data_type: Optional[str] = None,
+                 tag_uid: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Itera todas as leituras em ordem cronológica, em lotes"""
+        last_id = 0
+        while True:
+            where, params = self._filters(data_type, tag_uid, None, None)
+            where.append('id > ?')
+            params.append(last_id)
+            sql = ('SELECT * FROM readings WHERE ' + ' AND '.join(where) +
+                   ' ORDER BY id LIMIT ?')
+            params.append(batch_size)
+
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            if not rows:
+                return
+
+            for row in rows:
+                yield dict(row)
+            last_id = rows[-1]['id']
+
+    def clear(self):
+        """Remove todas as leituras"""
+        with self._lock:
+            self._conn.execute('DELETE FROM readings')
+
+    def close(self):
+        """Fecha a conexão"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _filters(data_type, tag_uid, since, until):
+        where = []
+        params = []
+        if data_type is not None:
+            where.append('type = ?')
+            params.append(data_type)
+        if tag_uid is not None:
+            where.append('tag_uid = ?')
+            params.append(tag_uid)
+        if since is not None:
+            where.append('ts >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('ts < ?')
+            params.append(until)
+        return where, params
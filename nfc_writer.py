@@ -6,11 +6,24 @@ Módulo completo para escrita de dados em tags NFC com suporte a múltiplos
 formatos, perfis personalizados e automação avançada.
 """
 
+import copy
 import json
 import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from enum import Enum
+from urllib.parse import quote, unquote
+
+from services import services
+from ndef_codec import (
+    NdefRecordData, serialize_message, message_size, text_record, uri_record, mime_record,
+    encode_text
+)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +54,7 @@ class NFCProfile:
         self.actions = []
         self.created_at = datetime.now()
         self.modified_at = datetime.now()
+        self.revision = 0  # incrementada a cada alteração dos registros
         self.password_protected = False
         self.password_hash = None
         self.write_count = 0
@@ -54,6 +68,7 @@ class NFCProfile:
         }
         self.records.append(record)
         self.modified_at = datetime.now()
+        self.revision += 1
         
     def add_action(self, action_type: str, parameters: Dict[str, Any]):
         """Adiciona uma ação automática ao perfil"""
@@ -88,6 +103,7 @@ class NFCProfile:
             'actions': self.actions,
             'created_at': self.created_at.isoformat(),
             'modified_at': self.modified_at.isoformat(),
+            'revision': self.revision,
             'password_protected': self.password_protected,
             'password_hash': self.password_hash,
             'write_count': self.write_count
@@ -101,6 +117,7 @@ class NFCProfile:
         profile.actions = data.get('actions', [])
         profile.created_at = datetime.fromisoformat(data['created_at'])
         profile.modified_at = datetime.fromisoformat(data['modified_at'])
+        profile.revision = data.get('revision', 0)
         profile.password_protected = data.get('password_protected', False)
         profile.password_hash = data.get('password_hash')
         profile.write_count = data.get('write_count', 0)
@@ -205,6 +222,15 @@ class NFCDataBuilder:
             'name': name
         }
     
+    @staticmethod
+    def build_custom_record(mime_type: str, payload: str) -> Dict[str, Any]:
+        """Constrói registro MIME personalizado"""
+        return {
+            'type': 'custom',
+            'mime_type': mime_type,
+            'payload': payload
+        }
+    
     @staticmethod
     def build_system_command_record(command_type: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Constrói registro de comando do sistema"""
@@ -215,141 +241,55 @@ class NFCDataBuilder:
         }
 
 
-class NFCWriter:
-    """Sistema avançado de escrita em tags NFC"""
+class NFCMessageEncoder:
+    """Codificador de mensagens NDEF em Python puro
     
-    def __init__(self):
-        self.android_classes_loaded = False
-        self.nfc_adapter = None
-        self.current_activity = None
-        self.write_history = []
-        
-    def initialize(self) -> bool:
-        """Inicializa o sistema de escrita NFC"""
-        try:
-            from jnius import autoclass
-            
-            # Classes Android para escrita
-            self.NfcAdapter = autoclass('android.nfc.NfcAdapter')
-            self.NdefMessage = autoclass('android.nfc.NdefMessage')
-            self.NdefRecord = autoclass('android.nfc.NdefRecord')
-            self.PythonActivity = autoclass('org.kivy.android.PythonActivity')
-            self.Intent = autoclass('android.content.Intent')
-            self.PendingIntent = autoclass('android.app.PendingIntent')
-            self.IntentFilter = autoclass('android.content.IntentFilter')
-            
-            # Inicializa adaptador NFC
-            self.current_activity = self.PythonActivity.mActivity
-            self.nfc_adapter = self.NfcAdapter.getDefaultAdapter(self.current_activity)
-            
-            self.android_classes_loaded = True
-            logger.info("NFCWriter inicializado com sucesso")
-            return True
-            
-        except ImportError:
-            logger.error("PyJNIUS não disponível para escrita NFC")
-            return False
-        except Exception as e:
-            logger.error(f"Erro ao inicializar NFCWriter: {e}")
-            return False
+    Converte os registros de um perfil diretamente nos bytes finais da
+    mensagem NDEF, que são entregues ao Android em um único byte[].
+    """
     
-    def is_available(self) -> bool:
-        """Verifica se escrita NFC está disponível"""
-        if not self.android_classes_loaded:
-            return False
-        
-        return (self.nfc_adapter is not None and 
-                self.nfc_adapter.isEnabled())
-    
-    def write_profile_to_tag(self, profile: NFCProfile, password: str = None) -> bool:
-        """Escreve um perfil completo na tag NFC"""
-        if not self.is_available():
-            logger.error("NFC não disponível para escrita")
-            return False
-        
-        # Verifica senha se necessário
-        if profile.password_protected and not profile.verify_password(password or ""):
-            logger.error("Senha incorreta para perfil protegido")
-            return False
-        
-        try:
-            # Converte registros do perfil para NDEF
-            ndef_records = []
-            
-            for record_data in profile.records:
-                ndef_record = self._create_ndef_record(record_data)
-                if ndef_record:
-                    ndef_records.append(ndef_record)
-            
-            if not ndef_records:
-                logger.error("Nenhum registro válido no perfil")
-                return False
-            
-            # Cria mensagem NDEF
-            ndef_message = self.NdefMessage(ndef_records)
-            
-            # Escreve na tag (implementação específica do Android)
-            success = self._write_ndef_message(ndef_message)
-            
-            if success:
-                profile.write_count += 1
-                self._add_to_write_history(profile.name, len(ndef_records))
-                logger.info(f"Perfil '{profile.name}' escrito com sucesso")
-            
-            return success
-            
-        except Exception as e:
-            logger.error(f"Erro ao escrever perfil na tag: {e}")
-            return False
+    def encode_message(self, records: List[Dict[str, Any]]) -> Optional[bytes]:
+        """Codifica uma lista de registros na mensagem NDEF final"""
+        ndef_records = self.encode_records(records)
+        if not ndef_records:
+            return None
+        return serialize_message(ndef_records)
     
-    def write_single_record(self, record_type: NFCRecordType, data: Dict[str, Any]) -> bool:
-        """Escreve um único registro na tag"""
-        if not self.is_available():
-            return False
-        
-        try:
-            record_data = {'type': record_type.value, 'data': data}
-            ndef_record = self._create_ndef_record(record_data)
-            
-            if not ndef_record:
-                return False
-            
-            ndef_message = self.NdefMessage([ndef_record])
-            success = self._write_ndef_message(ndef_message)
-            
-            if success:
-                self._add_to_write_history(f"Registro {record_type.value}", 1)
-            
-            return success
-            
-        except Exception as e:
-            logger.error(f"Erro ao escrever registro: {e}")
-            return False
+    def encode_records(self, records: List[Dict[str, Any]]) -> List[NdefRecordData]:
+        """Codifica registros ignorando os inválidos ou não suportados"""
+        ndef_records = []
+        for record_data in records:
+            ndef_record = self.encode_record(record_data)
+            if ndef_record:
+                ndef_records.append(ndef_record)
+        return ndef_records
     
-    def _create_ndef_record(self, record_data: Dict[str, Any]):
+    def encode_record(self, record_data: Dict[str, Any]) -> Optional[NdefRecordData]:
         """Cria registro NDEF a partir dos dados"""
         try:
             record_type = record_data['type']
             data = record_data.get('data', record_data)
             
             if record_type == 'text':
-                return self._create_text_record(data)
+                return self._encode_text_record(data)
             elif record_type == 'uri':
-                return self._create_uri_record(data)
+                return self._encode_uri_record(data)
             elif record_type == 'wifi':
-                return self._create_wifi_record(data)
+                return self._encode_wifi_record(data)
             elif record_type == 'email':
-                return self._create_email_record(data)
+                return self._encode_email_record(data)
             elif record_type == 'phone':
-                return self._create_phone_record(data)
+                return self._encode_phone_record(data)
             elif record_type == 'sms':
-                return self._create_sms_record(data)
+                return self._encode_sms_record(data)
             elif record_type == 'location':
-                return self._create_location_record(data)
+                return self._encode_location_record(data)
             elif record_type == 'contact':
-                return self._create_contact_record(data)
+                return self._encode_contact_record(data)
             elif record_type == 'app_launcher':
-                return self._create_app_launcher_record(data)
+                return self._encode_app_launcher_record(data)
+            elif record_type == 'custom':
+                return self._encode_custom_record(data)
             else:
                 logger.warning(f"Tipo de registro não suportado: {record_type}")
                 return None
@@ -358,33 +298,18 @@ class NFCWriter:
             logger.error(f"Erro ao criar registro NDEF: {e}")
             return None
     
-    def _create_text_record(self, data: Dict[str, Any]):
+    def _encode_text_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de texto NDEF"""
         text = data.get('text', '')
         language = data.get('language', 'pt')
         encoding = data.get('encoding', 'utf-8')
-        
-        # Codifica texto no formato NDEF
-        lang_bytes = language.encode('ascii')
-        text_bytes = text.encode(encoding)
-        
-        # Primeiro byte: encoding flag + tamanho do código de idioma
-        encoding_flag = 0 if encoding == 'utf-8' else 0x80
-        payload = bytes([encoding_flag | len(lang_bytes)]) + lang_bytes + text_bytes
-        
-        return self.NdefRecord.createRecord(
-            self.NdefRecord.TNF_WELL_KNOWN,
-            self.NdefRecord.RTD_TEXT,
-            None,
-            payload
-        )
+        return text_record(text, language, encoding)
     
-    def _create_uri_record(self, data: Dict[str, Any]):
+    def _encode_uri_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de URI NDEF"""
-        uri = data.get('uri', '')
-        return self.NdefRecord.createUri(uri)
+        return uri_record(data.get('uri', ''))
     
-    def _create_wifi_record(self, data: Dict[str, Any]):
+    def _encode_wifi_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro Wi-Fi NDEF"""
         ssid = data.get('ssid', '')
         password = data.get('password', '')
@@ -393,15 +318,9 @@ class NFCWriter:
         
         # Formato Wi-Fi Simple Configuration
         wifi_config = f"WIFI:T:{security};S:{ssid};P:{password};H:{'true' if hidden else 'false'};;"
-        
-        return self.NdefRecord.createRecord(
-            self.NdefRecord.TNF_WELL_KNOWN,
-            self.NdefRecord.RTD_TEXT,
-            None,
-            wifi_config.encode('utf-8')
-        )
+        return text_record(wifi_config, data.get('language', 'pt'))
     
-    def _create_email_record(self, data: Dict[str, Any]):
+    def _encode_email_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de e-mail NDEF"""
         email = data.get('email', '')
         subject = data.get('subject', '')
@@ -416,15 +335,14 @@ class NFCWriter:
                 params.append(f"body={body}")
             mailto_uri += "?" + "&".join(params)
         
-        return self.NdefRecord.createUri(mailto_uri)
+        return uri_record(mailto_uri)
     
-    def _create_phone_record(self, data: Dict[str, Any]):
+    def _encode_phone_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de telefone NDEF"""
         phone = data.get('phone', '')
-        tel_uri = f"tel:{phone}"
-        return self.NdefRecord.createUri(tel_uri)
+        return uri_record(f"tel:{phone}")
     
-    def _create_sms_record(self, data: Dict[str, Any]):
+    def _encode_sms_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de SMS NDEF"""
         phone = data.get('phone', '')
         message = data.get('message', '')
@@ -433,9 +351,9 @@ class NFCWriter:
         if message:
             sms_uri += f"?body={message}"
         
-        return self.NdefRecord.createUri(sms_uri)
+        return uri_record(sms_uri)
     
-    def _create_location_record(self, data: Dict[str, Any]):
+    def _encode_location_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de localização NDEF"""
         latitude = data.get('latitude', 0.0)
         longitude = data.get('longitude', 0.0)
@@ -445,9 +363,9 @@ class NFCWriter:
         if name:
             geo_uri += f"?q={latitude},{longitude}({name})"
         
-        return self.NdefRecord.createUri(geo_uri)
+        return uri_record(geo_uri)
     
-    def _create_contact_record(self, data: Dict[str, Any]):
+    def _encode_contact_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro de contato vCard NDEF"""
         name = data.get('name', '')
         phone = data.get('phone', '')
@@ -472,14 +390,9 @@ class NFCWriter:
         vcard.append("END:VCARD")
         vcard_data = "\n".join(vcard)
         
-        return self.NdefRecord.createRecord(
-            self.NdefRecord.TNF_MIME_MEDIA,
-            "text/vcard".encode('ascii'),
-            None,
-            vcard_data.encode('utf-8')
-        )
+        return mime_record("text/vcard", vcard_data.encode('utf-8'))
     
-    def _create_app_launcher_record(self, data: Dict[str, Any]):
+    def _encode_app_launcher_record(self, data: Dict[str, Any]) -> NdefRecordData:
         """Cria registro para lançar aplicativo"""
         package_name = data.get('package_name', '')
         activity = data.get('activity', '')
@@ -490,97 +403,981 @@ class NFCWriter:
         else:
             app_uri = f"market://details?id={package_name}"
         
-        return self.NdefRecord.createUri(app_uri)
+        return uri_record(app_uri)
     
-    def _write_ndef_message(self, ndef_message) -> bool:
-        """Escreve mensagem NDEF na tag (método stub - requer implementação específica)"""
-        # Esta é uma implementação simplificada
-        # Na prática, seria necessário aguardar que uma tag seja detectada
-        # e usar o objeto Tag para escrever os dados
-        logger.info("Simulando escrita NDEF na tag...")
+    def _encode_custom_record(self, data: Dict[str, Any]) -> NdefRecordData:
+        """Cria registro MIME personalizado"""
+        mime_type = data.get('mime_type', 'application/octet-stream')
+        payload = data.get('payload', b'')
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        return mime_record(mime_type, payload)
+
+
+# Capacidade de memória de usuário dos tipos de tag mais comuns
+TAG_CAPACITIES = {
+    'MIFARE Ultralight': {'forum_type': 2, 'memory': 48},
+    'NTAG213': {'forum_type': 2, 'memory': 144},
+    'MIFARE Ultralight C': {'forum_type': 2, 'memory': 144},
+    'NTAG215': {'forum_type': 2, 'memory': 504},
+    'NTAG216': {'forum_type': 2, 'memory': 888},
+    'Type 4 (2 KB)': {'forum_type': 4, 'memory': 2048},
+    'Type 4 (8 KB)': {'forum_type': 4, 'memory': 8192},
+}
+
+
+class TagCapacityPlanner:
+    """Planejador de capacidade: escolhe a menor codificação que cabe na tag
+    
+    Calcula o tamanho exato da mensagem e, se necessário, aplica codificações
+    mais baratas em ordem: primeiro as sem perda (UTF-8 vs UTF-16 por registro
+    de texto) e, somente com allow_lossy, remove campos opcionais do vCard.
+    """
+    
+    # Campos opcionais do vCard, na ordem em que são descartados
+    VCARD_OPTIONAL_FIELDS = ('organization', 'email', 'phone')
+    
+    def __init__(self, encoder: Optional['NFCMessageEncoder'] = None):
+        self.encoder = encoder or NFCMessageEncoder()
+    
+    @staticmethod
+    def tag_capacity(tag_type: str, message_length: int = 0) -> int:
+        """Bytes disponíveis para a mensagem NDEF em um tipo de tag"""
+        spec = TAG_CAPACITIES[tag_type]
+        if spec['forum_type'] == 4:
+            # Arquivo NDEF: 2 bytes de NLEN
+            return spec['memory'] - 2
+        # Type 2: TLV do NDEF (1 ou 3 bytes de tamanho) + TLV terminador
+        length_field = 1 if message_length < 0xFF else 3
+        return spec['memory'] - 1 - length_field - 1
+    
+    def fits(self, message_length: int, tag_type: str) -> bool:
+        """Verifica se a mensagem cabe no tipo de tag"""
+        return message_length <= self.tag_capacity(tag_type, message_length)
+    
+    def smallest_tag(self, message_length: int) -> Optional[str]:
+        """Retorna o menor tipo de tag em que a mensagem cabe"""
+        candidates = [
+            tag_type for tag_type in TAG_CAPACITIES
+            if self.fits(message_length, tag_type)
+        ]
+        if not candidates:
+            return None
+        return min(candidates, key=lambda tag_type: TAG_CAPACITIES[tag_type]['memory'])
+    
+    def message_size(self, records: List[Dict[str, Any]]) -> int:
+        """Tamanho exato da mensagem codificada"""
+        return message_size(self.encoder.encode_records(records))
+    
+    def plan(self, records: List[Dict[str, Any]], tag_type: Optional[str] = None,
+             capacity: Optional[int] = None, allow_lossy: bool = False) -> Dict[str, Any]:
+        """Escolhe a primeira codificação que cabe na tag
+        
+        Informe tag_type (chave de TAG_CAPACITIES) ou capacity (bytes livres
+        para a mensagem, como o Ndef.getMaxSize() da tag descoberta).
+        """
+        best = None
+        
+        for step, variant in self._variants(records, allow_lossy):
+            ndef_records = self.encoder.encode_records(variant)
+            if not ndef_records:
+                continue
+            
+            size = message_size(ndef_records)
+            if capacity is not None:
+                limit = capacity
+            elif tag_type is not None:
+                limit = self.tag_capacity(tag_type, size)
+            else:
+                limit = None
+            
+            candidate = {
+                'fits': limit is None or size <= limit,
+                'size': size,
+                'capacity': limit,
+                'step': step,
+                'records': variant,
+                'ndef_records': ndef_records
+            }
+            
+            if best is None or size < best['size']:
+                best = candidate
+            if candidate['fits']:
+                best = candidate
+                break
+        
+        if best is None:
+            return {'fits': False, 'size': 0, 'capacity': capacity, 'step': None,
+                    'records': [], 'message': None, 'smallest_tag': None}
+        
+        best['message'] = serialize_message(best.pop('ndef_records'))
+        best['smallest_tag'] = self.smallest_tag(best['size'])
+        return best
+    
+    def _variants(self, records: List[Dict[str, Any]], allow_lossy: bool):
+        """Gera variantes dos registros, da mais fiel para a mais compacta"""
+        yield 'original', records
+        
+        current = copy.deepcopy(records)
+        changed = False
+        for record in current:
+            if record.get('type') == 'text':
+                changed |= self._choose_text_encoding(record.get('data', record))
+        if changed:
+            yield 'text_encoding', current
+        
+        if not allow_lossy:
+            return
+        
+        for field in self.VCARD_OPTIONAL_FIELDS:
+            current = copy.deepcopy(current)
+            changed = False
+            for record in current:
+                data = record.get('data', record)
+                if record.get('type') == 'contact' and data.get(field):
+                    data[field] = ''
+                    changed = True
+            if changed:
+                yield f'drop_vcard_{field}', current
+    
+    @staticmethod
+    def _choose_text_encoding(data: Dict[str, Any]) -> bool:
+        """Usa UTF-16 quando for menor que UTF-8 (ex.: textos em CJK)"""
+        text = data.get('text', '')
+        current = data.get('encoding', 'utf-8')
+        best = min(('utf-8', 'utf-16'), key=lambda encoding: len(encode_text(text, encoding)))
+        if best != current and len(encode_text(text, best)) < len(encode_text(text, current)):
+            data['encoding'] = best
+            return True
+        return False
+
+
+class EncodedMessageCache:
+    """Cache LRU das mensagens NDEF já codificadas por perfil
+    
+    A chave é (nome, modified_at, revisão) do perfil: qualquer alteração via
+    add_record gera uma chave nova, então a consulta não precisa serializar os
+    registros e escritas consecutivas do mesmo perfil reutilizam os bytes prontos.
+    """
+    
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def fingerprint(profile: 'NFCProfile') -> Tuple[str, datetime, int]:
+        """Chave de cache de um perfil (sem tocar nos registros)"""
+        return profile.name, profile.modified_at, profile.revision
+    
+    def get(self, profile: 'NFCProfile') -> Optional[Tuple[bytes, int]]:
+        """Retorna (mensagem, número de registros) se estiver em cache"""
+        key = self.fingerprint(profile)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['message'], entry['record_count']
+    
+    def put(self, profile: 'NFCProfile', message: bytes, record_count: int):
+        """Armazena a mensagem codificada de um perfil"""
+        key = self.fingerprint(profile)
+        with self._lock:
+            self._entries[key] = {
+                'profile_name': profile.name,
+                'message': message,
+                'record_count': record_count
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, profile_name: str):
+        """Remove as entradas de um perfil"""
+        with self._lock:
+            stale = [key for key, entry in self._entries.items()
+                     if entry['profile_name'] == profile_name]
+            for key in stale:
+                del self._entries[key]
+    
+    def clear(self):
+        """Limpa o cache"""
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Retorna estatísticas de uso do cache"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class NFCWriteSession:
+    """Sessão de escrita guiada por toques
+    
+    Mantém uma fila de mensagens NDEF pendentes; cada tag descoberta com a
+    sessão ativa recebe a próxima mensagem. A escrita roda em uma thread de
+    trabalho, fora do loop principal do Kivy, e o resultado de cada tag
+    (incluindo a latência) é entregue, nessa thread, ao on_result da mensagem
+    gravada (ou ao on_result da sessão, se a mensagem não tiver um).
+    
+    A sessão é compartilhada (escrita única, lote...): cada fluxo se registra
+    como dono em start(owner=...) e sai em release(owner); a sessão só é
+    encerrada quando não há donos nem mensagens pendentes.
+    """
+    
+    def __init__(self, writer: 'NFCWriter'):
+        self.writer = writer
+        self.active = False
+        self.on_result = None
+        self._owners = set()
+        self.written_count = 0
+        self.failed_count = 0
+        self.last_latency_ms = None
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._tags = None
+        self._worker = None
+    
+    def enqueue(self, message: bytes, label: str = "", record_count: int = 1,
+                profile: Optional['NFCProfile'] = None, copies: int = 1, key: Any = None,
+                records: Optional[List[Dict[str, Any]]] = None,
+                on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                allow_lossy: bool = False):
+        """Adiciona mensagem à fila (copies > 1 grava a mesma mensagem em várias tags)
+        
+        Com records informado, a mensagem pode ser recodificada para caber em
+        tags menores que o esperado (com allow_lossy, inclusive descartando
+        campos opcionais). on_result recebe o resultado de cada gravação desta
+        mensagem.
+        """
+        item = {
+            'message': message,
+            'records': records,
+            'allow_lossy': allow_lossy,
+            'label': label,
+            'record_count': record_count,
+            'profile': profile,
+            'remaining': max(1, copies),
+            'key': key,
+            'on_result': on_result
+        }
+        with self._lock:
+            self._pending.append(item)
+    
+    def discard(self, key: Any) -> bool:
+        """Remove da fila a mensagem identificada por key"""
+        with self._lock:
+            for item in self._pending:
+                if item['key'] == key:
+                    self._pending.remove(item)
+                    return True
+        return False
+    
+    def pending_count(self) -> int:
+        """Número de tags que ainda aguardam escrita"""
+        with self._lock:
+            return sum(item['remaining'] for item in self._pending)
+    
+    def clear(self):
+        """Descarta mensagens pendentes"""
+        with self._lock:
+            self._pending.clear()
+    
+    def start(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+              owner: Any = None) -> bool:
+        """Ativa o foreground dispatch e a thread de escrita
+        
+        Com a sessão já ativa só registra o dono; o on_result da sessão não é
+        substituído (use o on_result de cada mensagem em enqueue).
+        """
+        if self.active:
+            if owner is not None:
+                with self._lock:
+                    self._owners.add(owner)
+            return True
+        
+        if not self.writer.enable_foreground_dispatch():
+            return False
+        
+        if on_result is not None:
+            self.on_result = on_result
+        if owner is not None:
+            with self._lock:
+                self._owners.add(owner)
+        self.written_count = 0
+        self.failed_count = 0
+        self.active = True
+        self._tags = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run,
+            args=(self._tags,),
+            name='nfc-write-session',
+            daemon=True
+        )
+        self._worker.start()
+        logger.info("Sessão de escrita iniciada")
+        return True
+    
+    def release(self, owner: Any) -> bool:
+        """Retira o dono; encerra a sessão se não restarem donos nem mensagens
+        
+        Retorna True se a sessão foi encerrada.
+        """
+        with self._lock:
+            self._owners.discard(owner)
+            idle = not self._owners and not self._pending
+        if idle:
+            self.stop()
+        return idle
+    
+    def stop(self):
+        """Encerra a sessão e libera o foreground dispatch (para todos os donos)"""
+        if not self.active:
+            return
+        
+        with self._lock:
+            self._owners.clear()
+        self.active = False
+        self.writer.disable_foreground_dispatch()
+        self._tags.put(None)
+        logger.info(f"Sessão de escrita encerrada: {self.written_count} gravadas, {self.failed_count} falhas")
+    
+    def on_tag_discovered(self, tag) -> bool:
+        """Entrega tag descoberta à thread de escrita (retorna False se não houver o que gravar)"""
+        if not self.active or not self.pending_count():
+            return False
+        
+        self._tags.put((tag, time.perf_counter()))
         return True
     
-    def _add_to_write_history(self, profile_name: str, record_count: int):
+    def _next_item(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._pending[0] if self._pending else None
+    
+    def _complete_item(self, item: Dict[str, Any]):
+        with self._lock:
+            item['remaining'] -= 1
+            if item['remaining'] <= 0 and self._pending and self._pending[0] is item:
+                self._pending.popleft()
+    
+    def _run(self, tags: 'queue.Queue'):
+        """Loop da thread de escrita"""
+        try:
+            while True:
+                job = tags.get()
+                if job is None:
+                    break
+                
+                tag, discovered_at = job
+                item = self._next_item()
+                if item is None:
+                    continue
+                
+                write_started = time.perf_counter()
+                success, error = self.writer.write_message_to_tag(
+                    tag, item['message'], item['records'], item['allow_lossy']
+                )
+                finished = time.perf_counter()
+                
+                latency_ms = (finished - discovered_at) * 1000
+                self.last_latency_ms = latency_ms
+                
+                if success:
+                    self._complete_item(item)
+                    self.written_count += 1
+                    self.writer._on_message_written(item, latency_ms)
+                else:
+                    self.failed_count += 1
+                
+                result = {
+                    'success': success,
+                    'error': error,
+                    'key': item['key'],
+                    'label': item['label'],
+                    'record_count': item['record_count'],
+                    'size': len(item['message']),
+                    'latency_ms': latency_ms,
+                    'write_ms': (finished - write_started) * 1000,
+                    'remaining': max(0, item['remaining']),  # desta mensagem
+                    'pending': self.pending_count()           # da fila inteira
+                }
+                
+                on_result = item['on_result'] or self.on_result
+                if on_result:
+                    try:
+                        on_result(result)
+                    except Exception as e:
+                        logger.error(f"Erro no callback da sessão de escrita: {e}")
+        finally:
+            self.writer.detach_thread()
+
+
+class NFCWriter:
+    """Sistema avançado de escrita em tags NFC"""
+    
+    def __init__(self, cache: Optional[EncodedMessageCache] = None):
+        self.android_classes_loaded = False
+        self.nfc_adapter = None
+        self.current_activity = None
+        self.write_history = deque(maxlen=100)
+        self.encoder = NFCMessageEncoder()
+        self.message_cache = cache if cache is not None else services.get('message_cache')
+        self.session = NFCWriteSession(self)
+        self.planner = TagCapacityPlanner(self.encoder)
+        
+    def initialize(self) -> bool:
+        """Inicializa o sistema de escrita NFC"""
+        try:
+            from jnius import autoclass, cast
+            
+            # Classes Android para escrita
+            self.NfcAdapter = autoclass('android.nfc.NfcAdapter')
+            self.NdefMessage = autoclass('android.nfc.NdefMessage')
+            self.Ndef = autoclass('android.nfc.tech.Ndef')
+            self.NdefFormatable = autoclass('android.nfc.tech.NdefFormatable')
+            self.cast = cast
+            self.PythonActivity = autoclass('org.kivy.android.PythonActivity')
+            self.Intent = autoclass('android.content.Intent')
+            self.PendingIntent = autoclass('android.app.PendingIntent')
+            self.IntentFilter = autoclass('android.content.IntentFilter')
+            
+            # Inicializa adaptador NFC
+            self.current_activity = self.PythonActivity.mActivity
+            self.nfc_adapter = self.NfcAdapter.getDefaultAdapter(self.current_activity)
+            
+            self.android_classes_loaded = True
+            logger.info("NFCWriter inicializado com sucesso")
+            return True
+            
+        except ImportError:
+            logger.error("PyJNIUS não disponível para escrita NFC")
+            return False
+        except Exception as e:
+            logger.error(f"Erro ao inicializar NFCWriter: {e}")
+            return False
+    
+    def is_available(self) -> bool:
+        """Verifica se escrita NFC está disponível"""
+        if not self.android_classes_loaded:
+            return False
+        
+        return (self.nfc_adapter is not None and 
+                self.nfc_adapter.isEnabled())
+    
+    def write_profile_to_tag(self, profile: NFCProfile, password: str = None) -> bool:
+        """Escreve um perfil completo na tag NFC"""
+        if not self.is_available():
+            logger.error("NFC não disponível para escrita")
+            return False
+        
+        # Verifica senha se necessário
+        if profile.password_protected and not profile.verify_password(password or ""):
+            logger.error("Senha incorreta para perfil protegido")
+            return False
+        
+        try:
+            encoded = self.encode_profile(profile)
+            
+            if not encoded:
+                logger.error("Nenhum registro válido no perfil")
+                return False
+            
+            message_bytes, record_count = encoded
+            
+            # A escrita acontece quando a próxima tag for aproximada
+            return self.queue_message(message_bytes, profile.name, record_count, profile,
+                                      records=profile.records)
+            
+        except Exception as e:
+            logger.error(f"Erro ao escrever perfil na tag: {e}")
+            return False
+    
+    def encode_profile(self, profile: NFCProfile) -> Optional[Tuple[bytes, int]]:
+        """Codifica o perfil em bytes NDEF, reutilizando o cache quando possível"""
+        cached = self.message_cache.get(profile)
+        if cached:
+            return cached
+        
+        # Codifica todos os registros em Python; o Android recebe um único byte[]
+        ndef_records = self.encoder.encode_records(profile.records)
+        if not ndef_records:
+            return None
+        
+        encoded = (serialize_message(ndef_records), len(ndef_records))
+        self.message_cache.put(profile, *encoded)
+        return encoded
+    
+    def write_single_record(self, record_type: NFCRecordType, data: Dict[str, Any]) -> bool:
+        """Escreve um único registro na tag"""
+        if not self.is_available():
+            return False
+        
+        try:
+            record_data = {'type': record_type.value, 'data': data}
+            message_bytes = self.encoder.encode_message([record_data])
+            
+            if not message_bytes:
+                return False
+            
+            return self.queue_message(message_bytes, f"Registro {record_type.value}", 1,
+                                      records=[record_data])
+            
+        except Exception as e:
+            logger.error(f"Erro ao escrever registro: {e}")
+            return False
+    
+    def queue_message(self, message: bytes, label: str, record_count: int = 1,
+                      profile: Optional[NFCProfile] = None, copies: int = 1, key: Any = None,
+                      records: Optional[List[Dict[str, Any]]] = None,
+                      on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                      allow_lossy: bool = False) -> bool:
+        """Enfileira mensagem codificada para a sessão de escrita"""
+        self.session.enqueue(message, label, record_count, profile, copies, key, records,
+                             on_result, allow_lossy)
+        logger.info(f"Mensagem '{label}' ({len(message)} bytes) aguardando tag")
+        return True
+    
+    def start_write_session(self, on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                            owner: Any = None) -> bool:
+        """Inicia sessão de escrita guiada por toques (ou entra nela, se ativa)"""
+        if not self.is_available():
+            logger.error("NFC não disponível para escrita")
+            return False
+        return self.session.start(on_result, owner)
+    
+    def stop_write_session(self, owner: Any = None):
+        """Sai da sessão de escrita; sem owner, encerra para todos"""
+        if owner is None:
+            self.session.stop()
+        else:
+            self.session.release(owner)
+    
+    def handle_tag(self, tag) -> bool:
+        """Entrega tag descoberta à sessão de escrita, se houver mensagens pendentes"""
+        return self.session.on_tag_discovered(tag)
+    
+    def enable_foreground_dispatch(self) -> bool:
+        """Direciona todas as tags descobertas para esta atividade"""
+        if not self.is_available():
+            return False
+        
+        try:
+            intent = self.Intent(self.current_activity, self.current_activity.getClass())
+            intent.addFlags(self.Intent.FLAG_ACTIVITY_SINGLE_TOP)
+            # Android 12+ exige PendingIntent mutável para receber o extra da tag
+            flags = getattr(self.PendingIntent, 'FLAG_MUTABLE', 0)
+            pending_intent = self.PendingIntent.getActivity(self.current_activity, 0, intent, flags)
+            
+            def enable():
+                self.nfc_adapter.enableForegroundDispatch(
+                    self.current_activity, pending_intent, None, None
+                )
+            
+            self._run_on_ui_thread(enable)
+            return True
+        except Exception as e:
+            logger.error(f"Erro ao ativar foreground dispatch: {e}")
+            return False
+    
+    def disable_foreground_dispatch(self):
+        """Desativa o foreground dispatch"""
+        if not self.is_available():
+            return
+        
+        try:
+            self._run_on_ui_thread(
+                lambda: self.nfc_adapter.disableForegroundDispatch(self.current_activity)
+            )
+        except Exception as e:
+            logger.error(f"Erro ao desativar foreground dispatch: {e}")
+    
+    def write_message_to_tag(self, tag, message: bytes,
+                             records: Optional[List[Dict[str, Any]]] = None,
+                             allow_lossy: bool = False) -> Tuple[bool, str]:
+        """Escreve mensagem NDEF na tag via Ndef ou NdefFormatable (thread de trabalho)
+        
+        Se a mensagem não couber e os registros de origem forem informados, o
+        planejador escolhe uma codificação menor antes de escrever; campos
+        opcionais só são descartados com allow_lossy.
+        """
+        try:
+            tag = self.cast('android.nfc.Tag', tag)
+            ndef_message = self.NdefMessage(message)
+            
+            ndef = self.Ndef.get(tag)
+            if ndef is not None:
+                ndef.connect()
+                try:
+                    if not ndef.isWritable():
+                        return False, "Tag somente leitura"
+                    max_size = ndef.getMaxSize()
+                    if len(message) > max_size:
+                        plan = (self.planner.plan(records, capacity=max_size, allow_lossy=allow_lossy)
+                                if records else None)
+                        if not plan or not plan['fits']:
+                            return False, f"Mensagem ({len(message)} bytes) excede a capacidade da tag ({max_size} bytes)"
+                        logger.info(f"Mensagem recodificada ({plan['step']}): {len(message)} -> {plan['size']} bytes")
+                        ndef_message = self.NdefMessage(plan['message'])
+                    ndef.writeNdefMessage(ndef_message)
+                finally:
+                    ndef.close()
+                return True, ""
+            
+            formatable = self.NdefFormatable.get(tag)
+            if formatable is not None:
+                formatable.connect()
+                try:
+                    formatable.format(ndef_message)
+                finally:
+                    formatable.close()
+                return True, ""
+            
+            return False, "Tag não suporta NDEF"
+            
+        except Exception as e:
+            logger.error(f"Erro ao escrever na tag: {e}")
+            return False, str(e)
+    
+    def detach_thread(self):
+        """Desanexa a thread atual da JVM (necessário ao finalizar threads que usam pyjnius)"""
+        try:
+            from jnius import detach
+            detach()
+        except Exception:
+            pass
+    
+    @staticmethod
+    def _run_on_ui_thread(func: Callable[[], None]):
+        """Executa função na thread de UI do Android"""
+        try:
+            from android.runnable import run_on_ui_thread
+        except ImportError:
+            func()
+            return
+        run_on_ui_thread(func)()
+    
+    def _on_message_written(self, item: Dict[str, Any], latency_ms: float):
+        """Atualiza contadores após escrita bem-sucedida"""
+        profile = item.get('profile')
+        if profile is not None:
+            profile.write_count += 1
+        self._add_to_write_history(item['label'], item['record_count'], latency_ms)
+    
+    def _add_to_write_history(self, profile_name: str, record_count: int, latency_ms: Optional[float] = None):
         """Adiciona entrada ao histórico de escrita"""
         entry = {
             'timestamp': datetime.now().isoformat(),
             'profile_name': profile_name,
             'record_count': record_count,
+            'latency_ms': latency_ms,
             'success': True
         }
+        # deque(maxlen=100) limita o histórico a 100 entradas
         self.write_history.append(entry)
-        
-        # Limita histórico a 100 entradas
-        if len(self.write_history) > 100:
-            self.write_history = self.write_history[-100:]
     
     def get_write_history(self) -> List[Dict[str, Any]]:
         """Retorna histórico de escritas"""
-        return self.write_history.copy()
+        return list(self.write_history)
+
+
+PROFILES_DIR = 'profiles'
+PROFILES_INDEX_FILE = 'profiles.index'  # extensão distinta: não colide com perfis
+LEGACY_PROFILES_FILE = 'nfc_profiles.json'
+
+
+class ProfileStore:
+    """Persistência de perfis: um arquivo JSON por perfil, gravado de forma atômica"""
+    
+    SUFFIX = '.json'
+    
+    def __init__(self, directory: Optional[str] = None):
+        from utils import FileManager
+        self.app_dir = FileManager.ensure_app_directory()
+        self.directory = directory or os.path.join(self.app_dir, PROFILES_DIR)
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def path_for(self, name: str) -> str:
+        """Caminho do arquivo de um perfil (nome codificado, reversível)"""
+        return os.path.join(self.directory, quote(name, safe='') + self.SUFFIX)
+    
+    def names(self) -> List[str]:
+        """Nomes dos perfis salvos (sem ler o conteúdo)"""
+        return sorted(self.scan())
+    
+    @staticmethod
+    def is_temp_file(filename: str) -> bool:
+        """Arquivo temporário de FileManager.write_atomic (.tmp-*.part)"""
+        return filename.startswith('.tmp-') and filename.endswith('.part')
+    
+    def scan(self) -> Dict[str, int]:
+        """Nome -> mtime (ns) de cada arquivo de perfil, sem ler o conteúdo
+        
+        Perfis cujo nome começa com '.' (ex.: '.casa') também são arquivos
+        ocultos; só os temporários da gravação atômica ficam de fora.
+        """
+        with os.scandir(self.directory) as entries:
+            return {
+                unquote(entry.name[:-len(self.SUFFIX)]): entry.stat().st_mtime_ns
+                for entry in entries
+                if entry.name.endswith(self.SUFFIX) and not self.is_temp_file(entry.name)
+            }
+    
+    @staticmethod
+    def metadata(data: Dict[str, Any], mtime_ns: Optional[int] = None) -> Dict[str, Any]:
+        """Resumo do perfil guardado no índice
+        
+        mtime_ns é o mtime do arquivo quando o resumo foi gerado; permite
+        detectar perfis alterados depois da última gravação do índice.
+        """
+        return {
+            'name': data['name'],
+            'description': data.get('description', ''),
+            'record_count': len(data.get('records', [])),
+            'modified_at': data.get('modified_at'),
+            'mtime_ns': mtime_ns
+        }
+    
+    def load_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Lê o índice de metadados (None se ausente ou corrompido)"""
+        try:
+            with open(os.path.join(self.directory, PROFILES_INDEX_FILE), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            return index if isinstance(index, dict) else None
+        except (OSError, ValueError):
+            return None
+    
+    def save_index(self, index: Dict[str, Dict[str, Any]]):
+        from utils import FileManager
+        FileManager.write_atomic(os.path.join(self.directory, PROFILES_INDEX_FILE),
+                                 json.dumps(index, ensure_ascii=False))
+    
+    def reconcile_index(self, index: Dict[str, Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], bool]:
+        """Confere o índice com os arquivos de perfil
+        
+        Relê apenas os perfis novos ou com mtime diferente do registrado e
+        remove entradas sem arquivo (ex.: crash entre gravar o perfil e o
+        índice). Retorna (índice, houve alteração).
+        """
+        files = self.scan()
+        changed = False
+        
+        for name in [name for name in index if name not in files]:
+            del index[name]
+            changed = True
+        
+        for name, mtime_ns in files.items():
+            entry = index.get(name)
+            if entry is not None and entry.get('mtime_ns') == mtime_ns:
+                continue
+            try:
+                data = self.load(name)
+                if data:
+                    index[name] = self.metadata(data, mtime_ns)
+                    changed = True
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Perfil '{name}' ignorado no índice: {e}")
+                if index.pop(name, None) is not None:
+                    changed = True
+        
+        return index, changed
+    
+    def exists(self, name: str) -> bool:
+        return os.path.exists(self.path_for(name))
+    
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """Lê um único perfil"""
+        try:
+            with open(self.path_for(name), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+    
+    def save(self, name: str, data: Dict[str, Any]) -> int:
+        """Grava um único perfil (atômico); retorna o mtime (ns) do arquivo"""
+        from utils import FileManager
+        path = self.path_for(name)
+        FileManager.write_atomic(path, json.dumps(data, ensure_ascii=False))
+        return os.stat(path).st_mtime_ns
+    
+    def delete(self, name: str) -> bool:
+        try:
+            os.remove(self.path_for(name))
+            return True
+        except FileNotFoundError:
+            return False
+    
+    def migrate_legacy(self, filename: str = LEGACY_PROFILES_FILE) -> int:
+        """Converte o antigo arquivo único de perfis para arquivos individuais"""
+        legacy_path = os.path.join(self.app_dir, filename)
+        if not os.path.exists(legacy_path):
+            return 0
+        
+        with open(legacy_path, 'r', encoding='utf-8') as f:
+            profiles_data = json.load(f)
+        
+        for name, data in profiles_data.items():
+            if not self.exists(name):
+                self.save(name, data)
+        
+        os.replace(legacy_path, legacy_path + '.migrated')
+        logger.info(f"{len(profiles_data)} perfis migrados de {filename}")
+        return len(profiles_data)
 
 
 class NFCProfileManager:
-    """Gerenciador de perfis NFC"""
+    """Gerenciador de perfis NFC
     
-    def __init__(self):
-        self.profiles = {}
-        self.load_profiles()
+    Na abertura só o índice de metadados (nome, descrição, nº de registros,
+    modificação) é lido, e apenas no primeiro acesso, conferido com os mtimes
+    dos arquivos. Perfis completos são carregados sob demanda em get_profile e
+    cada alteração grava somente o perfil afetado; o índice em disco é
+    regravado em flush_index (ex.: quando o app vai para o background).
+    """
+    
+    def __init__(self, store: Optional[ProfileStore] = None,
+                 cache: Optional[EncodedMessageCache] = None):
+        self.store = store
+        self.message_cache = cache
+        self.profiles = {}  # perfis já carregados
+        self._index = None
+        self._index_dirty = False
+    
+    @property
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """Índice de metadados dos perfis (carregado no primeiro acesso)"""
+        if self._index is None:
+            self.load_profiles()
+        return self._index
     
     def create_profile(self, name: str, description: str = "") -> NFCProfile:
-        """Cria novo perfil"""
-        if name in self.profiles:
-            raise ValueError(f"Perfil '{name}' já existe")
+        """Cria novo perfil
+        
+        Nomes que diferem só em maiúsculas/minúsculas são recusados: em
+        sistemas de arquivos que ignoram a caixa eles gravariam o mesmo arquivo.
+        """
+        if not name:
+            raise ValueError("Nome do perfil não pode ser vazio")
+        folded = name.casefold()
+        existing = next((other for other in self.index if other.casefold() == folded), None)
+        if existing is not None:
+            raise ValueError(f"Perfil '{existing}' já existe")
         
         profile = NFCProfile(name, description)
+        if not self.save_profile(profile):
+            raise IOError(f"Não foi possível salvar o perfil '{name}'")
         self.profiles[name] = profile
-        self.save_profiles()
         return profile
     
     def get_profile(self, name: str) -> Optional[NFCProfile]:
-        """Obtém perfil por nome"""
-        return self.profiles.get(name)
+        """Obtém perfil por nome (carrega do disco na primeira vez)"""
+        profile = self.profiles.get(name)
+        if profile is None and name in self.index and self.store:
+            try:
+                data = self.store.load(name)
+                if data:
+                    profile = NFCProfile.from_dict(data)
+                    self.profiles[name] = profile
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Erro ao carregar perfil '{name}': {e}")
+        return profile
+    
+    def get_profile_info(self, name: str) -> Optional[Dict[str, Any]]:
+        """Metadados do perfil sem carregá-lo"""
+        return self.index.get(name)
     
     def list_profiles(self) -> List[str]:
         """Lista nomes dos perfis"""
-        return list(self.profiles.keys())
+        return sorted(self.index)
+    
+    def list_profile_info(self) -> List[Dict[str, Any]]:
+        """Lista metadados de todos os perfis, ordenados por nome"""
+        index = self.index
+        return [index[name] for name in sorted(index)]
     
     def delete_profile(self, name: str) -> bool:
         """Remove perfil"""
-        if name in self.profiles:
-            del self.profiles[name]
-            self.save_profiles()
-            return True
-        return False
+        if name not in self.index:
+            return False
+        if self.store:
+            try:
+                self.store.delete(name)
+            except OSError as e:
+                logger.error(f"Erro ao remover perfil '{name}': {e}")
+                return False
+        del self._index[name]
+        self._index_dirty = True
+        self.profiles.pop(name, None)
+        if self.message_cache is not None:
+            self.message_cache.invalidate(name)
+        return True
     
-    def save_profiles(self):
-        """Salva perfis em arquivo"""
+    def save_profile(self, profile: NFCProfile) -> bool:
+        """Salva somente o perfil informado; o índice é atualizado após a gravação"""
+        index = self.index
+        if not self.store:
+            return False
+        data = profile.to_dict()
         try:
-            from utils import file_manager
-            profiles_data = {
-                name: profile.to_dict() 
-                for name, profile in self.profiles.items()
-            }
-            file_manager.save_json(profiles_data, 'nfc_profiles.json')
+            mtime_ns = self.store.save(profile.name, data)
         except Exception as e:
-            logger.error(f"Erro ao salvar perfis: {e}")
+            logger.error(f"Erro ao salvar perfil '{profile.name}': {e}")
+            return False
+        index[profile.name] = ProfileStore.metadata(data, mtime_ns)
+        self._index_dirty = True
+        return True
+    
+    def flush_index(self) -> bool:
+        """Grava o índice em disco se houver alterações pendentes"""
+        if not self._index_dirty or self.store is None:
+            return True
+        try:
+            self.store.save_index(self._index)
+            self._index_dirty = False
+            return True
+        except OSError as e:
+            logger.error(f"Erro ao salvar índice de perfis: {e}")
+            return False
+    
+    def save_profiles(self):
+        """Salva os perfis carregados em memória"""
+        for profile in list(self.profiles.values()):
+            self.save_profile(profile)
     
     def load_profiles(self):
-        """Carrega perfis de arquivo"""
+        """Carrega o índice de perfis (o conteúdo é lido sob demanda)"""
+        self.profiles = {}
         try:
-            from utils import file_manager
-            profiles_data = file_manager.load_json('nfc_profiles.json')
-            
-            if profiles_data:
-                self.profiles = {
-                    name: NFCProfile.from_dict(data)
-                    for name, data in profiles_data.items()
-                }
+            if self.store is None:
+                self.store = ProfileStore()
+            self.store.migrate_legacy()
+            self._index, self._index_dirty = self.store.reconcile_index(self.store.load_index() or {})
+            self.flush_index()
         except Exception as e:
             logger.error(f"Erro ao carregar perfis: {e}")
-            self.profiles = {}
+            self._index = {}
+
 
+# Serviços construídos sob demanda (nada é instanciado na importação)
+services.register('message_cache', EncodedMessageCache)
+services.register('nfc_writer', NFCWriter)
+services.register('message_encoder', NFCMessageEncoder)
+services.register('capacity_planner', lambda: TagCapacityPlanner(services.get('message_encoder')))
+services.register('profile_manager', lambda: NFCProfileManager(cache=services.get('message_cache')))
+services.register('data_builder', NFCDataBuilder)
 
-# Instâncias globais
-nfc_writer = NFCWriter()
-profile_manager = NFCProfileManager()
-data_builder = NFCDataBuilder()
+# Instâncias globais (referências preguiçosas aos serviços)
+message_cache = services.proxy('message_cache')
+nfc_writer = services.proxy('nfc_writer')
+message_encoder = services.proxy('message_encoder')
+capacity_planner = services.proxy('capacity_planner')
+profile_manager = services.proxy('profile_manager')
+data_builder = services.proxy('data_builder')
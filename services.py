@@ -0,0 +1,129 @@
+"""
+🧩 Services Module - Contêiner de Serviços Sob Demanda
+======================================================
+
+Registro central dos serviços do app (escritor NFC, perfis, automação...).
+Os módulos apenas registram fábricas ao serem importados; cada serviço só é
+construído no primeiro uso, deixando a importação praticamente gratuita e
+tirando acesso a disco do caminho do primeiro quadro.
+"""
+
+import logging
+import threading
+from typing import Dict, Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """Contêiner de serviços com construção preguiçosa e thread-safe"""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def register(self, name: str, factory: Callable[[], Any], replace: bool = False):
+        """Registra a fábrica de um serviço (não o constrói)"""
+        with self._lock:
+            if name in self._factories and not replace:
+                return
+            self._factories[name] = factory
+            if replace:
+                self._instances.pop(name, None)
+
+    def get(self, name: str) -> Any:
+        """Obtém o serviço, construindo-o no primeiro acesso"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                factory = self._factories.get(name)
+                if factory is None:
+                    raise KeyError(f"Serviço não registrado: {name}")
+                instance = factory()
+                self._instances[name] = instance
+                logger.debug(f"Serviço construído: {name}")
+            return instance
+
+    def override(self, name: str, instance: Any):
+        """Substitui a instância de um serviço (simulação, testes)"""
+        with self._lock:
+            self._instances[name] = instance
+
+    def is_initialized(self, name: str) -> bool:
+        return name in self._instances
+
+    def initialized(self) -> Dict[str, Any]:
+        """Serviços já construídos"""
+        with self._lock:
+            return dict(self._instances)
+
+    def reset(self, name: Optional[str] = None):
+        """Descarta instâncias (todas ou uma) para reconstrução no próximo acesso"""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def proxy(self, name: str) -> 'LazyService':
+        """Referência que resolve o serviço apenas no primeiro uso"""
+        return LazyService(self, name)
+
+
+class LazyService:
+    """Encaminha atributos para um serviço do contêiner, resolvido sob demanda
+
+    Mantém compatíveis os antigos globais de módulo (ex.: `nfc_writer`,
+    `automation_engine`) sem construí-los na importação.
+    """
+
+    __slots__ = ('_container', '_name')
+
+    def __init__(self, container: ServiceContainer, name: str):
+        object.__setattr__(self, '_container', container)
+        object.__setattr__(self, '_name', name)
+
+    def _resolve(self) -> Any:
+        return self._container.get(self._name)
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._resolve(), attr, value)
+
+    # Métodos especiais não passam por __getattr__: encaminhados explicitamente
+    # para que `if servico:`, `==`, `hash()` e isinstance vejam o objeto real
+
+    @property
+    def __class__(self):
+        return type(self._resolve())
+
+    def __bool__(self) -> bool:
+        return bool(self._resolve())
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, LazyService):
+            other = other._resolve()
+        return self._resolve() == other
+
+    def __ne__(self, other) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash(self._resolve())
+
+    def __repr__(self) -> str:
+        # Não constrói o serviço só para exibi-lo
+        if self._container.is_initialized(self._name):
+            return repr(self._resolve())
+        return f"<LazyService {self._name} (pendente)>"
+
+
+# Contêiner global
+services = ServiceContainer()
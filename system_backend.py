@@ -0,0 +1,296 @@
+"""
+🔌 System Backend Module - Backends de Controle do Sistema
+==========================================================
+
+Operações de baixo nível usadas pelo SystemController (Wi-Fi, Bluetooth,
+volume, apps, URLs e notificações). O backend Android fala com o sistema via
+PyJNIUS; o simulado mantém o estado em memória, com latências configuráveis,
+para exercitar automações, lotes e gatilhos fora do aparelho (desktop, CI).
+"""
+
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SystemBackend(ABC):
+    """Interface dos backends de controle do sistema"""
+
+    name = 'base'
+
+    @abstractmethod
+    def initialize(self) -> bool:
+        """Prepara o backend; False se indisponível nesta plataforma"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_wifi_enabled(self) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_wifi_enabled(self, enabled: bool):
+        raise NotImplementedError
+
+    @abstractmethod
+    def is_bluetooth_enabled(self) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_bluetooth_enabled(self, enabled: bool):
+        raise NotImplementedError
+
+    @abstractmethod
+    def adjust_volume(self, direction: int):
+        """Sobe (1) ou desce (-1) um passo do volume de mídia"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def toggle_mute(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_volume(self, percent: int):
+        """Define o volume de mídia em porcentagem (0-100)"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def launch_app(self, package_name: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def open_url(self, url: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def send_notification(self, title: str, message: str):
+        raise NotImplementedError
+
+
+class AndroidSystemBackend(SystemBackend):
+    """Backend real, via PyJNIUS, com constantes e métodos Java pré-resolvidos"""
+
+    name = 'android'
+
+    def __init__(self):
+        self.context = None
+        self.audio_manager = None
+        self.wifi_manager = None
+        self.bluetooth_adapter = None
+        self.notification_manager = None
+        self.max_music_volume = None
+
+    def initialize(self) -> bool:
+        from jnius import autoclass
+
+        # Classes Android para controle do sistema
+        self.PythonActivity = autoclass('org.kivy.android.PythonActivity')
+        self.Context = autoclass('android.content.Context')
+        self.AudioManager = autoclass('android.media.AudioManager')
+        self.WifiManager = autoclass('android.net.wifi.WifiManager')
+        self.BluetoothAdapter = autoclass('android.bluetooth.BluetoothAdapter')
+        self.NotificationManager = autoclass('android.app.NotificationManager')
+        self.Intent = autoclass('android.content.Intent')
+        self.Settings = autoclass('android.provider.Settings')
+        self.Uri = autoclass('android.net.Uri')
+
+        # Obtém contexto da atividade
+        self.context = self.PythonActivity.mActivity
+
+        # Inicializa gerenciadores
+        self.audio_manager = self.context.getSystemService(self.Context.AUDIO_SERVICE)
+        self.wifi_manager = self.context.getSystemService(self.Context.WIFI_SERVICE)
+        self.bluetooth_adapter = self.BluetoothAdapter.getDefaultAdapter()
+        self.notification_manager = self.context.getSystemService(self.Context.NOTIFICATION_SERVICE)
+
+        self._resolve_java_handles()
+        return True
+
+    def _resolve_java_handles(self):
+        """Resolve uma única vez constantes e métodos Java usados nas operações"""
+        AudioManager = self.AudioManager
+        self.STREAM_MUSIC = AudioManager.STREAM_MUSIC
+        self.ADJUST_RAISE = AudioManager.ADJUST_RAISE
+        self.ADJUST_LOWER = AudioManager.ADJUST_LOWER
+        self.ADJUST_TOGGLE_MUTE = AudioManager.ADJUST_TOGGLE_MUTE
+        self.FLAG_SHOW_UI = AudioManager.FLAG_SHOW_UI
+        self.ACTION_VIEW = self.Intent.ACTION_VIEW
+
+        self._adjust_stream_volume = self.audio_manager.adjustStreamVolume
+        self._set_stream_volume = self.audio_manager.setStreamVolume
+        self._is_wifi_enabled = self.wifi_manager.isWifiEnabled
+        self._set_wifi_enabled = self.wifi_manager.setWifiEnabled
+        self._start_activity = self.context.startActivity
+        self.max_music_volume = self.audio_manager.getStreamMaxVolume(self.STREAM_MUSIC)
+
+    def is_wifi_enabled(self) -> bool:
+        return self._is_wifi_enabled()
+
+    def set_wifi_enabled(self, enabled: bool):
+        self._set_wifi_enabled(enabled)
+
+    def is_bluetooth_enabled(self) -> bool:
+        return self.bluetooth_adapter.isEnabled()
+
+    def set_bluetooth_enabled(self, enabled: bool):
+        if enabled:
+            self.bluetooth_adapter.enable()
+        else:
+            self.bluetooth_adapter.disable()
+
+    def adjust_volume(self, direction: int):
+        self._adjust_stream_volume(
+            self.STREAM_MUSIC,
+            self.ADJUST_RAISE if direction > 0 else self.ADJUST_LOWER,
+            self.FLAG_SHOW_UI
+        )
+
+    def toggle_mute(self):
+        self._adjust_stream_volume(self.STREAM_MUSIC, self.ADJUST_TOGGLE_MUTE, self.FLAG_SHOW_UI)
+
+    def set_volume(self, percent: int):
+        target_volume = int((percent / 100.0) * self.max_music_volume)
+        self._set_stream_volume(self.STREAM_MUSIC, target_volume, self.FLAG_SHOW_UI)
+
+    def launch_app(self, package_name: str) -> bool:
+        intent = self.context.getPackageManager().getLaunchIntentForPackage(package_name)
+        if not intent:
+            return False
+        self._start_activity(intent)
+        return True
+
+    def open_url(self, url: str):
+        intent = self.Intent(self.ACTION_VIEW)
+        intent.setData(self.Uri.parse(url))
+        self._start_activity(intent)
+
+    def send_notification(self, title: str, message: str):
+        # Implementação simplificada - requer API específica do Android
+        logger.info(f"Notificação: {title} - {message}")
+
+
+class SimulatedSystemBackend(SystemBackend):
+    """Backend em memória que imita o Android, para desktop e testes de carga
+
+    `latencies` define, em segundos, o tempo gasto por operação (chave = nome
+    do método, ex.: {'set_wifi_enabled': 0.05}); 'default' vale para as demais.
+    As últimas `max_calls` chamadas ficam registradas em `calls`.
+    """
+
+    name = 'simulated'
+
+    MAX_VOLUME = 15  # passos de volume de mídia, como na maioria dos aparelhos
+
+    def __init__(self, latencies: Optional[Dict[str, float]] = None,
+                 installed_apps: Tuple[str, ...] = (), max_calls: int = 10000):
+        self.latencies = dict(latencies or {})
+        self.installed_apps = set(installed_apps)
+        self.wifi_enabled = True
+        self.bluetooth_enabled = False
+        self.volume = self.MAX_VOLUME // 2
+        self.muted = False
+        self.launched_apps = deque(maxlen=max_calls)
+        self.opened_urls = deque(maxlen=max_calls)
+        self.notifications = deque(maxlen=max_calls)
+        self.calls = deque(maxlen=max_calls)
+        self._call_counts = {}  # totais por operação, sem limite de histórico
+        self._lock = threading.Lock()
+
+    def _simulate(self, operation: str, *args):
+        """Registra a chamada e aguarda a latência configurada (fora do lock)"""
+        with self._lock:
+            self.calls.append((operation,) + args)
+            self._call_counts[operation] = self._call_counts.get(operation, 0) + 1
+        latency = self.latencies.get(operation, self.latencies.get('default', 0))
+        if latency:
+            time.sleep(latency)
+
+    def initialize(self) -> bool:
+        self._simulate('initialize')
+        return True
+
+    def is_wifi_enabled(self) -> bool:
+        self._simulate('is_wifi_enabled')
+        return self.wifi_enabled
+
+    def set_wifi_enabled(self, enabled: bool):
+        self._simulate('set_wifi_enabled', enabled)
+        with self._lock:
+            self.wifi_enabled = bool(enabled)
+
+    def is_bluetooth_enabled(self) -> bool:
+        self._simulate('is_bluetooth_enabled')
+        return self.bluetooth_enabled
+
+    def set_bluetooth_enabled(self, enabled: bool):
+        self._simulate('set_bluetooth_enabled', enabled)
+        with self._lock:
+            self.bluetooth_enabled = bool(enabled)
+
+    def adjust_volume(self, direction: int):
+        self._simulate('adjust_volume', direction)
+        with self._lock:
+            step = 1 if direction > 0 else -1
+            self.volume = min(self.MAX_VOLUME, max(0, self.volume + step))
+
+    def toggle_mute(self):
+        self._simulate('toggle_mute')
+        with self._lock:
+            self.muted = not self.muted
+
+    def set_volume(self, percent: int):
+        self._simulate('set_volume', percent)
+        with self._lock:
+            self.volume = int((percent / 100.0) * self.MAX_VOLUME)
+
+    def launch_app(self, package_name: str) -> bool:
+        self._simulate('launch_app', package_name)
+        if self.installed_apps and package_name not in self.installed_apps:
+            return False
+        with self._lock:
+            self.launched_apps.append(package_name)
+        return True
+
+    def open_url(self, url: str):
+        self._simulate('open_url', url)
+        with self._lock:
+            self.opened_urls.append(url)
+
+    def send_notification(self, title: str, message: str):
+        self._simulate('send_notification', title, message)
+        with self._lock:
+            self.notifications.append((title, message))
+
+    def state(self) -> Dict[str, Any]:
+        """Estado atual simulado do aparelho"""
+        with self._lock:
+            return {
+                'wifi_enabled': self.wifi_enabled,
+                'bluetooth_enabled': self.bluetooth_enabled,
+                'volume': self.volume,
+                'muted': self.muted,
+            }
+
+    def call_count(self, operation: Optional[str] = None) -> int:
+        """Total de chamadas (de uma operação ou de todas), inclusive as fora de `calls`"""
+        with self._lock:
+            if operation is None:
+                return sum(self._call_counts.values())
+            return self._call_counts.get(operation, 0)
+
+
+def create_system_backend() -> SystemBackend:
+    """Backend padrão: simulado quando DEBUG_CONFIG['simulate_system'] está ativo"""
+    try:
+        from config import get_config
+        simulate = get_config('debug').get('simulate_system', False)
+    except ImportError:
+        simulate = False
+
+    if simulate:
+        return SimulatedSystemBackend()
+    return AndroidSystemBackend()
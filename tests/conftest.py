@@ -0,0 +1,15 @@
+"""Configuração comum dos testes (rodam sem Kivy e sem aparelho Android)"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(autouse=True)
+def app_home(tmp_path, monkeypatch):
+    """Diretório do app (~/.nfc_reader) isolado em uma pasta temporária"""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    return tmp_path
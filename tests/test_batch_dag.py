@@ -0,0 +1,115 @@
+"""Testes do BatchTaskManager: ordem por dependências, paralelismo e cascata de skips"""
+
+import threading
+import time
+
+import pytest
+
+from nfc_automation import AutomationTask, BatchTaskManager, TaskAction
+from services import services
+
+
+class FakeController:
+    """SystemController em memória: 'fail' falha, 'sleep' espera parameters['s']"""
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def execute_command(self, command, parameters):
+        with self._lock:
+            self.calls.append(parameters.get('task'))
+        if command == 'sleep':
+            time.sleep(parameters['s'])
+        return command != 'fail'
+
+
+@pytest.fixture
+def controller():
+    controller = FakeController()
+    services.override('system_controller', controller)
+    yield controller
+    services.reset('system_controller')
+
+
+def task(name, command='ok', **parameters):
+    automation_task = AutomationTask(name)
+    automation_task.add_action(TaskAction(command, dict(parameters, task=name)))
+    return automation_task
+
+
+def statuses(result):
+    return {name: task_result['status'] for name, task_result in result['tasks'].items()}
+
+
+def test_dependencies_run_before_dependents(controller):
+    manager = BatchTaskManager()
+    manager.create_batch_task('lote', [task('c'), task('b'), task('a')],
+                              dependencies={'b': ['a'], 'c': ['b']})
+
+    result = manager.run_batch_task('lote')
+
+    assert result['success'] and result['succeeded'] == 3
+    assert controller.calls == ['a', 'b', 'c']
+
+
+def test_failure_skips_the_whole_downstream_chain(controller):
+    manager = BatchTaskManager()
+    tasks = [task('a', 'fail'), task('b'), task('c'), task('d'), task('e')]
+    # a -> b -> c, a -> d; e é independente
+    manager.create_batch_task('lote', tasks, dependencies={'b': ['a'], 'c': ['b'], 'd': ['a']})
+
+    result = manager.run_batch_task('lote')
+
+    assert statuses(result) == {'a': 'failed', 'b': 'skipped', 'c': 'skipped',
+                                'd': 'skipped', 'e': 'ok'}
+    assert (result['succeeded'], result['failed'], result['skipped']) == (1, 1, 3)
+    assert "'a'" in result['tasks']['b']['error']
+    assert "'b'" in result['tasks']['c']['error']
+    assert sorted(controller.calls) == ['a', 'e']
+
+
+def test_task_waits_for_all_of_its_dependencies(controller):
+    manager = BatchTaskManager()
+    manager.create_batch_task('lote', [task('a'), task('b', 'fail'), task('c')],
+                              dependencies={'c': ['a', 'b']})
+
+    result = manager.run_batch_task('lote')
+
+    assert statuses(result) == {'a': 'ok', 'b': 'failed', 'c': 'skipped'}
+
+
+def test_independent_tasks_run_in_parallel(controller):
+    manager = BatchTaskManager(max_workers=4)
+    manager.create_batch_task('lote', [task(name, 'sleep', s=0.2) for name in 'abcd'])
+
+    started = time.perf_counter()
+    result = manager.run_batch_task('lote')
+
+    assert result['succeeded'] == 4
+    assert time.perf_counter() - started < 0.6
+
+
+def test_timeout_fails_task_and_skips_dependents(controller):
+    manager = BatchTaskManager()
+    manager.create_batch_task('lote', [task('lenta', 'sleep', s=0.5), task('depois')],
+                              dependencies={'depois': ['lenta']}, task_timeout=0.1)
+
+    result = manager.run_batch_task('lote')
+
+    assert statuses(result) == {'lenta': 'timeout', 'depois': 'skipped'}
+
+
+@pytest.mark.parametrize('dependencies', [
+    {'a': ['b'], 'b': ['a']},
+    {'a': ['a']},
+    {'a': ['inexistente']},
+])
+def test_invalid_graphs_are_rejected(controller, dependencies):
+    manager = BatchTaskManager()
+    assert not manager.create_batch_task('lote', [task('a'), task('b')], dependencies=dependencies)
+    assert manager.run_batch_task('lote') is None
+
+
+def test_repeated_task_names_are_rejected(controller):
+    assert not BatchTaskManager().create_batch_task('lote', [task('a'), task('a')])
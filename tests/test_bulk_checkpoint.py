@@ -0,0 +1,154 @@
+"""Testes do BulkProvisioningJob: avanço por toque, falhas e retomada por checkpoint"""
+
+import csv
+import threading
+
+import pytest
+
+from ndef_codec import decode_text_payload, parse_message
+from nfc_bulk import BulkProvisioningJob
+from nfc_writer import EncodedMessageCache, NFCWriter, data_builder
+
+
+class FakeTagWriter(NFCWriter):
+    """NFCWriter sem Android: cada toque grava (ou falha) em memória"""
+
+    def __init__(self):
+        super().__init__(cache=EncodedMessageCache())
+        self.tags = {}          # tag -> texto gravado
+        self.failing = set()    # textos cuja gravação falha
+
+    def is_available(self):
+        return True
+
+    def enable_foreground_dispatch(self):
+        return True
+
+    def disable_foreground_dispatch(self):
+        pass
+
+    def detach_thread(self):
+        pass
+
+    def write_message_to_tag(self, tag, message, records=None, allow_lossy=False):
+        text = decode_text_payload(parse_message(message)[0].payload)[1]
+        if text in self.failing:
+            return False, 'falha simulada'
+        self.tags[tag] = text
+        return True, ''
+
+
+class Tapper:
+    """Aproxima tags e espera o resultado de cada toque chegar ao job"""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.result = threading.Event()
+        self.count = 0
+
+    def on_progress(self, progress):
+        self.result.set()
+
+    def tap(self):
+        self.result.clear()
+        self.count += 1
+        assert self.writer.handle_tag(f'tag-{self.count}')
+        assert self.result.wait(5)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'lote.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=['type', 'text'])
+        writer.writeheader()
+        for index in range(6):
+            writer.writerow({'type': 'text', 'text': f'linha {index}'})
+    return str(path)
+
+
+def make_job(source, writer, **kwargs):
+    kwargs.setdefault('lookahead', 2)
+    return BulkProvisioningJob(source, writer=writer, builder=data_builder, **kwargs)
+
+
+def test_writes_every_row_and_finishes(source):
+    writer = FakeTagWriter()
+    tapper = Tapper(writer)
+    job = make_job(source, writer)
+
+    assert job.start(resume=False, on_progress=tapper.on_progress)
+    for _ in range(6):
+        tapper.tap()
+
+    assert sorted(writer.tags.values()) == [f'linha {index}' for index in range(6)]
+    assert job.finished and not job.running
+    assert not writer.session.active
+    assert job.load_checkpoint()['finished'] is True
+
+
+def test_resume_continues_after_last_written_row(source):
+    writer = FakeTagWriter()
+    tapper = Tapper(writer)
+    job = make_job(source, writer)
+    job.start(resume=False, on_progress=tapper.on_progress)
+    for _ in range(3):
+        tapper.tap()
+    job.stop()
+
+    checkpoint = job.load_checkpoint()
+    assert checkpoint['next_row'] == 3 and checkpoint['written'] == 3
+    assert writer.session.pending_count() == 0  # linhas enfileiradas descartadas
+
+    resumed = make_job(source, writer)
+    assert resumed.start(on_progress=tapper.on_progress)
+    for _ in range(3):
+        tapper.tap()
+
+    assert resumed.finished and resumed.written == 6
+    assert sorted(writer.tags.values()) == [f'linha {index}' for index in range(6)]
+
+
+def test_finished_checkpoint_is_not_resumed(source):
+    writer = FakeTagWriter()
+    tapper = Tapper(writer)
+    job = make_job(source, writer)
+    job.start(resume=False, on_progress=tapper.on_progress)
+    for _ in range(6):
+        tapper.tap()
+
+    again = make_job(source, writer)
+    again.start(on_progress=tapper.on_progress)
+
+    assert again.get_progress()['pending'] == 2
+    assert again.written == 0
+    again.stop()
+
+
+def test_row_is_skipped_after_max_attempts(source):
+    writer = FakeTagWriter()
+    writer.failing.add('linha 1')
+    tapper = Tapper(writer)
+    job = make_job(source, writer, max_attempts=2, lookahead=1)
+    job.start(resume=False, on_progress=tapper.on_progress)
+
+    for _ in range(7):  # 5 linhas boas + 2 tentativas da linha 1
+        tapper.tap()
+
+    assert job.finished
+    assert job.written == 5 and job.skipped == 1
+    assert [failure['row'] for failure in job.failures] == [1]
+    assert 'linha 1' not in writer.tags.values()
+
+
+def test_rows_that_cannot_be_encoded_are_recorded(tmp_path):
+    path = tmp_path / 'lote.jsonl'
+    path.write_text('{"text": "ok"}\n{"type": "fax"}\n', encoding='utf-8')
+    writer = FakeTagWriter()
+    tapper = Tapper(writer)
+    job = make_job(str(path), writer)
+    job.start(resume=False, on_progress=tapper.on_progress)
+    tapper.tap()
+
+    assert job.finished and job.written == 1 and job.skipped == 1
+    assert job.failures[0]['error'].startswith('Codificação')
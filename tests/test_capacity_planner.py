@@ -0,0 +1,92 @@
+"""Testes do TagCapacityPlanner: encaixe na tag e escolha de codificação"""
+
+from nfc_writer import NFCDataBuilder, TAG_CAPACITIES, TagCapacityPlanner
+
+
+def contact(**fields):
+    return NFCDataBuilder.build_contact_record(
+        fields.get('name', 'Maria da Silva'),
+        phone=fields.get('phone', '+55 11 99999-9999'),
+        email=fields.get('email', 'maria.silva@example.com'),
+        organization=fields.get('organization', 'Empresa Exemplo Ltda'),
+    )
+
+
+def test_small_message_fits_original():
+    planner = TagCapacityPlanner()
+    plan = planner.plan([NFCDataBuilder.build_uri_record('https://example.com')], tag_type='NTAG213')
+
+    assert plan['fits'] and plan['step'] == 'original'
+    assert plan['size'] == len(plan['message'])
+    assert plan['smallest_tag'] == 'MIFARE Ultralight'
+
+
+def test_type2_capacity_accounts_for_tlv_overhead():
+    # 48 bytes - tipo do TLV - tamanho (1 ou 3 bytes) - terminador
+    assert TagCapacityPlanner.tag_capacity('MIFARE Ultralight', 10) == 45
+    assert TagCapacityPlanner.tag_capacity('NTAG216', 300) == 883
+    assert TagCapacityPlanner.tag_capacity('Type 4 (2 KB)') == 2046
+
+
+def test_cjk_text_downgrades_to_utf16_when_needed():
+    planner = TagCapacityPlanner()
+    record = NFCDataBuilder.build_text_record('日本語' * 14, language='ja')
+    utf8_size = planner.message_size([record])
+
+    plan = planner.plan([record], capacity=utf8_size - 1)
+
+    assert plan['fits'] and plan['step'] == 'text_encoding'
+    assert plan['records'][0]['encoding'] == 'utf-16'
+    assert record['encoding'] == 'utf-8'  # o original não é alterado
+
+
+def test_latin_text_keeps_utf8():
+    planner = TagCapacityPlanner()
+    record = NFCDataBuilder.build_text_record('texto em português')
+
+    plan = planner.plan([record], capacity=planner.message_size([record]) - 1)
+
+    assert not plan['fits']
+    assert plan['records'][0]['encoding'] == 'utf-8'
+
+
+def test_vcard_fields_are_kept_unless_lossy_is_allowed():
+    planner = TagCapacityPlanner()
+    record = contact()
+    capacity = planner.message_size([record]) - 5
+
+    strict = planner.plan([record], capacity=capacity)
+    lossy = planner.plan([record], capacity=capacity, allow_lossy=True)
+
+    assert not strict['fits'] and strict['step'] == 'original'
+    assert lossy['fits'] and lossy['step'] == 'drop_vcard_organization'
+    assert lossy['records'][0]['organization'] == ''
+    assert lossy['records'][0]['email'] and record['organization']
+
+
+def test_lossy_drops_fields_in_order_until_it_fits():
+    planner = TagCapacityPlanner()
+    record = contact()
+    without_org_email = dict(record, organization='', email='')
+
+    plan = planner.plan([record], capacity=planner.message_size([without_org_email]), allow_lossy=True)
+
+    assert plan['fits'] and plan['step'] == 'drop_vcard_email'
+    assert plan['records'][0]['phone']
+
+
+def test_reports_smallest_variant_when_nothing_fits():
+    planner = TagCapacityPlanner()
+    record = contact()
+
+    plan = planner.plan([record], tag_type='MIFARE Ultralight', allow_lossy=True)
+
+    assert not plan['fits']
+    assert plan['step'] == 'drop_vcard_phone'
+    assert plan['smallest_tag'] in TAG_CAPACITIES
+
+
+def test_unencodable_records_give_empty_plan():
+    plan = TagCapacityPlanner().plan([{'type': 'desconhecido'}], tag_type='NTAG213')
+    assert plan == {'fits': False, 'size': 0, 'capacity': None, 'step': None,
+                    'records': [], 'message': None, 'smallest_tag': None}
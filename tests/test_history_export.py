@@ -0,0 +1,136 @@
+"""Testes do HistoryExporter: formatos, gzip, progresso e cancelamento"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import threading
+
+import pytest
+
+from nfc_history import HistoryStore
+from utils import HistoryExporter
+
+
+READINGS = [
+    {'timestamp': '01/01/2025 10:00:00', 'type': 'text', 'content': 'olá, "mundo"\nsegunda linha',
+     'raw_data': 'cru', 'tag_uid': '04A1'},
+    {'timestamp': '01/01/2025 10:01:00', 'type': 'uri', 'content': 'https://exemplo.com',
+     'raw_data': None, 'tag_uid': None},
+]
+
+
+def exporter(**kwargs):
+    kwargs.setdefault('include_raw_data', True)
+    return HistoryExporter(chunk_size=1, include_timestamp=True, **kwargs)
+
+
+def read_text(path, compressed=False):
+    opener = gzip.open if compressed else open
+    with opener(path, 'rt', encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+def test_csv_quotes_commas_quotes_and_newlines(tmp_path):
+    path = str(tmp_path / 'h.csv')
+    assert exporter().export(READINGS, path, 'csv') == 2
+
+    rows = list(csv.reader(io.StringIO(read_text(path))))
+
+    assert rows[0] == ['Timestamp', 'Tipo', 'Conteudo', 'Dados_Brutos', 'UID_Tag']
+    assert rows[1][2] == READINGS[0]['content']
+    assert rows[2] == ['01/01/2025 10:01:00', 'uri', 'https://exemplo.com', '', '']
+
+
+def test_jsonl_has_one_object_per_line(tmp_path):
+    path = str(tmp_path / 'h.jsonl')
+    exporter(include_raw_data=False).export(READINGS, path, 'JSONL')
+
+    lines = read_text(path).splitlines()
+
+    assert [json.loads(line) for line in lines] == [
+        {key: reading[key] for key in ('timestamp', 'type', 'content', 'tag_uid')}
+        for reading in READINGS
+    ]
+
+
+@pytest.mark.parametrize('readings', [READINGS, []])
+def test_json_is_a_valid_array(tmp_path, readings):
+    path = str(tmp_path / 'h.json')
+    exporter().export(readings, path, 'JSON')
+
+    assert json.loads(read_text(path)) == readings
+
+
+def test_txt_indents_multiline_content(tmp_path):
+    path = str(tmp_path / 'h.txt')
+    exporter().export(READINGS, path, 'TXT')
+
+    assert read_text(path) == (
+        '[01/01/2025 10:00:00] text (UID 04A1): olá, "mundo"\n'
+        '    segunda linha\n'
+        '    Dados brutos: cru\n'
+        '[01/01/2025 10:01:00] uri: https://exemplo.com\n'
+    )
+
+
+@pytest.mark.parametrize('fmt', HistoryExporter.FORMATS)
+def test_gzip_output_matches_plain_output(tmp_path, fmt):
+    plain = str(tmp_path / HistoryExporter.filename_for('h', fmt))
+    packed = str(tmp_path / HistoryExporter.filename_for('h', fmt, compress=True))
+    exporter().export(READINGS, plain, fmt)
+    exporter().export(READINGS, packed, fmt, compress=True)
+
+    assert packed.endswith('.gz')
+    assert read_text(packed, compressed=True) == read_text(plain)
+
+
+def test_streams_from_history_store_with_progress(tmp_path):
+    store = HistoryStore(':memory:')
+    for index in range(7):
+        store.append('text', f'leitura {index}')
+    progress = []
+    path = str(tmp_path / 'h.jsonl')
+
+    rows = HistoryExporter(chunk_size=3).export(
+        store.iter_all(batch_size=2), path, 'JSONL', total=store.count(),
+        progress=lambda written, total: progress.append((written, total))
+    )
+
+    assert rows == 7
+    assert progress == [(3, 7), (6, 7), (7, 7)]
+    assert [json.loads(line)['content'] for line in read_text(path).splitlines()] == \
+        [f'leitura {index}' for index in range(7)]
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        exporter().export(READINGS, str(tmp_path / 'h.xml'), 'XML')
+
+
+def test_cancelled_export_leaves_no_file(tmp_path):
+    directory = tmp_path / 'exportacao'
+    directory.mkdir()
+    path = str(directory / 'h.csv')
+    cancel = threading.Event()
+
+    def readings():
+        yield READINGS[0]
+        cancel.set()
+        yield READINGS[1]
+
+    with pytest.raises(InterruptedError):
+        exporter().export(readings(), path, 'CSV', cancel_event=cancel)
+    assert os.listdir(directory) == []
+
+
+def test_async_export_reports_completion(tmp_path):
+    path = str(tmp_path / 'h.csv')
+    done = []
+
+    job = exporter().export_async(READINGS, path, 'CSV', on_complete=done.append)
+
+    assert job.wait(5)
+    assert job.rows == 2 and done == [job]
+    assert os.path.exists(path)
@@ -0,0 +1,87 @@
+"""Testes do HistoryRingBuffer: descarte da leitura mais antiga e visão sem cópia"""
+
+import threading
+
+import pytest
+
+from nfc_history import HistoryRingBuffer
+
+
+def readings(count):
+    return [{'id': index} for index in range(count)]
+
+
+def ids(items):
+    return [item['id'] for item in items]
+
+
+def test_evicts_oldest_when_full():
+    buffer = HistoryRingBuffer(3, readings(2))
+    buffer.append({'id': 2})
+    buffer.append({'id': 3})
+
+    assert len(buffer) == 3
+    assert ids(buffer) == [3, 2, 1]
+    assert ids(buffer.snapshot()) == [3, 2, 1]
+
+
+def test_capacity_is_at_least_one():
+    buffer = HistoryRingBuffer(0)
+    buffer.append({'id': 1})
+    buffer.append({'id': 2})
+    assert ids(buffer) == [2]
+
+
+def test_view_reflects_later_appends():
+    buffer = HistoryRingBuffer(3)
+    view = buffer.view()
+    assert not view
+
+    buffer.append({'id': 1})
+    buffer.append({'id': 2})
+
+    assert len(view) == 2 and ids(view) == [2, 1]
+    assert view is buffer.view()
+
+
+def test_view_indexing_newest_first():
+    buffer = HistoryRingBuffer(5, readings(5))
+    view = buffer.view()
+
+    assert view[0]['id'] == 4 and view[-1]['id'] == 0
+    assert ids(view[1:3]) == [3, 2]
+    assert ids(view[::-1]) == [0, 1, 2, 3, 4]
+    with pytest.raises(IndexError):
+        view[5]
+
+
+def test_snapshot_is_independent():
+    buffer = HistoryRingBuffer(2, readings(2))
+    snapshot = buffer.snapshot()
+    buffer.append({'id': 2})
+    buffer.clear()
+
+    assert ids(snapshot) == [1, 0]
+    assert len(buffer) == 0
+
+
+def test_iterating_view_while_appending_from_another_thread():
+    buffer = HistoryRingBuffer(50)
+    stop = threading.Event()
+
+    def reader_thread():
+        index = 0
+        while not stop.is_set():
+            buffer.append({'id': index})
+            index += 1
+
+    thread = threading.Thread(target=reader_thread)
+    thread.start()
+    try:
+        for _ in range(2000):
+            items = list(buffer.view())
+            assert len(items) <= 50
+            assert ids(items) == sorted(ids(items), reverse=True)
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,79 @@
+"""Testes do HistoryStore: paginação por chave, filtros e persistência"""
+
+import pytest
+
+from nfc_history import HistoryStore
+
+
+@pytest.fixture
+def store():
+    store = HistoryStore(':memory:')
+    for index in range(25):
+        store.append('uri' if index % 5 == 0 else 'text', f'leitura {index}',
+                     tag_uid=f'uid-{index % 3}', ts=1000.0 + index)
+    yield store
+    store.close()
+
+
+def keyset_pages(store, page_size, **filters):
+    pages = [store.query(page_size=page_size, **filters)]
+    while len(pages[-1]) == page_size:
+        pages.append(store.query(page_size=page_size, before_id=pages[-1][-1]['id'], **filters))
+    return pages
+
+
+def test_keyset_pages_cover_every_row_newest_first(store):
+    pages = keyset_pages(store, 10)
+    ids = [row['id'] for page in pages for row in page]
+
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert ids == sorted(ids, reverse=True)
+    assert len(set(ids)) == store.count() == 25
+
+
+def test_keyset_matches_offset_pages(store):
+    for page in range(1, 3):
+        previous = store.query(page=page - 1, page_size=10)
+        assert (store.query(page_size=10, before_id=previous[-1]['id']) ==
+                store.query(page=page, page_size=10))
+
+
+def test_new_rows_do_not_shift_keyset_pages(store):
+    first = store.query(page_size=10)
+    store.append('text', 'nova leitura')
+    second = store.query(page_size=10, before_id=first[-1]['id'])
+
+    assert second[0]['id'] == first[-1]['id'] - 1
+    assert not {row['id'] for row in first} & {row['id'] for row in second}
+
+
+def test_keyset_respects_filters(store):
+    pages = keyset_pages(store, 2, data_type='uri')
+    rows = [row for page in pages for row in page]
+
+    assert [row['content'] for row in rows] == [f'leitura {index}' for index in (20, 15, 10, 5, 0)]
+    assert store.count(data_type='uri') == 5
+
+
+def test_filters_by_tag_and_period(store):
+    assert store.count(tag_uid='uid-0') == 9
+    rows = store.query(page_size=50, since=1010.0, until=1015.0)
+    assert [row['ts'] for row in rows] == [1014.0, 1013.0, 1012.0, 1011.0, 1010.0]
+
+
+def test_iter_all_is_chronological_in_batches(store):
+    rows = list(store.iter_all(batch_size=4))
+    assert [row['content'] for row in rows] == [f'leitura {index}' for index in range(25)]
+
+
+def test_readings_survive_reopen(tmp_path):
+    path = str(tmp_path / 'historico.db')
+    store = HistoryStore(path)
+    written = store.append('text', 'persistida', raw_data={'a': 1}, tag_uid='04AB')
+    store.close()
+
+    reopened = HistoryStore(path)
+    try:
+        assert reopened.query(page_size=1) == [dict(written, raw_data="{'a': 1}")]
+    finally:
+        reopened.close()
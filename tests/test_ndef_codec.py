@@ -0,0 +1,112 @@
+"""Testes do codec NDEF: ida e volta, flags do cabeçalho e texto UTF-16"""
+
+import pytest
+
+from ndef_codec import (
+    FLAG_CF, FLAG_IL, FLAG_MB, FLAG_ME, FLAG_SR, TNF_MASK, TNF_MIME_MEDIA,
+    TNF_UNCHANGED, RTD_TEXT, NdefRecordData, decode_text_payload,
+    decode_uri_payload, message_size, mime_record, parse_message,
+    serialize_message, text_record, uri_record
+)
+
+
+def headers(message, records):
+    """Bytes de cabeçalho de cada registro serializado (sem fragmentação)"""
+    offsets, offset = [], 0
+    for record in records:
+        offsets.append(message[offset])
+        offset += message_size([record])
+    return offsets
+
+
+def test_round_trip_preserves_records():
+    records = [
+        text_record('Olá, mundo'),
+        uri_record('https://www.example.com/a'),
+        mime_record('application/json', b'{"a": 1}'),
+        NdefRecordData(TNF_MIME_MEDIA, b'text/plain', b'id-1', b'x' * 300),
+    ]
+    message = serialize_message(records)
+
+    assert parse_message(message) == records
+    assert len(message) == message_size(records)
+
+
+def test_mb_me_flags_mark_first_and_last_record():
+    records = [text_record('a'), text_record('b'), text_record('c')]
+    first, middle, last = headers(serialize_message(records), records)
+
+    assert first & FLAG_MB and not first & FLAG_ME
+    assert not middle & (FLAG_MB | FLAG_ME)
+    assert last & FLAG_ME and not last & FLAG_MB
+
+
+def test_single_record_has_both_mb_and_me():
+    header = serialize_message([uri_record('tel:123')])[0]
+    assert header & FLAG_MB and header & FLAG_ME
+
+
+def test_short_record_flag_depends_on_payload_length():
+    short = mime_record('a/b', b'x' * 255)
+    long = mime_record('a/b', b'x' * 256)
+
+    assert serialize_message([short])[0] & FLAG_SR
+    assert not serialize_message([long])[0] & FLAG_SR
+    assert parse_message(serialize_message([long])) == [long]
+
+
+def test_id_length_flag_only_with_id():
+    with_id = NdefRecordData(TNF_MIME_MEDIA, b'a/b', b'rec', b'1')
+
+    assert serialize_message([with_id])[0] & FLAG_IL
+    assert not serialize_message([mime_record('a/b', b'1')])[0] & FLAG_IL
+    assert parse_message(serialize_message([with_id]))[0].id == b'rec'
+
+
+def test_chunked_record_reassembles():
+    record = mime_record('a/b', bytes(range(256)) * 3)
+    message = serialize_message([record], chunk_size=100)
+
+    assert message[0] & FLAG_CF
+    assert len(message) == message_size([record], chunk_size=100)
+    assert parse_message(message) == [record]
+    # Fragmentos seguintes usam TNF_UNCHANGED
+    assert message[message_size([mime_record('a/b', b'x' * 100)])] & TNF_MASK == TNF_UNCHANGED
+
+
+def test_empty_message_is_rejected():
+    with pytest.raises(ValueError):
+        serialize_message([])
+
+
+@pytest.mark.parametrize('encoding', ['utf-8', 'utf-16', 'UTF_16'])
+def test_text_record_encodings(encoding):
+    record = text_record('日本語のテキスト', language='ja', encoding=encoding)
+    language, text, decoded_encoding = decode_text_payload(record.payload)
+
+    assert record.type == RTD_TEXT
+    assert (language, text) == ('ja', '日本語のテキスト')
+    assert decoded_encoding == ('utf-8' if encoding == 'utf-8' else 'utf-16')
+
+
+def test_utf16_text_is_big_endian_without_bom():
+    payload = text_record('A', language='en', encoding='utf-16').payload
+
+    assert payload[0] & 0x80
+    assert payload[3:] == b'\x00A'
+
+
+def test_utf16_text_with_bom_is_decoded():
+    payload = bytes([0x80 | 2]) + b'en' + 'Oi'.encode('utf-16')
+    assert decode_text_payload(payload)[1] == 'Oi'
+
+
+@pytest.mark.parametrize('uri', [
+    'https://www.example.com', 'http://example.com', 'tel:+5511999999999',
+    'mailto:a@b.c', 'urn:nfc:ext:x', 'geo:0,0',
+])
+def test_uri_prefix_round_trip(uri):
+    record = uri_record(uri)
+
+    assert decode_uri_payload(record.payload) == uri
+    assert len(record.payload) <= len(uri.encode('utf-8')) + 1
@@ -0,0 +1,132 @@
+"""Testes do índice de perfis: carga sob demanda e conferência com os arquivos"""
+
+import json
+import os
+
+import pytest
+
+from nfc_writer import (
+    LEGACY_PROFILES_FILE, PROFILES_INDEX_FILE, NFCProfile, NFCProfileManager,
+    NFCRecordType, ProfileStore
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path / 'profiles'))
+
+
+def write_profile(store, name, description='', records=()):
+    """Grava um perfil direto no disco, como outra instância do app faria"""
+    profile = NFCProfile(name, description)
+    for record in records:
+        profile.add_record(NFCRecordType.TEXT, record)
+    return store.save(name, profile.to_dict())
+
+
+def saved_manager(store, *names):
+    manager = NFCProfileManager(store)
+    for name in names:
+        manager.create_profile(name, f'perfil {name}')
+    assert manager.flush_index()
+    return manager
+
+
+def test_index_lists_profiles_without_loading_them(store, monkeypatch):
+    saved_manager(store, 'a', 'b')
+    monkeypatch.setattr(store, 'load', lambda name: pytest.fail(f'{name} lido do disco'))
+
+    manager = NFCProfileManager(store)
+
+    assert manager.list_profiles() == ['a', 'b']
+    assert manager.get_profile_info('a')['description'] == 'perfil a'
+    assert manager.profiles == {}
+
+
+def test_profile_is_loaded_on_first_access(store):
+    saved_manager(store, 'a')
+    manager = NFCProfileManager(store)
+
+    profile = manager.get_profile('a')
+
+    assert profile.description == 'perfil a'
+    assert manager.get_profile('a') is profile
+    assert manager.get_profile('inexistente') is None
+
+
+def test_externally_modified_profile_is_reindexed(store):
+    saved_manager(store, 'a')
+    mtime_ns = write_profile(store, 'a', 'alterado', [{'text': 'x'}])
+    os.utime(store.path_for('a'), ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+    info = NFCProfileManager(store).get_profile_info('a')
+
+    assert info['description'] == 'alterado'
+    assert info['record_count'] == 1
+
+
+def test_profile_saved_before_index_flush_is_recovered(store):
+    manager = saved_manager(store, 'a')
+    manager.create_profile('b')  # índice não regravado (ex.: app encerrado)
+
+    assert NFCProfileManager(store).list_profiles() == ['a', 'b']
+
+
+def test_deleted_file_is_dropped_from_index(store):
+    saved_manager(store, 'a', 'b')
+    os.remove(store.path_for('b'))
+
+    manager = NFCProfileManager(store)
+
+    assert manager.list_profiles() == ['a']
+    assert 'b' not in store.load_index()  # a correção é persistida
+
+
+def test_unchanged_index_is_not_rewritten(store):
+    saved_manager(store, 'a')
+    index_path = os.path.join(store.directory, PROFILES_INDEX_FILE)
+    before = os.stat(index_path).st_mtime_ns
+
+    NFCProfileManager(store).list_profiles()
+
+    assert os.stat(index_path).st_mtime_ns == before
+
+
+def test_corrupt_profile_is_skipped(store):
+    saved_manager(store, 'a')
+    with open(store.path_for('quebrado'), 'w', encoding='utf-8') as f:
+        f.write('{"name": ')
+
+    assert NFCProfileManager(store).list_profiles() == ['a']
+
+
+def test_corrupt_index_is_rebuilt(store):
+    saved_manager(store, 'a', 'b')
+    with open(os.path.join(store.directory, PROFILES_INDEX_FILE), 'w') as f:
+        f.write('não é json')
+
+    assert NFCProfileManager(store).list_profiles() == ['a', 'b']
+
+
+def test_delete_profile_updates_index_and_file(store):
+    manager = saved_manager(store, 'a', 'b')
+
+    assert manager.delete_profile('a')
+    manager.flush_index()
+
+    assert not store.exists('a')
+    assert NFCProfileManager(store).list_profiles() == ['b']
+
+
+def test_legacy_single_file_is_migrated(store):
+    legacy = {name: NFCProfile(name, 'antigo').to_dict() for name in ('x', 'y')}
+    legacy_path = os.path.join(store.app_dir, LEGACY_PROFILES_FILE)
+    with open(legacy_path, 'w', encoding='utf-8') as f:
+        json.dump(legacy, f)
+
+    manager = NFCProfileManager(store)
+
+    assert manager.list_profiles() == ['x', 'y']
+    assert manager.get_profile('x').description == 'antigo'
+    assert not os.path.exists(legacy_path)
+    assert os.path.exists(legacy_path + '.migrated')
@@ -0,0 +1,87 @@
+"""Testes do ProfileStore: um arquivo por perfil, gravação atômica e nomes"""
+
+import os
+
+import pytest
+
+from nfc_writer import NFCProfileManager, NFCRecordType, ProfileStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProfileStore(str(tmp_path / 'profiles'))
+
+
+def test_each_profile_is_its_own_file(store):
+    manager = NFCProfileManager(store)
+    manager.create_profile('Casa')
+    manager.create_profile('Wi-Fi/Escritório')
+
+    files = sorted(os.listdir(store.directory))
+    assert files == ['Casa.json', 'Wi-Fi%2FEscrit%C3%B3rio.json']
+    assert store.names() == ['Casa', 'Wi-Fi/Escritório']
+
+
+def test_saving_one_profile_leaves_the_others_untouched(store):
+    manager = NFCProfileManager(store)
+    manager.create_profile('a')
+    manager.create_profile('b')
+    before = os.stat(store.path_for('a')).st_mtime_ns
+
+    profile = manager.get_profile('b')
+    profile.add_record(NFCRecordType.TEXT, {'text': 'oi'})
+    assert manager.save_profile(profile)
+
+    assert os.stat(store.path_for('a')).st_mtime_ns == before
+    assert store.load('b')['records'][0]['data'] == {'text': 'oi'}
+
+
+def test_dot_named_profile_is_listed(store):
+    manager = NFCProfileManager(store)
+    manager.create_profile('.casa')
+
+    assert '.casa' in store.scan()
+    assert '.casa' in NFCProfileManager(store).list_profiles()
+
+
+def test_atomic_write_temp_files_are_ignored(store):
+    open(os.path.join(store.directory, '.tmp-abc123.part'), 'w').close()
+    open(os.path.join(store.directory, '.tmp-abc123.json.part'), 'w').close()
+    assert store.scan() == {}
+
+
+@pytest.mark.parametrize('name', ['', 'CASA', 'casa'])
+def test_rejects_empty_and_case_only_duplicates(store, name):
+    manager = NFCProfileManager(store)
+    manager.create_profile('Casa')
+
+    with pytest.raises(ValueError):
+        manager.create_profile(name)
+    assert manager.list_profiles() == ['Casa']
+
+
+def test_failed_save_does_not_register_profile(store, monkeypatch):
+    manager = NFCProfileManager(store)
+    manager.list_profiles()
+
+    def fail(name, data):
+        raise OSError('disco cheio')
+    monkeypatch.setattr(store, 'save', fail)
+
+    with pytest.raises(IOError):
+        manager.create_profile('Casa')
+    assert 'Casa' not in manager.profiles
+    assert manager.list_profiles() == []
+
+
+def test_profile_round_trips_with_revision(store):
+    manager = NFCProfileManager(store)
+    profile = manager.create_profile('Casa', 'descrição')
+    profile.add_record(NFCRecordType.URI, {'uri': 'https://example.com'})
+    profile.add_record(NFCRecordType.TEXT, {'text': 'oi'})
+    manager.save_profile(profile)
+
+    loaded = NFCProfileManager(store).get_profile('Casa')
+
+    assert loaded.to_dict() == profile.to_dict()
+    assert loaded.revision == 2
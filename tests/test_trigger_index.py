@@ -0,0 +1,90 @@
+"""Testes do TriggerIndex: UID, hash do payload, MIME e prefixo de URI"""
+
+import pytest
+
+from ndef_codec import (
+    TNF_ABSOLUTE_URI, TNF_WELL_KNOWN, RTD_SMART_POSTER, NdefRecordData,
+    mime_record, serialize_message, text_record, uri_record
+)
+from nfc_automation import AutomationTask, TriggerIndex
+
+
+def task(name, *triggers):
+    automation_task = AutomationTask(name)
+    for kind, data in triggers:
+        automation_task.add_trigger(kind, data)
+    return automation_task
+
+
+@pytest.fixture
+def index():
+    index = TriggerIndex()
+    index.add_task(task('porta', ('tag_uid', {'uid': '04:a1:b2:c3'})))
+    index.add_task(task('carro', ('mime_type', {'mime_type': 'Application/X-Car'})))
+    index.add_task(task('casa', ('uri_prefix', {'prefix': 'https://exemplo.com/casa'})))
+    index.add_task(task('site', ('uri_prefix', {'prefix': 'https://exemplo.com'})))
+    return index
+
+
+def test_uid_is_normalized(index):
+    assert index.match(tag_uid='04A1B2C3') == ['porta']
+    assert index.match(tag_uid='04 a1 b2 c3') == ['porta']
+    assert index.match(tag_uid='04A1B2C4') == []
+
+
+def test_mime_type_is_case_insensitive(index):
+    message = serialize_message([mime_record('application/x-car', b'{}')])
+    assert index.match_message(None, [message]) == ['carro']
+
+
+def test_every_matching_uri_prefix_fires(index):
+    assert sorted(index.match(uris=['https://exemplo.com/casa/sala'])) == ['casa', 'site']
+    assert index.match(uris=['https://exemplo.com/loja']) == ['site']
+    assert index.match(uris=['https://outro.com']) == []
+    assert index.match(uris=['https://']) == []
+
+
+def test_uri_found_in_uri_smart_poster_and_absolute_uri_records(index):
+    poster = NdefRecordData(TNF_WELL_KNOWN, RTD_SMART_POSTER, b'',
+                            serialize_message([uri_record('https://exemplo.com/x'), text_record('t')]))
+    absolute = NdefRecordData(TNF_ABSOLUTE_URI, b'https://exemplo.com/casa', b'', b'')
+
+    assert index.match_message(None, [serialize_message([poster])]) == ['site']
+    assert sorted(index.match_message(None, [serialize_message([absolute])])) == ['casa', 'site']
+
+
+def test_payload_hash_matches_exact_message():
+    message = serialize_message([text_record('chave')])
+    index = TriggerIndex()
+    index.add_task(task('exata', ('payload_hash', {'hash': TriggerIndex.hash_payload(message).upper()})))
+
+    assert index.match_message(None, [message]) == ['exata']
+    assert index.match_message(None, [serialize_message([text_record('outra')])]) == []
+
+
+def test_task_matching_several_ways_is_returned_once(index):
+    index.add_task(task('tudo', ('tag_uid', {'uid': '01'}), ('uri_prefix', {'prefix': 'https://'})))
+    message = serialize_message([uri_record('https://exemplo.com/casa')])
+
+    names = index.match_message('01', [message, message])
+
+    assert names.count('tudo') == 1
+    assert sorted(names) == ['casa', 'site', 'tudo']
+
+
+def test_remove_task_drops_all_its_entries(index):
+    assert len(index) == 4
+    index.remove_task('casa')
+
+    assert index.match(uris=['https://exemplo.com/casa']) == ['site']
+    assert len(index) == 3
+
+
+def test_invalid_message_only_matches_uid_and_hash(index):
+    assert index.match_message('04A1B2C3', [b'\xff\x01']) == ['porta']
+
+
+def test_unknown_or_empty_triggers_are_ignored():
+    index = TriggerIndex()
+    index.add_task(task('x', ('tempo', {'cron': '* * * * *'}), ('tag_uid', {'uid': ''})))
+    assert len(index) == 0
@@ -0,0 +1,209 @@
+"""
+📜 UI Lists Module - Listas Virtualizadas da Interface
+======================================================
+
+Linhas recicláveis (RecycleView) usadas pelas listas de histórico, perfis e
+regras de automação. Importado sob demanda pelas abas que usam listas, para
+não pesar na abertura do app.
+"""
+
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.button import Button
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.metrics import dp
+
+
+PROFILE_TYPE_ICONS = {
+    'wifi': '📶',
+    'vcard': '👤',
+    'url': '🌐',
+    'email': '📧',
+    'phone': '📞',
+    'sms': '💬',
+    'location': '📍',
+    'calendar': '📅',
+    'app': '📱',
+    'text': '📝'
+}
+
+HISTORY_PAGE_SIZE = 200  # Leituras carregadas por vez no popup de histórico
+
+
+def build_recycle_list(viewclass, row_height, spacing=0, **kwargs):
+    """Cria lista virtualizada: só as linhas visíveis existem como widgets"""
+    recycle_view = RecycleView(**kwargs)
+    layout = RecycleBoxLayout(
+        orientation='vertical',
+        default_size=(None, row_height),
+        default_size_hint=(1, None),
+        size_hint_y=None,
+        spacing=spacing
+    )
+    layout.bind(minimum_height=layout.setter('height'))
+    recycle_view.add_widget(layout)
+    recycle_view.viewclass = viewclass
+    return recycle_view
+
+
+def show_list_or_empty(holder, list_view, empty_label, is_empty):
+    """Alterna entre a lista e o aviso de lista vazia sem recriar widgets"""
+    target = empty_label if is_empty else list_view
+    if target.parent is not holder:
+        holder.clear_widgets()
+        holder.add_widget(target)
+
+
+class HistoryRow(RecycleDataViewBehavior, BoxLayout):
+    """Linha reciclável do histórico de leituras"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.padding = (dp(5), dp(2))
+        
+        self.title_label = Label(font_size='13sp', bold=True, halign='left')
+        self.type_label = Label(font_size='12sp', color=(0.4, 0.4, 0.4, 1), halign='left')
+        self.content_label = Label(font_size='12sp', halign='left', shorten=True)
+        
+        for label in (self.title_label, self.type_label, self.content_label):
+            label.bind(size=label.setter('text_size'))
+            self.add_widget(label)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.title_label.text = f"📌 #{index + 1} - {data['timestamp']}"
+        self.type_label.text = f"🏷️ {data['type']}"
+        self.content_label.text = f"📝 {data['content']}"
+
+
+class ProfileRow(RecycleDataViewBehavior, BoxLayout):
+    """Linha reciclável da lista de perfis"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.spacing = dp(5)
+        self.owner = None
+        self.profile = None
+        
+        # Card do perfil
+        card = BoxLayout(orientation='horizontal', padding=dp(10), spacing=dp(10))
+        
+        self.icon_label = Label(font_size='24sp', size_hint_x=None, width=dp(40))
+        
+        # Informações do perfil
+        info_layout = BoxLayout(orientation='vertical', spacing=dp(2))
+        
+        self.name_label = Label(font_size='16sp', bold=True, halign='left',
+                                size_hint_y=None, height=dp(25))
+        self.desc_label = Label(font_size='12sp', color=(0.6, 0.6, 0.6, 1), halign='left',
+                                size_hint_y=None, height=dp(20))
+        self.stats_label = Label(font_size='10sp', color=(0.5, 0.5, 0.5, 1), halign='left',
+                                 size_hint_y=None, height=dp(15))
+        
+        for label in (self.name_label, self.desc_label, self.stats_label):
+            label.bind(size=label.setter('text_size'))
+            info_layout.add_widget(label)
+        
+        # Botões de ação
+        actions_layout = BoxLayout(orientation='vertical', size_hint_x=None, width=dp(80), spacing=dp(3))
+        
+        use_btn = Button(text='▶️', font_size='14sp', size_hint_y=None, height=dp(30),
+                         background_color=(0.2, 0.8, 0.2, 1))
+        use_btn.bind(on_press=lambda x: self.owner._use_profile(self.profile))
+        
+        edit_btn = Button(text='✏️', font_size='14sp', size_hint_y=None, height=dp(30),
+                          background_color=(0.2, 0.6, 1, 1))
+        edit_btn.bind(on_press=lambda x: self.owner._edit_profile(self.profile))
+        
+        delete_btn = Button(text='🗑️', font_size='14sp', size_hint_y=None, height=dp(30),
+                            background_color=(0.9, 0.3, 0.3, 1))
+        delete_btn.bind(on_press=lambda x: self.owner._delete_profile(self.profile))
+        
+        actions_layout.add_widget(use_btn)
+        actions_layout.add_widget(edit_btn)
+        actions_layout.add_widget(delete_btn)
+        
+        card.add_widget(self.icon_label)
+        card.add_widget(info_layout)
+        card.add_widget(actions_layout)
+        self.add_widget(card)
+        
+        # Linha separadora
+        self.add_widget(Label(text='─' * 50, size_hint_y=None, height=dp(10),
+                              color=(0.8, 0.8, 0.8, 1)))
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.owner = data['owner']
+        self.profile = data['profile']
+        self.icon_label.text = data['icon']
+        self.name_label.text = data['name']
+        self.desc_label.text = data['description']
+        self.stats_label.text = data['stats']
+
+
+class RuleRow(RecycleDataViewBehavior, BoxLayout):
+    """Linha reciclável da lista de regras de automação"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'horizontal'
+        self.padding = dp(5)
+        self.spacing = dp(10)
+        self.owner = None
+        self.rule = None
+        
+        # Status da regra
+        self.status_label = Label(font_size='16sp', size_hint_x=None, width=dp(30))
+        
+        # Informações da regra
+        info_layout = BoxLayout(orientation='vertical', spacing=dp(2))
+        
+        self.name_label = Label(font_size='14sp', bold=True, halign='left',
+                                size_hint_y=None, height=dp(20))
+        self.trigger_label = Label(font_size='11sp', color=(0.6, 0.6, 0.6, 1), halign='left',
+                                   size_hint_y=None, height=dp(18))
+        self.actions_label = Label(font_size='10sp', color=(0.5, 0.5, 0.5, 1), halign='left',
+                                   size_hint_y=None, height=dp(16))
+        self.uses_label = Label(font_size='9sp', color=(0.4, 0.4, 0.4, 1), halign='left',
+                                size_hint_y=None, height=dp(14))
+        
+        for label in (self.name_label, self.trigger_label, self.actions_label, self.uses_label):
+            label.bind(size=label.setter('text_size'))
+            info_layout.add_widget(label)
+        
+        # Botões de ação
+        actions_layout = BoxLayout(orientation='horizontal', size_hint_x=None, width=dp(120), spacing=dp(3))
+        
+        self.toggle_btn = Button(font_size='12sp', size_hint_x=None, width=dp(35))
+        self.toggle_btn.bind(on_press=lambda x: self.owner._toggle_rule(self.rule))
+        
+        edit_btn = Button(text='✏️', font_size='12sp', size_hint_x=None, width=dp(35),
+                          background_color=(0.2, 0.6, 1, 1))
+        edit_btn.bind(on_press=lambda x: self.owner._edit_rule(self.rule))
+        
+        delete_btn = Button(text='🗑️', font_size='12sp', size_hint_x=None, width=dp(35),
+                            background_color=(0.9, 0.3, 0.3, 1))
+        delete_btn.bind(on_press=lambda x: self.owner._delete_rule(self.rule))
+        
+        actions_layout.add_widget(self.toggle_btn)
+        actions_layout.add_widget(edit_btn)
+        actions_layout.add_widget(delete_btn)
+        
+        self.add_widget(self.status_label)
+        self.add_widget(info_layout)
+        self.add_widget(actions_layout)
+    
+    def refresh_view_attrs(self, rv, index, data):
+        self.owner = data['owner']
+        self.rule = data['rule']
+        active = data['active']
+        self.status_label.text = '✅' if active else '⏸️'
+        self.name_label.text = data['name']
+        self.trigger_label.text = data['trigger']
+        self.actions_label.text = data['actions']
+        self.uses_label.text = data['uses']
+        self.toggle_btn.text = '⏸️' if active else '▶️'
+        self.toggle_btn.background_color = (0.9, 0.7, 0.2, 1) if active else (0.2, 0.8, 0.2, 1)
@@ -5,11 +5,21 @@
 Funções auxiliares e utilitários para o aplicativo NFC Reader.
 """
 
+import csv
+import functools
+import hashlib
+import io
+import itertools
 import json
+import math
 import os
 import logging
-from datetime import datetime
-from typing import Dict, List, Any, Optional
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator
 
 
 class FileManager:
@@ -30,14 +40,33 @@ class FileManager:
             app_dir = FileManager.ensure_app_directory()
             filepath = os.path.join(app_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
+            FileManager.write_atomic(filepath, json.dumps(data, ensure_ascii=False, indent=2))
             return True
         except Exception as e:
             logging.error(f"Erro ao salvar {filename}: {e}")
             return False
     
+    @staticmethod
+    def write_atomic(filepath: str, content: str):
+        """Grava arquivo de forma atômica (arquivo temporário + rename)
+        
+        Um crash durante a gravação deixa o arquivo anterior intacto.
+        """
+        directory = os.path.dirname(filepath) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.part')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+    
     @staticmethod
     def load_json(filename: str) -> Optional[Dict]:
         """Carrega dados de arquivo JSON"""
@@ -56,31 +85,246 @@ class FileManager:
             return None
     
     @staticmethod
-    def export_history_csv(history: List[Dict], filename: str) -> bool:
+    def export_history_csv(history: Iterable[Dict], filename: str) -> bool:
         """Exporta histórico para CSV"""
         try:
             app_dir = FileManager.ensure_app_directory()
             filepath = os.path.join(app_dir, filename)
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                # Cabeçalho
-                f.write("Timestamp,Tipo,Conteudo,Dados_Brutos\n")
-                
-                # Dados
-                for entry in history:
-                    timestamp = entry.get('timestamp', '')
-                    entry_type = entry.get('type', '')
-                    content = entry.get('content', '').replace('"', '""')  # Escape aspas
-                    raw_data = entry.get('raw_data', '')
-                    
-                    f.write(f'"{timestamp}","{entry_type}","{content}","{raw_data}"\n')
-            
+            HistoryExporter(include_raw_data=True).export(history, filepath, 'CSV')
             return True
         except Exception as e:
             logging.error(f"Erro ao exportar CSV: {e}")
             return False
 
 
+class ExportJob:
+    """Exportação em andamento numa thread de fundo"""
+    
+    def __init__(self, filepath: str):
+        self.filepath = filepath
+        self.rows = 0
+        self.error = None
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self.thread = None
+    
+    def cancel(self):
+        """Interrompe a exportação (o arquivo de destino não é criado)"""
+        self._cancel_event.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+    
+    @property
+    def done(self) -> bool:
+        return self._done_event.is_set()
+    
+    @property
+    def success(self) -> bool:
+        return self.done and self.error is None and not self.cancelled
+    
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Aguarda o término; retorna True se concluiu com sucesso"""
+        self._done_event.wait(timeout)
+        return self.success
+
+
+class HistoryExporter:
+    """Exportação do histórico em fluxo contínuo (CSV, JSON Lines, JSON e TXT)
+    
+    Consome qualquer iterável de leituras (ex.: HistoryStore.iter_all) e grava
+    em blocos de `chunk_size` linhas, opcionalmente em gzip: a memória usada
+    não depende do tamanho do histórico. O arquivo final só aparece quando a
+    exportação termina (gravação atômica).
+    """
+    
+    FORMATS = ('CSV', 'JSONL', 'JSON', 'TXT')
+    EXTENSIONS = {'CSV': '.csv', 'JSONL': '.jsonl', 'JSON': '.json', 'TXT': '.txt'}
+    HEADERS = {
+        'timestamp': 'Timestamp',
+        'type': 'Tipo',
+        'content': 'Conteudo',
+        'raw_data': 'Dados_Brutos',
+        'tag_uid': 'UID_Tag',
+    }
+    
+    def __init__(self, chunk_size: Optional[int] = None, include_timestamp: Optional[bool] = None,
+                 include_raw_data: Optional[bool] = None):
+        export_config = {}
+        try:
+            from config import get_config
+            export_config = get_config('export')
+        except ImportError:
+            pass
+        
+        self.chunk_size = max(1, chunk_size or export_config.get('chunk_size', 500))
+        if include_timestamp is None:
+            include_timestamp = export_config.get('include_timestamp', True)
+        if include_raw_data is None:
+            include_raw_data = export_config.get('include_raw_data', False)
+        
+        self.fields = [
+            field for field in ('timestamp', 'type', 'content', 'raw_data', 'tag_uid')
+            if (field != 'timestamp' or include_timestamp) and (field != 'raw_data' or include_raw_data)
+        ]
+    
+    @classmethod
+    def filename_for(cls, basename: str, fmt: str, compress: bool = False) -> str:
+        """Nome de arquivo com a extensão do formato (e .gz se comprimido)"""
+        return basename + cls.EXTENSIONS[fmt.upper()] + ('.gz' if compress else '')
+    
+    def export(self, readings: Iterable[Dict], filepath: str, fmt: str = 'CSV',
+               compress: bool = False, total: Optional[int] = None,
+               progress: Optional[Callable[[int, Optional[int]], None]] = None,
+               cancel_event: Optional[threading.Event] = None) -> int:
+        """Exporta as leituras e retorna quantas foram gravadas
+        
+        progress(gravadas, total) é chamado a cada bloco. Com cancel_event
+        sinalizado, a exportação para e o destino não é alterado.
+        """
+        fmt = fmt.upper()
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Formato de exportação não suportado: {fmt}")
+        
+        directory = os.path.dirname(filepath) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.part')
+        rows = 0
+        try:
+            with _ExportFile(fd, compress) as out:
+                buffer = io.StringIO()
+                writer = self._begin(fmt, buffer)
+                pending = 0
+                
+                for reading in readings:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise InterruptedError("Exportação cancelada")
+                    
+                    writer(reading, rows)
+                    rows += 1
+                    pending += 1
+                    if pending >= self.chunk_size:
+                        out.write(buffer.getvalue())
+                        buffer.seek(0)
+                        buffer.truncate()
+                        pending = 0
+                        if progress:
+                            progress(rows, total)
+                
+                if fmt == 'JSON':
+                    buffer.write('\n]\n' if rows else ']\n')
+                out.write(buffer.getvalue())
+                out.finish()
+            
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            raise
+        
+        if progress:
+            progress(rows, total)
+        return rows
+    
+    def export_async(self, readings: Iterable[Dict], filepath: str, fmt: str = 'CSV',
+                     compress: bool = False, total: Optional[int] = None,
+                     progress: Optional[Callable[[int, Optional[int]], None]] = None,
+                     on_complete: Optional[Callable[[ExportJob], None]] = None) -> ExportJob:
+        """Exporta numa thread de fundo e retorna imediatamente
+        
+        Os callbacks rodam na thread da exportação; na UI, repasse-os via Clock.
+        """
+        job = ExportJob(filepath)
+        
+        def run():
+            try:
+                job.rows = self.export(
+                    readings, filepath, fmt, compress, total,
+                    progress=progress, cancel_event=job._cancel_event
+                )
+            except InterruptedError:
+                logging.info(f"Exportação cancelada: {filepath}")
+            except Exception as e:
+                job.error = e
+                logging.error(f"Erro ao exportar histórico: {e}")
+            finally:
+                job._done_event.set()
+                if on_complete:
+                    try:
+                        on_complete(job)
+                    except Exception as e:
+                        logging.error(f"Erro no callback de exportação: {e}")
+        
+        job.thread = threading.Thread(target=run, name='history-export', daemon=True)
+        job.thread.start()
+        return job
+    
+    def _begin(self, fmt: str, buffer: io.StringIO) -> Callable[[Dict, int], None]:
+        """Escreve o cabeçalho do formato e retorna o escritor de uma leitura"""
+        fields = self.fields
+        
+        if fmt == 'CSV':
+            writer = csv.writer(buffer, lineterminator='\n')
+            writer.writerow([self.HEADERS[field] for field in fields])
+            return lambda reading, index: writer.writerow(
+                ['' if reading.get(field) is None else reading.get(field) for field in fields]
+            )
+        
+        if fmt == 'JSONL':
+            return lambda reading, index: buffer.write(json.dumps(
+                {field: reading.get(field) for field in fields}, ensure_ascii=False
+            ) + '\n')
+        
+        if fmt == 'JSON':
+            buffer.write('[')
+            return lambda reading, index: buffer.write(('\n  ' if index == 0 else ',\n  ') + json.dumps(
+                {field: reading.get(field) for field in fields}, ensure_ascii=False
+            ))
+        
+        def write_txt(reading, index):
+            header = f"[{reading.get('timestamp', '')}] " if 'timestamp' in fields else ''
+            uid = f" (UID {reading['tag_uid']})" if 'tag_uid' in fields and reading.get('tag_uid') else ''
+            content = str(reading.get('content') or '').replace('\n', '\n    ')
+            buffer.write(f"{header}{reading.get('type', '')}{uid}: {content}\n")
+            if 'raw_data' in fields and reading.get('raw_data'):
+                raw_data = str(reading['raw_data']).replace('\n', '\n    ')
+                buffer.write(f"    Dados brutos: {raw_data}\n")
+        return write_txt
+
+
+class _ExportFile:
+    """Destino binário da exportação sobre o descritor temporário (gzip opcional)"""
+    
+    def __init__(self, fd: int, compress: bool):
+        self.raw = os.fdopen(fd, 'wb')
+        self.gzip = None
+        if compress:
+            import gzip
+            self.gzip = gzip.GzipFile(fileobj=self.raw, mode='wb')
+        self.target = self.gzip or self.raw
+    
+    def write(self, text: str):
+        self.target.write(text.encode('utf-8'))
+    
+    def finish(self):
+        """Grava o rodapé gzip (se houver) e sincroniza com o disco"""
+        if self.gzip is not None:
+            self.gzip.close()  # não fecha o arquivo subjacente
+        self.raw.flush()
+        os.fsync(self.raw.fileno())
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        if self.gzip is not None:
+            self.gzip.close()
+        self.raw.close()
+
+
 class DataValidator:
     """Validador de dados NFC"""
     
@@ -133,7 +377,15 @@ class DataValidator:
 
 
 class HexFormatter:
-    """Formatador de dados hexadecimais"""
+    """Formatador de dados hexadecimais
+    
+    O hexdump é gerado linha a linha sobre fatias de memoryview: uma página
+    (ou a janela visível) de um dump grande é formatada sem montar a string
+    do payload inteiro.
+    """
+    
+    # Tabela de tradução: imprimíveis ficam, os demais viram '.'
+    ASCII_TABLE = bytes(byte if 32 <= byte <= 126 else 0x2E for byte in range(256))
     
     @staticmethod
     def format_hex(data: bytes, group_size: int = 2, groups_per_line: int = 8) -> str:
@@ -141,126 +393,502 @@ class HexFormatter:
         if not data:
             return ""
         
-        hex_string = data.hex().upper()
-        
-        # Agrupa em pares
-        groups = [hex_string[i:i+group_size*2] for i in range(0, len(hex_string), group_size*2)]
-        
-        # Organiza em linhas
-        lines = []
-        for i in range(0, len(groups), groups_per_line):
-            line_groups = groups[i:i+groups_per_line]
-            lines.append(' '.join(line_groups))
-        
-        return '\n'.join(lines)
+        view = memoryview(data).cast('B')
+        line_size = group_size * groups_per_line
+        return '\n'.join(
+            view[offset:offset + line_size].hex(' ', -group_size).upper()
+            for offset in range(0, len(view), line_size)
+        )
     
     @staticmethod
     def hex_to_ascii(data: bytes) -> str:
         """Converte hex para ASCII legível"""
         try:
-            ascii_chars = []
-            for byte in data:
-                if 32 <= byte <= 126:  # Caracteres imprimíveis
-                    ascii_chars.append(chr(byte))
-                else:
-                    ascii_chars.append('.')
-            return ''.join(ascii_chars)
-        except:
+            return bytes(data).translate(HexFormatter.ASCII_TABLE).decode('ascii')
+        except (TypeError, ValueError):
             return ""
+    
+    @staticmethod
+    def iter_hexdump(data: bytes, bytes_per_line: int = 16, start_line: int = 0,
+                     max_lines: Optional[int] = None) -> Iterator[str]:
+        """Gera as linhas do hexdump (offset | hex | ASCII) sob demanda
+        
+            00000010  48 65 6C 6C 6F 20 4E 46  43 00 01 02 03 04 05 06  |Hello NFC.......|
+        """
+        view = memoryview(data).cast('B')
+        size = len(view)
+        half = bytes_per_line // 2
+        hex_width = bytes_per_line * 3 - 1 + (1 if half else 0)
+        offset_width = max(8, len(f"{max(size - 1, 0):X}"))
+        table = HexFormatter.ASCII_TABLE
+        
+        offset = start_line * bytes_per_line
+        stop = size if max_lines is None else min(size, offset + max_lines * bytes_per_line)
+        while offset < stop:
+            chunk = view[offset:offset + bytes_per_line]
+            if half and len(chunk) > half:
+                hex_part = chunk[:half].hex(' ') + '  ' + chunk[half:].hex(' ')
+            else:
+                hex_part = chunk.hex(' ')
+            ascii_part = chunk.tobytes().translate(table).decode('ascii')
+            yield f"{offset:0{offset_width}X}  {hex_part.upper():<{hex_width}}  |{ascii_part}|"
+            offset += bytes_per_line
+    
+    @staticmethod
+    def page_count(size: int, lines_per_page: int = 32, bytes_per_line: int = 16) -> int:
+        """Número de páginas do hexdump (mínimo 1)"""
+        lines = -(-size // bytes_per_line)
+        return max(1, -(-lines // lines_per_page))
+    
+    @staticmethod
+    def hexdump_page(data: bytes, page: int = 0, lines_per_page: int = 32,
+                     bytes_per_line: int = 16) -> str:
+        """Texto de uma única página do hexdump"""
+        return '\n'.join(HexFormatter.iter_hexdump(
+            data, bytes_per_line, page * lines_per_page, lines_per_page
+        ))
+
+
+class LatencyHistogram:
+    """Histograma de latências com buckets logarítmicos e memória fixa
+    
+    Cada potência de 2 (de ~0,1 µs a ~18 min) é dividida em 8 buckets, então
+    os percentis têm erro relativo de no máximo 12,5%, qualquer que seja o
+    número de amostras.
+    """
+    
+    SUB_BITS = 3                        # 2^3 = 8 buckets por potência de 2
+    MIN_OCTAVE = 7                      # 2^7 ns ≈ 0,1 µs
+    MAX_OCTAVE = 40                     # 2^40 ns ≈ 18 min
+    BUCKETS = (MAX_OCTAVE - MIN_OCTAVE + 1) << SUB_BITS
+    
+    __slots__ = ('counts', 'count', 'total_ns', 'min_ns', 'max_ns')
+    
+    def __init__(self):
+        self.counts = [0] * (self.BUCKETS + 2)  # + abaixo do mínimo e acima do máximo
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+    
+    @classmethod
+    def bucket_index(cls, ns: int) -> int:
+        octave = ns.bit_length() - 1
+        if octave < cls.MIN_OCTAVE:
+            return 0
+        if octave > cls.MAX_OCTAVE:
+            return cls.BUCKETS + 1
+        sub = (ns >> (octave - cls.SUB_BITS)) & ((1 << cls.SUB_BITS) - 1)
+        return ((octave - cls.MIN_OCTAVE) << cls.SUB_BITS) + sub + 1
+    
+    @classmethod
+    def bucket_upper_ns(cls, index: int) -> int:
+        """Limite superior (exclusivo) do bucket"""
+        if index == 0:
+            return 1 << cls.MIN_OCTAVE
+        if index > cls.BUCKETS:
+            return 1 << (cls.MAX_OCTAVE + 1)
+        octave, sub = divmod(index - 1, 1 << cls.SUB_BITS)
+        octave += cls.MIN_OCTAVE
+        return ((1 << cls.SUB_BITS) + sub + 1) << (octave - cls.SUB_BITS)
+    
+    def record(self, ns: int):
+        self.counts[self.bucket_index(ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+    
+    def percentile(self, q: float) -> Optional[int]:
+        """Percentil (0-100) em ns, limitado ao mínimo e máximo observados"""
+        if not self.count:
+            return None
+        rank = max(1, -(-self.count * q // 100))  # ceil
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(max(self.bucket_upper_ns(index), self.min_ns), self.max_ns)
+        return self.max_ns
 
 
 class PerformanceMonitor:
-    """Monitor de performance"""
+    """Monitor de performance
+    
+    Usa o relógio monotônico (perf_counter_ns) e guarda cada operação num
+    histograma de tamanho fixo, então pode ficar ativo em produção. Seguro
+    para uso entre threads: cada timer iniciado recebe um token próprio.
+    
+        token = performance_monitor.start_timer('nfc.decode')
+        ...
+        performance_monitor.end_timer(token)
+        
+        with performance_monitor.measure('history.query'):
+            ...
+        
+        @performance_monitor.timed('export.csv')
+        def exportar(...): ...
+    """
+    
+    PERCENTILES = (50, 95, 99)
+    MAX_ACTIVE_TIMERS = 1024  # timers nunca finalizados: os mais antigos são descartados
     
     def __init__(self):
-        self.start_times = {}
-        self.metrics = {}
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._active = OrderedDict()  # token -> (operação, início em ns), em ordem de início
+        self._tokens = itertools.count(1)
+        self.dropped_timers = 0
     
-    def start_timer(self, operation: str):
-        """Inicia timer para uma operação"""
-        self.start_times[operation] = datetime.now()
+    def start_timer(self, operation: str) -> int:
+        """Inicia timer para uma operação e retorna seu token"""
+        token = next(self._tokens)
+        with self._lock:
+            self._active[token] = (operation, time.perf_counter_ns())
+            while len(self._active) > self.MAX_ACTIVE_TIMERS:
+                self._active.popitem(last=False)
+                self.dropped_timers += 1
+        return token
     
-    def end_timer(self, operation: str):
-        """Finaliza timer e registra métrica"""
-        if operation in self.start_times:
-            duration = (datetime.now() - self.start_times[operation]).total_seconds()
-            
-            if operation not in self.metrics:
-                self.metrics[operation] = []
-            
-            self.metrics[operation].append(duration)
-            del self.start_times[operation]
+    def end_timer(self, token) -> Optional[float]:
+        """Finaliza timer (pelo token ou, por compatibilidade, pelo nome) e registra métrica"""
+        end = time.perf_counter_ns()
+        with self._lock:
+            if isinstance(token, str):
+                token = self._latest_token(token)
+            timer = self._active.pop(token, None)
+        if timer is None:
+            return None
+        
+        operation, start = timer
+        self.record_ns(operation, end - start)
+        return (end - start) / 1e9
+    
+    def record(self, operation: str, duration: float):
+        """Registra diretamente a duração (segundos) de uma operação"""
+        self.record_ns(operation, int(duration * 1e9))
+    
+    def record_ns(self, operation: str, duration_ns: int):
+        """Registra diretamente a duração (ns) de uma operação"""
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram is None:
+                histogram = self._histograms[operation] = LatencyHistogram()
+            histogram.record(max(0, duration_ns))
+    
+    @contextmanager
+    def measure(self, operation: str):
+        """Context manager que mede o bloco (registra mesmo se houver exceção)"""
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_ns(operation, time.perf_counter_ns() - start)
+    
+    def timed(self, operation=None):
+        """Decorador que mede cada chamada (@timed ou @timed('nome'))"""
+        def decorate(func):
+            name = operation or f"{func.__module__}.{func.__qualname__}"
             
-            return duration
-        return None
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter_ns()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record_ns(name, time.perf_counter_ns() - start)
+            return wrapper
+        
+        if callable(operation):
+            func, operation = operation, None
+            return decorate(func)
+        return decorate
     
     def get_average_time(self, operation: str) -> Optional[float]:
         """Obtém tempo médio de uma operação"""
-        if operation in self.metrics and self.metrics[operation]:
-            return sum(self.metrics[operation]) / len(self.metrics[operation])
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            if histogram and histogram.count:
+                return histogram.total_ns / histogram.count / 1e9
         return None
     
+    def get_percentile(self, operation: str, q: float) -> Optional[float]:
+        """Percentil (0-100) da duração de uma operação, em segundos"""
+        with self._lock:
+            histogram = self._histograms.get(operation)
+            value = histogram.percentile(q) if histogram else None
+        return None if value is None else value / 1e9
+    
     def get_stats(self) -> Dict[str, Dict[str, float]]:
-        """Obtém estatísticas completas"""
+        """Obtém estatísticas completas (em segundos)"""
         stats = {}
-        for operation, times in self.metrics.items():
-            if times:
+        with self._lock:
+            for operation, histogram in self._histograms.items():
+                if not histogram.count:
+                    continue
                 stats[operation] = {
-                    'count': len(times),
-                    'average': sum(times) / len(times),
-                    'min': min(times),
-                    'max': max(times),
-                    'total': sum(times)
+                    'count': histogram.count,
+                    'average': histogram.total_ns / histogram.count / 1e9,
+                    'min': histogram.min_ns / 1e9,
+                    'max': histogram.max_ns / 1e9,
+                    'total': histogram.total_ns / 1e9,
                 }
+                for q in self.PERCENTILES:
+                    stats[operation][f'p{q}'] = histogram.percentile(q) / 1e9
         return stats
+    
+    def reset(self, operation: Optional[str] = None):
+        """Descarta as métricas (todas ou de uma operação)"""
+        with self._lock:
+            if operation is None:
+                self._histograms.clear()
+            else:
+                self._histograms.pop(operation, None)
+    
+    def _latest_token(self, operation: str) -> Optional[int]:
+        """Token mais recente ainda ativo para a operação (chamar com o lock)"""
+        for token, (name, _) in reversed(self._active.items()):
+            if name == operation:
+                return token
+        return None
+
+
+class _NullSpan:
+    """Span inativo (tracer desligado): custo de uma chamada vazia"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'start_ns')
+    
+    def __init__(self, tracer: 'SpanTracer', name: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.start_ns = 0
+    
+    def __enter__(self):
+        self.start_ns = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.complete(self.name, self.start_ns, time.perf_counter_ns(), **self.args)
+        return False
+
+
+class SpanTracer:
+    """Tracing por spans, exportável no formato Chrome trace-event (chrome://tracing, Perfetto)
+    
+    Desligado por padrão: span() devolve um contexto vazio. Ligado, cada span
+    vira um evento completo ('X') num buffer circular de `max_events` e sua
+    duração também vai para o PerformanceMonitor (percentis por etapa).
+    
+        with tracer.span('nfc.decode_message', records=3):
+            ...
+    """
+    
+    def __init__(self, max_events: int = 20000, monitor: Optional['PerformanceMonitor'] = None):
+        self.enabled = False
+        self.monitor = monitor
+        self.events = deque(maxlen=max_events)
+        self.pid = os.getpid()
+    
+    def enable(self):
+        self.enabled = True
+    
+    def disable(self):
+        self.enabled = False
+    
+    @staticmethod
+    def now() -> int:
+        """Instante atual (ns, relógio monotônico) para spans entre threads/quadros"""
+        return time.perf_counter_ns()
+    
+    def span(self, name: str, **args):
+        """Mede o bloco como um span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+    
+    def complete(self, name: str, start_ns: int, end_ns: Optional[int] = None, **args):
+        """Registra um span já medido (ex.: da chegada da intent até o próximo quadro)"""
+        if not self.enabled:
+            return
+        if end_ns is None:
+            end_ns = time.perf_counter_ns()
+        
+        self.events.append({
+            'name': name,
+            'cat': name.split('.', 1)[0],
+            'ph': 'X',
+            'ts': start_ns / 1000,
+            'dur': (end_ns - start_ns) / 1000,
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+            'args': args
+        })
+        if self.monitor is not None:
+            self.monitor.record_ns(name, end_ns - start_ns)
+    
+    def instant(self, name: str, **args):
+        """Registra um evento pontual"""
+        if not self.enabled:
+            return
+        self.events.append({
+            'name': name,
+            'cat': name.split('.', 1)[0],
+            'ph': 'i',
+            's': 't',
+            'ts': time.perf_counter_ns() / 1000,
+            'pid': self.pid,
+            'tid': threading.get_ident(),
+            'args': args
+        })
+    
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Eventos no formato JSON do Chrome trace-event"""
+        events = list(self.events)
+        thread_names = [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': thread.ident,
+             'args': {'name': thread.name}}
+            for thread in threading.enumerate()
+        ]
+        return {'traceEvents': thread_names + events, 'displayTimeUnit': 'ms'}
+    
+    def export_chrome_trace(self, filepath: str) -> int:
+        """Grava o trace (abrir em chrome://tracing ou ui.perfetto.dev); retorna nº de eventos"""
+        trace = self.to_chrome_trace()
+        FileManager.write_atomic(filepath, json.dumps(trace))
+        return len(self.events)
+    
+    def clear(self):
+        self.events.clear()
+
+
+def _load_numpy():
+    """NumPy, se instalado (opcional: acelera ByteAnalyzer.analyze_many)"""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+            _numpy = numpy
+        except ImportError:
+            _numpy = False
+    return _numpy or None
+
+
+_numpy = None
 
 
 class ByteAnalyzer:
-    """Analisador de dados em bytes"""
+    """Analisador de dados em bytes
+    
+    Tudo é derivado de um único histograma de bytes por payload (Counter, ou
+    NumPy bincount em lote quando disponível): proporção de imprimíveis,
+    nulos e entropia de Shannon em bits por byte (0 a 8).
+    """
+    
+    PRINTABLE = range(32, 127)  # ASCII imprimível
+    BATCH_SIZE = 4096           # payloads por lote no caminho NumPy
+    
+    @staticmethod
+    def byte_histogram(payload: bytes) -> List[int]:
+        """Contagem de cada valor de byte (256 posições)"""
+        counts = Counter(payload)
+        return [counts.get(value, 0) for value in range(256)]
+    
+    @staticmethod
+    def shannon_entropy(counts: Iterable[int], size: int) -> float:
+        """Entropia de Shannon (bits por byte) a partir das contagens"""
+        if size <= 0:
+            return 0.0
+        # H = log2(n) - (1/n) * Σ c·log2(c)
+        weighted = sum(count * math.log2(count) for count in counts if count)
+        return max(0.0, math.log2(size) - weighted / size)
     
     @staticmethod
     def analyze_payload(payload: bytes) -> Dict[str, Any]:
         """Analisa payload e retorna informações detalhadas"""
-        analysis = {
-            'size': len(payload),
-            'is_text': False,
-            'is_binary': False,
-            'has_nulls': False,
-            'printable_ratio': 0.0,
-            'entropy': 0.0,
-            'patterns': []
-        }
-        
-        if not payload:
-            return analysis
+        size = len(payload)
+        if not size:
+            return ByteAnalyzer._build_analysis(payload, 0, 0, 0, 0.0)
         
-        # Análise de caracteres
-        printable_count = 0
-        null_count = 0
-        
-        for byte in payload:
-            if 32 <= byte <= 126:  # ASCII imprimível
-                printable_count += 1
-            elif byte == 0:
-                null_count += 1
+        counts = Counter(payload)
+        printable_count = sum(counts.get(value, 0) for value in ByteAnalyzer.PRINTABLE)
+        entropy = ByteAnalyzer.shannon_entropy(counts.values(), size)
+        return ByteAnalyzer._build_analysis(payload, size, printable_count, counts.get(0, 0), entropy)
+    
+    @staticmethod
+    def analyze_many(payloads: Iterable[bytes]) -> List[Dict[str, Any]]:
+        """Analisa muitos payloads de uma vez (ex.: dumps de tags)
         
-        analysis['printable_ratio'] = printable_count / len(payload)
-        analysis['has_nulls'] = null_count > 0
-        analysis['is_text'] = analysis['printable_ratio'] > 0.7
-        analysis['is_binary'] = analysis['printable_ratio'] < 0.3
+        Com NumPy, o histograma de cada payload sai de um bincount e a
+        entropia é calculada para o lote inteiro de uma vez; sem NumPy, cada
+        payload é analisado em uma passada.
+        """
+        payloads = [bytes(payload) for payload in payloads]
+        np = _load_numpy()
+        if np is None:
+            return [ByteAnalyzer.analyze_payload(payload) for payload in payloads]
         
-        # Análise de entropia (simplicado)
-        byte_counts = {}
-        for byte in payload:
-            byte_counts[byte] = byte_counts.get(byte, 0) + 1
+        results = []
+        for offset in range(0, len(payloads), ByteAnalyzer.BATCH_SIZE):
+            results.extend(ByteAnalyzer._analyze_batch_numpy(
+                np, payloads[offset:offset + ByteAnalyzer.BATCH_SIZE]
+            ))
+        return results
+    
+    @staticmethod
+    def _analyze_batch_numpy(np, payloads: List[bytes]) -> List[Dict[str, Any]]:
+        sizes = np.fromiter((len(payload) for payload in payloads), dtype=np.int64, count=len(payloads))
+        # Um bincount por payload (sem cópia: frombuffer) e contas vetorizadas no lote
+        histograms = np.stack([
+            np.bincount(np.frombuffer(payload, dtype=np.uint8), minlength=256)
+            for payload in payloads
+        ]) if payloads else np.zeros((0, 256), dtype=np.int64)
         
-        entropy = 0
-        for count in byte_counts.values():
-            probability = count / len(payload)
-            if probability > 0:
-                entropy -= probability * (probability.bit_length() - 1)
+        printable = histograms[:, 32:127].sum(axis=1)
+        nulls = histograms[:, 0]
+        safe_sizes = np.maximum(sizes, 1)[:, None]
+        probabilities = histograms / safe_sizes
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(histograms > 0, probabilities * np.log2(probabilities), 0.0)
+        entropies = np.maximum(-terms.sum(axis=1), 0.0)
         
-        analysis['entropy'] = entropy
+        return [
+            ByteAnalyzer._build_analysis(
+                payload, int(sizes[i]), int(printable[i]), int(nulls[i]), float(entropies[i])
+            )
+            for i, payload in enumerate(payloads)
+        ]
+    
+    @staticmethod
+    def _build_analysis(payload: bytes, size: int, printable_count: int,
+                        null_count: int, entropy: float) -> Dict[str, Any]:
+        printable_ratio = printable_count / size if size else 0.0
+        analysis = {
+            'size': size,
+            'is_text': size > 0 and printable_ratio > 0.7,
+            'is_binary': size > 0 and printable_ratio < 0.3,
+            'has_nulls': null_count > 0,
+            'printable_ratio': printable_ratio,
+            'entropy': entropy,
+            'patterns': []
+        }
         
         # Padrões comuns
         if payload.startswith(b'http'):
@@ -277,6 +905,72 @@ class ByteAnalyzer:
         return analysis
 
 
+class TapDebouncer:
+    """Filtra toques repetidos da mesma tag e guarda decodificações recentes
+    
+    Com a tag parada perto do aparelho o Android reentrega a mesma intent;
+    toques com a mesma chave (UID + hash do conteúdo) dentro da janela são
+    descartados. A janela desliza enquanto os toques continuam chegando.
+    """
+    
+    def __init__(self, window_seconds: float = 2.0, cache_seconds: float = 30.0,
+                 max_entries: int = 64):
+        self.window_seconds = window_seconds
+        self.cache_seconds = cache_seconds
+        self.max_entries = max_entries
+        self.suppressed = 0
+        self._last_seen = OrderedDict()  # chave -> instante do último toque
+        self._cache = OrderedDict()      # chave -> (instante, resultado)
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def make_key(tag_uid: Optional[str], payloads: List[bytes] = ()) -> str:
+        """Chave do toque: UID da tag + hash do conteúdo"""
+        digest = hashlib.sha1()
+        for payload in payloads:
+            digest.update(len(payload).to_bytes(4, 'big'))
+            digest.update(payload)
+        return f"{tag_uid or '-'}:{digest.hexdigest()}"
+    
+    def should_process(self, key: str) -> bool:
+        """False se a mesma chave foi vista dentro da janela"""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_seen.pop(key, None)
+            self._last_seen[key] = now
+            while len(self._last_seen) > self.max_entries:
+                self._last_seen.popitem(last=False)
+            
+            if last is not None and now - last < self.window_seconds:
+                self.suppressed += 1
+                return False
+            return True
+    
+    def get_cached(self, key: str) -> Optional[Any]:
+        """Resultado guardado para a chave, se ainda válido"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.cache_seconds:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+    
+    def put_cached(self, key: str, value: Any):
+        with self._lock:
+            self._cache[key] = (time.monotonic(), value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._last_seen.clear()
+            self._cache.clear()
+
+
 class SecurityHelper:
     """Auxiliar de segurança"""
     
@@ -314,5 +1008,6 @@ file_manager = FileManager()
 data_validator = DataValidator()
 hex_formatter = HexFormatter()
 performance_monitor = PerformanceMonitor()
+tracer = SpanTracer(monitor=performance_monitor)
 byte_analyzer = ByteAnalyzer()
 security_helper = SecurityHelper()